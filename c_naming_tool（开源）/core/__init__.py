@@ -3,8 +3,17 @@ Core模块
 包含命名生成、翻译、类型信息等核心功能
 """
 
+from .config import config_service
 from .naming import naming_generator
 from .translator import translator
 from .type_info import type_info_manager
+from .abbreviation import abbreviation_solver
+from .registry import identifier_registry
+from .validator import identifier_validator
+from .naming_style import naming_styles
+from .layout import layout_engine
+from .type_selector import type_selector
 
-__all__ = ['naming_generator', 'translator', 'type_info_manager']
+__all__ = ['naming_generator', 'translator', 'type_info_manager', 'abbreviation_solver',
+           'identifier_registry', 'identifier_validator', 'naming_styles',
+           'config_service', 'layout_engine', 'type_selector']
@@ -0,0 +1,217 @@
+"""
+名称缩写模块
+在标识符长度预算内为名称的各个部分选择全称或缩写
+"""
+
+from .translator import translator
+
+
+class AbbreviationSolver:
+    """名称缩写求解器"""
+    
+    # 可读性损失：每处缩写的基础代价 + 删除字符的百分比
+    # 词库缩写优先于截断，全称损失为0
+    DB_ABBR_COST = 100
+    TRUNCATE_COST = 200
+    TRUNCATE_LENGTH = 4
+    
+    # 词组匹配的最大单词数（如 stepper_motor -> step）
+    MAX_PHRASE_WORDS = 3
+    
+    def __init__(self):
+        """初始化缩写求解器"""
+        self._option_cache = {}
+        self._token_cache = {}
+    
+    def get_word_options(self, word):
+        """
+        获取单词（或词组）的候选写法
+        
+        Args:
+            word: 单词或以下划线连接的词组
+        
+        Returns:
+            list: [(写法, 可读性损失)]，按长度升序，已去除被支配的候选
+        """
+        cached = self._option_cache.get(word)
+        if cached is not None:
+            return cached
+        
+        options = [(word, 0)]
+        
+        # 词库中的缩写
+        abbr = translator.get_abbreviation(word)
+        if abbr:
+            options.append((abbr, self.DB_ABBR_COST + self._removed_percent(word, abbr)))
+        
+        # 截断（仅限单个较长的英文单词）
+        if '_' not in word and word.isalpha() and len(word) > self.TRUNCATE_LENGTH:
+            short = word[:self.TRUNCATE_LENGTH]
+            options.append((short, self.TRUNCATE_COST + self._removed_percent(word, short)))
+        
+        # 去除被支配的候选：更长且损失不更小的写法没有意义
+        options.sort(key=lambda option: (len(option[0]), option[1]))
+        pruned = []
+        for text, cost in options:
+            if not pruned or cost < pruned[-1][1]:
+                pruned.append((text, cost))
+        
+        self._option_cache[word] = pruned
+        return pruned
+    
+    def fit(self, parts, max_length, separator='_', fixed_count=0):
+        """
+        将名称压缩到长度预算以内
+        
+        Args:
+            parts: 名称组成部分列表（如 ['g', 'u16', 'temperature_sensor', 'value']）
+            max_length: 最大长度，0 或 None 表示不限制
+            separator: 最终名称中单词之间的分隔符（驼峰等风格为空字符串）
+            fixed_count: 开头不参与缩写的部分数量（修饰前缀、类型前缀等）
+        
+        Returns:
+            dict: {
+                'name': 名称,
+                'parts': 缩写后的组成部分,
+                'length': 名称长度,
+                'fits': 是否满足长度预算,
+                'abbreviations': 缩写列表 [{'full': 全称, 'short': 缩写}]
+            }
+        """
+        name = self._join(parts, separator)
+        if not max_length or len(name) <= max_length:
+            return {
+                'name': name,
+                'parts': list(parts),
+                'length': len(name),
+                'fits': True,
+                'abbreviations': []
+            }
+        
+        fixed_parts = list(parts[:fixed_count])
+        part_tokens = [self._tokenize(part) for part in parts[fixed_count:]]
+        tokens = [token for part in part_tokens for token in part]
+        
+        # 分隔符、固定部分、部分内部下划线的长度与缩写选择无关
+        overhead = len(separator) * (len(parts) - 1)
+        overhead += sum(len(part) for part in fixed_parts)
+        overhead += len(separator) * sum(max(len(part) - 1, 0) for part in part_tokens)
+        
+        option_lists = [self.get_word_options(token) for token in tokens]
+        choice = self._solve(option_lists, max_length - overhead)
+        fits = choice is not None
+        if not fits:
+            # 无法满足预算时，退而使用每个单词的最短写法
+            choice = [0] * len(option_lists)
+        
+        chosen = [options[index][0] for options, index in zip(option_lists, choice)]
+        abbreviations = [
+            {'full': token, 'short': text}
+            for token, text in zip(tokens, chosen) if token != text
+        ]
+        
+        new_parts = fixed_parts
+        position = 0
+        for part in part_tokens:
+            new_parts.append('_'.join(chosen[position:position + len(part)]))
+            position += len(part)
+        
+        name = self._join(new_parts, separator)
+        return {
+            'name': name,
+            'parts': new_parts,
+            'length': len(name),
+            'fits': fits,
+            'abbreviations': abbreviations
+        }
+    
+    @staticmethod
+    def _join(parts, separator):
+        """按最终名称的写法连接各部分（部分内部的下划线同样换成分隔符）"""
+        if separator == '_':
+            return '_'.join(parts)
+        return separator.join(word for part in parts for word in part.split('_') if word)
+    
+    def _tokenize(self, part):
+        """
+        将名称部分切分为单词/词组，优先匹配词库中有缩写的最长词组
+        
+        Returns:
+            list: 单词或词组列表
+        """
+        cached = self._token_cache.get(part)
+        if cached is not None:
+            return cached
+        
+        words = [word for word in part.split('_') if word]
+        tokens = []
+        i = 0
+        while i < len(words):
+            for size in range(min(self.MAX_PHRASE_WORDS, len(words) - i), 1, -1):
+                phrase = '_'.join(words[i:i + size])
+                if translator.get_abbreviation(phrase):
+                    tokens.append(phrase)
+                    i += size
+                    break
+            else:
+                tokens.append(words[i])
+                i += 1
+        
+        self._token_cache[part] = tokens
+        return tokens
+    
+    def _solve(self, option_lists, budget):
+        """
+        多选背包：在总长度不超过预算的前提下使可读性损失最小
+        
+        状态为已选单词的总长度，超出剩余最短长度的状态直接剪枝。
+        
+        Returns:
+            list: 每个单词选中的候选下标，无解时返回 None
+        """
+        if budget < 0:
+            return None
+        
+        # min_rest[i]: 第 i 个单词起全部取最短写法的长度
+        min_rest = [0] * (len(option_lists) + 1)
+        for i in range(len(option_lists) - 1, -1, -1):
+            min_rest[i] = min_rest[i + 1] + len(option_lists[i][0][0])
+        if min_rest[0] > budget:
+            return None
+        
+        # states: 长度 -> 最小损失；history[i]: 长度 -> (上一长度, 候选下标)
+        states = {0: 0}
+        history = []
+        for i, options in enumerate(option_lists):
+            limit = budget - min_rest[i + 1]
+            new_states = {}
+            back = {}
+            for length, cost in states.items():
+                for index, (text, option_cost) in enumerate(options):
+                    new_length = length + len(text)
+                    if new_length > limit:
+                        break
+                    new_cost = cost + option_cost
+                    if new_length not in new_states or new_cost < new_states[new_length]:
+                        new_states[new_length] = new_cost
+                        back[new_length] = (length, index)
+            states = new_states
+            history.append(back)
+        
+        # 损失相同时取更长（更易读）的结果
+        length = min(states, key=lambda l: (states[l], -l))
+        choice = []
+        for back in reversed(history):
+            length, index = back[length]
+            choice.append(index)
+        choice.reverse()
+        return choice
+    
+    @staticmethod
+    def _removed_percent(full, short):
+        """删除字符占全称的百分比"""
+        return (len(full) - len(short)) * 100 // len(full)
+
+
+# 全局实例
+abbreviation_solver = AbbreviationSolver()
@@ -0,0 +1,256 @@
+"""
+配置服务模块
+统一读写 config/ 下的JSON配置：每个文件只解析一次，提供不可变快照，
+修改时通知订阅者并在后台线程原子写入
+"""
+
+import atexit
+import json
+import os
+import threading
+from types import MappingProxyType
+
+
+def freeze(value):
+    """将JSON数据转为不可变结构（dict -> 只读映射，list -> tuple）"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """将不可变快照转回可修改的 dict/list（用于编辑或写入）"""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+class ConfigService:
+    """配置服务"""
+    
+    # 配置名称 -> 文件名
+    FILES = {
+        'settings': 'settings.json',          # 命名规则、校验规则（NamingGenerator）
+        'app_settings': 'app_settings.json',  # 设置面板
+        'templates': 'templates.json',        # 模板库
+        'abi_profiles': 'abi_profiles.json',  # 目标平台ABI（类型大小与对齐）
+        'code_templates': 'code_templates.json',  # 代码注释/声明模板
+    }
+    
+    _MISSING = object()
+    
+    def __init__(self, config_dir=None):
+        """
+        初始化配置服务
+        
+        Args:
+            config_dir: 配置目录，默认为工具根目录下的 config/
+        """
+        self.config_dir = config_dir or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)),
+            'config'
+        )
+        self._snapshots = {}   # 配置名称 -> 不可变快照（文件不存在时为 _MISSING）
+        self._listeners = {}   # 配置名称 -> [回调]
+        self._lock = threading.Lock()
+        
+        # 后台写入：同一文件只保留最新一次待写入的数据（文件路径 -> 数据）
+        self._pending = {}
+        self._writing = 0
+        self._write_cond = threading.Condition()
+        self._writer = None
+    
+    def path(self, name):
+        """获取配置文件路径"""
+        return os.path.join(self.config_dir, self.FILES.get(name, f'{name}.json'))
+    
+    def exists(self, name):
+        """配置是否存在（文件存在或已通过 update 写入）"""
+        return self._load(name) is not self._MISSING
+    
+    def get(self, name, default=None):
+        """
+        获取配置的不可变快照（首次访问时解析文件，之后直接返回缓存）
+        
+        Args:
+            name: 配置名称（见 FILES）
+            default: 配置不存在或解析失败时返回的值
+        
+        Returns:
+            只读映射/元组组成的快照，或 default
+        """
+        snapshot = self._load(name)
+        if snapshot is self._MISSING:
+            return default
+        return snapshot
+    
+    def get_mutable(self, name, default=None):
+        """
+        获取配置的可修改副本（供需要编辑配置的面板使用）
+        
+        Returns:
+            dict/list 副本，配置不存在时返回 default
+        """
+        snapshot = self._load(name)
+        if snapshot is self._MISSING:
+            return default
+        return thaw(snapshot)
+    
+    def update(self, name, data):
+        """
+        更新配置：立即替换快照并通知订阅者，文件在后台线程中原子写入
+        
+        Args:
+            name: 配置名称
+            data: 新的配置数据（dict/list 或快照）
+        
+        Returns:
+            新的不可变快照
+        """
+        snapshot = freeze(data)
+        with self._lock:
+            self._snapshots[name] = snapshot
+        
+        self._schedule_write(self.path(name), thaw(snapshot))
+        self._notify(name, snapshot)
+        return snapshot
+    
+    def write_async(self, file_path, data):
+        """
+        在后台线程中原子写入JSON文件（不缓存快照、不通知订阅者），
+        供自行维护数据的模块使用（如标识符登记表）；连续多次写同一文件时只写最新的数据
+        
+        Args:
+            file_path: 文件路径
+            data: JSON可序列化的数据，调用后不要再修改
+        """
+        self._schedule_write(file_path, data)
+    
+    def reload(self, name):
+        """
+        丢弃缓存并重新解析文件（文件被外部修改时使用），然后通知订阅者
+        
+        Returns:
+            新的快照，文件不存在时为 None
+        """
+        with self._lock:
+            self._snapshots.pop(name, None)
+        snapshot = self.get(name)
+        self._notify(name, snapshot)
+        return snapshot
+    
+    def subscribe(self, name, callback):
+        """
+        订阅配置变更
+        
+        Args:
+            name: 配置名称
+            callback: 回调函数，参数为新的快照
+        """
+        with self._lock:
+            self._listeners.setdefault(name, []).append(callback)
+    
+    def unsubscribe(self, name, callback):
+        """取消订阅"""
+        with self._lock:
+            listeners = self._listeners.get(name, [])
+            if callback in listeners:
+                listeners.remove(callback)
+    
+    def flush(self, timeout=None):
+        """
+        等待所有后台写入完成
+        
+        Returns:
+            bool: 是否在超时前全部完成
+        """
+        with self._write_cond:
+            return self._write_cond.wait_for(
+                lambda: not self._pending and not self._writing, timeout
+            )
+    
+    def _load(self, name):
+        """读取快照，未缓存时解析文件"""
+        snapshot = self._snapshots.get(name)
+        if snapshot is not None:
+            return snapshot
+        
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+            if snapshot is None:
+                snapshot = self._read_file(name)
+                self._snapshots[name] = snapshot
+        return snapshot
+    
+    def _read_file(self, name):
+        """解析配置文件"""
+        file_path = self.path(name)
+        if not os.path.exists(file_path):
+            return self._MISSING
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return freeze(json.load(f))
+        except Exception as e:
+            print(f"加载配置失败: {file_path}: {e}")
+            return self._MISSING
+    
+    def _notify(self, name, snapshot):
+        """通知订阅者"""
+        with self._lock:
+            listeners = list(self._listeners.get(name, []))
+        for callback in listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"配置变更回调失败: {name}: {e}")
+    
+    def _schedule_write(self, file_path, data):
+        """登记待写入的数据并唤醒后台写入线程"""
+        with self._write_cond:
+            self._pending[file_path] = data
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name='config-writer', daemon=True
+                )
+                self._writer.start()
+            self._write_cond.notify_all()
+    
+    def _write_loop(self):
+        """后台写入线程"""
+        while True:
+            with self._write_cond:
+                self._write_cond.wait_for(lambda: self._pending)
+                file_path, data = self._pending.popitem()
+                self._writing += 1
+            
+            try:
+                self._write_file(file_path, data)
+            finally:
+                with self._write_cond:
+                    self._writing -= 1
+                    self._write_cond.notify_all()
+    
+    def _write_file(self, file_path, data):
+        """原子写入：先写临时文件，再替换原文件"""
+        temp_file = file_path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, file_path)
+        except Exception as e:
+            print(f"保存配置失败: {file_path}: {e}")
+
+
+# 全局实例
+config_service = ConfigService()
+
+# 退出前等待未完成的后台写入
+atexit.register(config_service.flush, 5)
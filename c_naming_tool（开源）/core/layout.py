@@ -0,0 +1,234 @@
+"""
+内存布局模块
+计算结构体/联合体的成员偏移、填充、对齐和总大小（支持数组成员、嵌套聚合类型和
+按存储类型登记的枚举等别名类型），结果按 (定义, ABI) 缓存
+"""
+
+from .config import config_service
+from .type_info import type_info_manager
+
+
+class LayoutEngine:
+    """结构体/联合体布局计算"""
+    
+    KINDS = ('struct', 'union')
+    
+    def __init__(self):
+        """初始化布局计算"""
+        self._definitions = {}  # 聚合类型名称 -> 定义键
+        self._aliases = {}      # 别名类型名称（如枚举）-> 实际存储类型
+        self._cache = {}        # (定义键, ABI) -> 布局
+        self._resolving = set()  # 正在计算的定义键（防止自身按值嵌套导致死循环）
+        config_service.subscribe('abi_profiles', lambda data: self.clear_cache())
+    
+    def clear_cache(self):
+        """清空布局缓存（ABI配置变化时调用）"""
+        self._cache.clear()
+    
+    @staticmethod
+    def _array_count(array_size):
+        """数组长度，非数组为 1，无法确定（如宏）时为 None"""
+        if array_size in (None, ''):
+            return 1
+        try:
+            return int(str(array_size).strip(), 0)
+        except ValueError:
+            return None
+    
+    def _make_key(self, members, kind):
+        """生成定义键：相同的成员序列总是得到同一个键"""
+        if kind not in self.KINDS:
+            raise ValueError(f"未知的聚合类型: {kind}")
+        return (kind, tuple(
+            (member.get('name', ''), member['type'].strip(),
+             self._array_count(member.get('array_size')))
+            for member in members
+        ))
+    
+    def register(self, name, members, kind='struct'):
+        """
+        登记聚合类型，之后以 name 为类型的成员会按该定义嵌套布局
+        
+        Args:
+            name: 类型名称（如 sensor_data_t）
+            members: 成员列表 [{'type': '', 'name': '', 'array_size': 可选}]
+            kind: 'struct' 或 'union'
+        """
+        key = self._make_key(members, kind)
+        if self._definitions.get(name) != key:
+            if name in self._definitions:
+                # 定义变化，引用它的布局都已失效
+                self._cache.clear()
+            self._definitions[name] = key
+    
+    def register_alias(self, name, base_type):
+        """
+        登记别名类型，之后以 name 为类型的成员按 base_type 的大小和对齐布局
+        
+        Args:
+            name: 类型名称（如 motor_state_e）
+            base_type: 实际存储类型（如 int、uint8_t）
+        """
+        if self._aliases.get(name) != base_type:
+            if name in self._aliases:
+                self._cache.clear()
+            self._aliases[name] = base_type
+    
+    def get_alias_names(self):
+        """获取已登记的别名类型名称"""
+        return sorted(self._aliases)
+    
+    def unregister(self, name):
+        """取消登记聚合类型或别名类型"""
+        removed = self._definitions.pop(name, None) is not None
+        removed = self._aliases.pop(name, None) is not None or removed
+        if removed:
+            self._cache.clear()
+    
+    def is_aggregate(self, type_name):
+        """类型是否为已登记的聚合类型"""
+        return type_name in self._definitions
+    
+    def layout(self, members, kind='struct', profile=None):
+        """
+        计算布局
+        
+        Args:
+            members: 成员列表 [{'type': '', 'name': '', 'array_size': 可选}]
+            kind: 'struct' 或 'union'
+            profile: ABI名称，None 时使用当前ABI
+        
+        Returns:
+            dict: {
+                'kind': 聚合类型,
+                'profile': ABI名称,
+                'size': 总大小（含尾部填充）,
+                'alignment': 对齐,
+                'data_size': 成员本身占用的字节数之和,
+                'padding': 填充字节数（成员间 + 尾部）,
+                'complete': 是否所有成员大小都已知,
+                'members': [{'name', 'type', 'count', 'size', 'alignment',
+                             'offset', 'padding_before'}]
+            }
+            结果会被缓存复用，调用方不要修改
+        """
+        profile = profile or type_info_manager.abi_profile
+        return self._layout_key(self._make_key(members, kind), profile)
+    
+    def layout_of(self, type_name, profile=None):
+        """
+        获取已登记聚合类型的布局
+        
+        Returns:
+            dict: 同 layout()，未登记时返回 None
+        """
+        key = self._definitions.get(type_name)
+        if key is None:
+            return None
+        return self._layout_key(key, profile or type_info_manager.abi_profile)
+    
+    def get_type_layout(self, type_name, profile=None):
+        """
+        获取任意类型的大小和对齐（聚合类型按登记的定义计算，别名类型按实际存储类型）
+        
+        Returns:
+            tuple: (字节数, 对齐字节数)，未知类型为 (0, 1)
+        """
+        type_name = self._aliases.get(type_name, type_name)
+        key = self._definitions.get(type_name)
+        if key is None:
+            return type_info_manager.get_type_layout(type_name, profile)
+        result = self._layout_key(key, profile or type_info_manager.abi_profile)
+        return (result['size'], result['alignment'])
+    
+    def get_footprints(self, members, kind='struct'):
+        """
+        计算在所有ABI下的总大小
+        
+        Returns:
+            dict: {ABI名称: 字节数}
+        """
+        key = self._make_key(members, kind)
+        return {
+            profile: self._layout_key(key, profile)['size']
+            for profile in type_info_manager.get_abi_profiles()
+        }
+    
+    def _layout_key(self, key, profile):
+        """按定义键计算布局（带缓存）"""
+        cache_key = (key, profile)
+        result = self._cache.get(cache_key)
+        if result is not None:
+            return result
+        
+        if key in self._resolving:
+            # 聚合类型按值包含自身，无法确定大小
+            return {'kind': key[0], 'profile': profile, 'size': 0, 'alignment': 1,
+                    'data_size': 0, 'padding': 0, 'complete': False, 'members': []}
+        
+        self._resolving.add(key)
+        try:
+            result = self._compute(key, profile)
+        finally:
+            self._resolving.discard(key)
+        
+        self._cache[cache_key] = result
+        return result
+    
+    def _compute(self, key, profile):
+        """计算布局"""
+        kind, members = key
+        is_union = kind == 'union'
+        
+        offset = 0  # 结构体：当前末尾；联合体：最大成员大小
+        max_alignment = 1
+        data_size = 0
+        complete = True
+        layout_members = []
+        
+        for name, member_type, count in members:
+            element_size, alignment = self.get_type_layout(member_type, profile)
+            if element_size <= 0 or count is None:
+                complete = False
+            size = element_size * (count or 0)
+            
+            previous_end = offset
+            if is_union:
+                member_offset = 0
+                offset = max(offset, size)
+            else:
+                member_offset = offset
+                if member_offset % alignment:
+                    member_offset += alignment - member_offset % alignment
+                offset = member_offset + size
+            
+            layout_members.append({
+                'name': name,
+                'type': member_type,
+                'count': count,
+                'size': size,
+                'alignment': alignment,
+                'offset': member_offset,
+                'padding_before': 0 if is_union else member_offset - previous_end,
+            })
+            max_alignment = max(max_alignment, alignment)
+            data_size = max(data_size, size) if is_union else data_size + size
+        
+        total_size = offset
+        if total_size % max_alignment:
+            total_size += max_alignment - total_size % max_alignment
+        
+        return {
+            'kind': kind,
+            'profile': profile,
+            'size': total_size,
+            'alignment': max_alignment,
+            'data_size': data_size,
+            'padding': total_size - data_size,
+            'complete': complete,
+            'members': layout_members,
+        }
+
+
+# 全局实例
+layout_engine = LayoutEngine()
@@ -3,15 +3,25 @@
 负责根据规则生成C语言变量名
 """
 
-import json
-import os
 from .type_info import type_info_manager
 from .translator import translator
+from .abbreviation import abbreviation_solver
+from .validator import identifier_validator
+from .naming_style import NamingStyle
+from .config import config_service
 
 
 class NamingGenerator:
     """命名生成器"""
     
+    # 修饰前缀说明
+    MODIFIER_DESCRIPTIONS = {
+        'g': '全局变量 (Global)',
+        's': '静态变量 (Static)',
+        'c': '常量 (Constant)',
+        'v': 'Volatile变量'
+    }
+    
     def __init__(self):
         """初始化命名生成器"""
         self.modifier_prefixes = {}
@@ -19,29 +29,59 @@ class NamingGenerator:
         self.union_prefix = "un"
         self.enum_prefix = "e"
         self.separator = "_"
+        self.max_name_length = 0  # 0 表示不限制长度
+        self._modifier_index = {}
+        self._type_prefix_index = {}
+        self.default_style = None  # 由 settings.json 编译的默认风格
+        self.active_style = None   # 设置面板选用的风格，None 时使用默认风格
         self.load_naming_rules()
+        config_service.subscribe('settings', lambda data: self.load_naming_rules())
     
     def load_naming_rules(self):
-        """加载命名规则配置"""
-        config_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'config',
-            'settings.json'
-        )
+        """加载命名规则配置（settings.json 变更时自动重新加载）"""
+        naming_rules = config_service.get('settings', {}).get('naming_rules', {})
+        self.modifier_prefixes = dict(naming_rules.get('modifier_prefixes', {}))
+        self.struct_prefix = naming_rules.get('struct_prefix', 'st')
+        self.union_prefix = naming_rules.get('union_prefix', 'un')
+        self.enum_prefix = naming_rules.get('enum_prefix', 'e')
+        self.separator = naming_rules.get('separator', '_')
+        self.max_name_length = naming_rules.get('max_name_length', 0)
+        
+        self.default_style = NamingStyle.from_naming_rules(naming_rules)
+        self._build_prefix_index()
+    
+    @property
+    def style(self):
+        """当前使用的命名风格"""
+        return self.active_style or self.default_style
+    
+    def set_style(self, style):
+        """
+        切换命名风格
+        
+        Args:
+            style: NamingStyle 对象，None 表示恢复默认风格
+        """
+        self.active_style = style
+    
+    def _build_prefix_index(self):
+        """建立前缀反查表（前缀 -> 修饰类型 / 类型），用于解析已有名称"""
+        self._modifier_index = {
+            prefix: modifier for modifier, prefix in self.modifier_prefixes.items() if prefix
+        }
         
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                naming_rules = data.get('naming_rules', {})
-                self.modifier_prefixes = naming_rules.get('modifier_prefixes', {})
-                self.struct_prefix = naming_rules.get('struct_prefix', 'st')
-                self.union_prefix = naming_rules.get('union_prefix', 'un')
-                self.enum_prefix = naming_rules.get('enum_prefix', 'e')
-                self.separator = naming_rules.get('separator', '_')
-        except Exception as e:
-            print(f"加载命名规则失败: {e}")
+        self._type_prefix_index = {}
+        for type_name, prefix in type_info_manager.array_prefixes.items():
+            self._type_prefix_index.setdefault(prefix, (type_name, True))
+        for type_name, prefix in type_info_manager.type_prefixes.items():
+            self._type_prefix_index.setdefault(prefix, (type_name, False))
+        for prefix, type_name in ((self.struct_prefix, '结构体'),
+                                  (self.union_prefix, '联合体'),
+                                  (self.enum_prefix, '枚举')):
+            self._type_prefix_index.setdefault(prefix, (type_name, False))
     
-    def generate_variable_name(self, modifier, var_type, module, purpose, is_array=False):
+    def generate_variable_name(self, modifier, var_type, module, purpose, is_array=False,
+                               max_length=None, style=None):
         """
         生成变量名
         
@@ -51,44 +91,35 @@ class NamingGenerator:
             module: 功能模块（可以是中文或英文）
             purpose: 使用目的（可以是中文或英文）
             is_array: 是否为数组
+            max_length: 名称长度预算，None 时使用配置的 max_name_length
+            style: 命名风格（NamingStyle），None 时使用当前风格
             
         Returns:
             dict: 生成的变量名及相关信息
         """
-        parts = []
-        
-        # 1. 添加修饰前缀
-        modifier_prefix = self.modifier_prefixes.get(modifier, '')
-        if modifier_prefix:
-            parts.append(modifier_prefix)
-        
-        # 2. 添加类型前缀
-        type_prefix = type_info_manager.get_type_prefix(var_type, is_array)
-        if type_prefix:
-            parts.append(type_prefix)
-        
-        # 3. 翻译并添加功能模块
-        if module:
-            module_en = translator.translate(module)
-            parts.append(module_en['primary'])
+        style = style or self.style
         
-        # 4. 翻译并添加使用目的
-        if purpose:
-            purpose_en = translator.translate(purpose)
-            parts.append(purpose_en['primary'])
+        # 1. 解析各组成部分（每个输入只翻译、查询一次）
+        segments = self._resolve_name_segments(modifier, var_type, module, purpose, is_array,
+                                               style)
+        parts = [segment['part'] for segment in segments]
+        fixed_count = sum(1 for segment in segments if segment['fixed'])
+        scope_count = sum(1 for segment in segments if segment.get('scope'))
         
-        # 5. 组合成完整变量名
-        variable_name = self.separator.join(parts)
+        # 2. 组合成完整变量名（超出长度预算时缩写），再按风格格式化
+        fitted = self.fit_name_length(parts, fixed_count, max_length,
+                                      style, modifier, scope_count)
+        name = style.format_name(modifier, fitted['parts'][scope_count:],
+                                 fixed_count - scope_count)
         
-        # 6. 生成命名解析
-        naming_breakdown = self._generate_naming_breakdown(
-            modifier, var_type, module, purpose, is_array
-        )
+        # 3. 由同一组成部分生成命名解析
+        naming_breakdown = self._build_naming_breakdown(segments, fitted['parts'])
         
         return {
-            'name': variable_name,
+            'name': name,
             'breakdown': naming_breakdown,
-            'parts': parts
+            'parts': fitted['parts'],
+            'abbreviations': fitted['abbreviations']
         }
     
     def generate_array_name(self, modifier, element_type, module, purpose, array_size):
@@ -126,12 +157,13 @@ class NamingGenerator:
             str: 结构体类型名
         """
         # 翻译结构体名称
-        name_en = translator.translate(struct_name)
+        name_en = translator.translate(struct_name, 'struct')
         
         # 添加 _t 后缀
         return f"{name_en['primary']}_t"
     
-    def generate_struct_variable_name(self, modifier, struct_type_name, module, purpose):
+    def generate_struct_variable_name(self, modifier, struct_type_name, module, purpose,
+                                      max_length=None, style=None):
         """
         生成结构体变量名
         
@@ -140,41 +172,51 @@ class NamingGenerator:
             struct_type_name: 结构体类型名（不含_t后缀）
             module: 功能模块
             purpose: 使用目的
+            max_length: 名称长度预算，None 时使用配置的 max_name_length
+            style: 命名风格（NamingStyle），None 时使用当前风格
             
         Returns:
             dict: 生成的结构体变量名及相关信息
         """
+        style = style or self.style
         parts = []
         
         # 1. 添加修饰前缀
-        modifier_prefix = self.modifier_prefixes.get(modifier, '')
+        modifier_prefix = style.scope_prefixes.get(modifier, '').rstrip(style.separator)
         if modifier_prefix:
             parts.append(modifier_prefix)
+        scope_count = len(parts)
         
         # 2. 添加结构体前缀
-        parts.append(self.struct_prefix)
+        if style.struct_prefix:
+            parts.append(style.struct_prefix)
+        fixed_count = len(parts)
         
         # 3. 翻译并添加功能模块（如果提供）
         if module:
-            module_en = translator.translate(module)
+            module_en = translator.translate(module, 'struct')
             parts.append(module_en['primary'])
         
         # 4. 如果没有提供模块，使用结构体类型名
         if not module:
-            type_en = translator.translate(struct_type_name)
+            type_en = translator.translate(struct_type_name, 'struct')
             parts.append(type_en['primary'])
         
         # 5. 翻译并添加使用目的（如果提供）
         if purpose:
-            purpose_en = translator.translate(purpose)
+            purpose_en = translator.translate(purpose, 'struct')
             parts.append(purpose_en['primary'])
         
-        variable_name = self.separator.join(parts)
+        fitted = self.fit_name_length(parts, fixed_count, max_length,
+                                      style, modifier, scope_count)
+        name = style.format_name(modifier, fitted['parts'][scope_count:],
+                                 fixed_count - scope_count)
         
         return {
-            'name': variable_name,
+            'name': name,
             'struct_type': f"{struct_type_name}_t",
-            'parts': parts
+            'parts': fitted['parts'],
+            'abbreviations': fitted['abbreviations']
         }
     
     def generate_enum_name(self, enum_name):
@@ -188,7 +230,7 @@ class NamingGenerator:
             str: 枚举类型名
         """
         # 翻译枚举名称
-        name_en = translator.translate(enum_name)
+        name_en = translator.translate(enum_name, 'enum')
         
         # 添加 _e 后缀
         return f"{name_en['primary']}_e"
@@ -204,115 +246,196 @@ class NamingGenerator:
             str: 联合体类型名
         """
         # 翻译联合体名称
-        name_en = translator.translate(union_name)
+        name_en = translator.translate(union_name, 'union')
         
         # 添加 _u 后缀
         return f"{name_en['primary']}_u"
     
-    def _generate_naming_breakdown(self, modifier, var_type, module, purpose, is_array):
+    def fit_name_length(self, parts, fixed_count=0, max_length=None, style=None, modifier='',
+                        scope_count=0):
         """
-        生成命名解析说明
+        按长度预算组合名称，超长时用词库缩写或截断压缩各部分
         
+        Args:
+            parts: 名称组成部分
+            fixed_count: 开头不参与缩写的部分数量（修饰前缀、类型前缀）
+            max_length: 长度预算，None 时使用配置的 max_name_length，0 表示不限制
+            style: 最终格式化名称的命名风格，None 时按配置的 separator 连接
+            modifier: 修饰类型（决定风格的分隔符和作用域前缀/后缀）
+            scope_count: parts 开头的作用域前缀部分数量
+            
         Returns:
-            list: 命名解析列表
+            dict: 见 AbbreviationSolver.fit
         """
-        breakdown = []
+        if max_length is None:
+            max_length = self.max_name_length
+        if style is None:
+            return abbreviation_solver.fit(parts, max_length, self.separator, fixed_count)
+        
+        # 按风格的分隔符计算长度，作用域前缀/后缀按风格实际添加的字符换算
+        separator = style.word_separator(modifier)
+        if max_length:
+            counted = sum(len(part) + len(separator) for part in parts[:scope_count])
+            max_length = max(max_length - len(style.format_name(modifier, [])) + counted, 1)
+        return abbreviation_solver.fit(parts, max_length, separator, fixed_count)
+    
+    def _resolve_name_segments(self, modifier, var_type, module, purpose, is_array, style):
+        """
+        解析变量名的各组成部分，作为名称、parts 和命名解析的共同来源
         
-        # 修饰符
-        modifier_prefix = self.modifier_prefixes.get(modifier, '')
+        Returns:
+            list: [{'part': 文本, 'description': 命名解析说明, 'fixed': 是否为不可缩写的前缀,
+                    'scope': 是否为修饰前缀}]
+        """
+        segments = []
+        context = 'array' if is_array else 'variable'
+        
+        # 修饰前缀
+        modifier_prefix = style.scope_prefixes.get(modifier, '').rstrip(style.separator)
         if modifier_prefix:
-            modifier_desc = {
-                'g': '全局变量 (Global)',
-                's': '静态变量 (Static)',
-                'c': '常量 (Constant)',
-                'v': 'Volatile变量'
-            }.get(modifier_prefix, modifier)
-            
-            breakdown.append({
+            segments.append({
                 'part': modifier_prefix,
-                'description': modifier_desc
+                'description': self.MODIFIER_DESCRIPTIONS.get(modifier_prefix, modifier),
+                'fixed': True,
+                'scope': True
             })
         
-        # 类型前缀
-        type_prefix = type_info_manager.get_type_prefix(var_type, is_array)
-        if type_prefix:
-            type_desc = f"{var_type}"
-            if is_array:
-                type_desc += " 数组"
-            
-            type_info = type_info_manager.get_type_info(var_type)
-            if type_info:
-                range_str = type_info_manager.get_range_str(var_type)
-                type_desc += f" ({range_str})"
-            
-            breakdown.append({
-                'part': type_prefix,
-                'description': type_desc
+        # 类型前缀（数组标识 + 类型前缀，或 u16a 这样的合写）
+        type_desc = f"{var_type}"
+        if is_array:
+            type_desc += " 数组"
+        if type_info_manager.get_type_info(var_type):
+            range_str = type_info_manager.get_range_str(var_type)
+            type_desc += f" ({range_str})"
+        
+        for token in style.type_tokens(var_type, is_array):
+            segments.append({
+                'part': token,
+                'description': "数组" if is_array and token == style.array_marker else type_desc,
+                'fixed': True
             })
         
         # 功能模块
         if module:
-            module_en = translator.translate(module)
-            breakdown.append({
-                'part': module_en['primary'],
-                'description': f"功能模块: {module}"
+            segments.append({
+                'part': translator.translate(module, context)['primary'],
+                'description': f"功能模块: {module}",
+                'fixed': False
             })
         
         # 使用目的
         if purpose:
-            purpose_en = translator.translate(purpose)
-            breakdown.append({
-                'part': purpose_en['primary'],
-                'description': f"使用目的: {purpose}"
+            segments.append({
+                'part': translator.translate(purpose, context)['primary'],
+                'description': f"使用目的: {purpose}",
+                'fixed': False
             })
         
-        return breakdown
+        return segments
     
-    def validate_name(self, name):
+    def _build_naming_breakdown(self, segments, parts):
         """
-        验证变量名是否符合C语言命名规范
+        生成命名解析说明
         
         Args:
-            name: 变量名
+            segments: _resolve_name_segments 的结果
+            parts: 最终（可能已缩写）的组成部分，与 segments 一一对应
             
         Returns:
-            dict: 验证结果
+            list: 命名解析列表
         """
-        issues = []
-        
-        # 检查是否为空
-        if not name:
-            issues.append("变量名不能为空")
-            return {'valid': False, 'issues': issues}
-        
-        # 检查首字符是否为字母或下划线
-        if not (name[0].isalpha() or name[0] == '_'):
-            issues.append("变量名必须以字母或下划线开头")
+        breakdown = []
+        for segment, part in zip(segments, parts):
+            description = segment['description']
+            if part != segment['part']:
+                description += f" (缩写自 {segment['part']})"
+            breakdown.append({
+                'part': part,
+                'description': description
+            })
+        return breakdown
+    
+    def explain_name(self, name):
+        """
+        解析已有变量名，将前缀和各单词还原为中文说明
         
-        # 检查是否只包含字母、数字和下划线
-        if not all(c.isalnum() or c == '_' for c in name):
-            issues.append("变量名只能包含字母、数字和下划线")
+        支持 g_u16_adc_sample_cnt 与 gu16_adc_sample_cnt 两种前缀写法，
+        单词通过翻译引擎的反查表逐个哈希查找。
         
-        # 检查是否为C语言关键字
-        c_keywords = [
-            'auto', 'break', 'case', 'char', 'const', 'continue', 'default',
-            'do', 'double', 'else', 'enum', 'extern', 'float', 'for', 'goto',
-            'if', 'int', 'long', 'register', 'return', 'short', 'signed',
-            'sizeof', 'static', 'struct', 'switch', 'typedef', 'union',
-            'unsigned', 'void', 'volatile', 'while'
-        ]
+        Args:
+            name: 变量名
+            
+        Returns:
+            dict: {
+                'modifier': 修饰前缀（无则为空）,
+                'type_prefix': 类型前缀（无则为空）,
+                'type': 类型前缀对应的类型,
+                'is_array': 是否为数组前缀,
+                'words': 单词列表 [{'english', 'chinese', 'kind'}],
+                'description': 中文描述（词库中没有的单词保留英文）
+            }
+        """
+        sep = self.separator or '_'
+        head, _, tail = name.partition(sep)
+        modifier = ''
+        type_prefix = ''
+        
+        # 修饰前缀：独立的 g_ 或与类型前缀相连的 gu16_
+        if head in self._modifier_index and tail:
+            modifier = head
+            head, _, tail = tail.partition(sep)
+        elif head[:1] in self._modifier_index and head[1:] in self._type_prefix_index and tail:
+            modifier = head[:1]
+            head = head[1:]
         
-        if name.lower() in c_keywords:
-            issues.append(f"'{name}' 是C语言关键字，不能用作变量名")
+        # 类型前缀
+        if head in self._type_prefix_index and tail:
+            type_prefix = head
+            rest = tail
+        else:
+            rest = f"{head}{sep}{tail}" if tail else head
         
-        # 检查长度
-        if len(name) > 63:
-            issues.append("变量名过长，建议不超过63个字符")
+        type_name, is_array = self._type_prefix_index.get(type_prefix, ('', False))
+        words = translator.segment_identifier(rest)
         
         return {
-            'valid': len(issues) == 0,
-            'issues': issues
+            'modifier': modifier,
+            'type_prefix': type_prefix,
+            'type': type_name,
+            'is_array': is_array,
+            'words': words,
+            'description': ''.join(word['chinese'] or word['english'] for word in words)
         }
+    
+    def explain_names(self, names):
+        """
+        批量解析变量名，重复的名称只解析一次
+        
+        Args:
+            names: 变量名列表
+            
+        Returns:
+            list: 与输入顺序一致的解析结果，见 explain_name
+        """
+        explained = {}
+        for name in names:
+            if name not in explained:
+                explained[name] = self.explain_name(name)
+        return [explained[name] for name in names]
+    
+    def validate_name(self, name, style=None):
+        """
+        验证变量名是否符合C语言命名规范
+        
+        Args:
+            name: 变量名
+            style: 命名风格（NamingStyle），None 时使用设置面板选用的风格，
+                   未选用时按 settings.json 的校验规则
+            
+        Returns:
+            dict: 验证结果 {'valid', 'issues', 'warnings'}
+        """
+        return identifier_validator.validate(name, style or self.active_style)
 
 
 # 全局实例
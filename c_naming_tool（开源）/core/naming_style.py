@@ -0,0 +1,390 @@
+"""
+命名风格模块
+将设置面板的命名预设/自定义规则编译为命名风格对象，供名称生成和校验共用
+"""
+
+import re
+from .type_info import type_info_manager
+
+
+# 设置面板中的默认命名规则
+DEFAULT_NAMING = {
+    'global_prefix': 'g_',
+    'global_suffix': '',
+    'static_prefix': 's_',
+    'static_suffix': '',
+    'local_prefix': 'l_',
+    'local_suffix': '',
+    'struct_prefix': 'st_',
+    'struct_suffix': '',
+    'union_prefix': 'un_',
+    'union_suffix': '',
+    'enum_prefix': 'e_',
+    'enum_suffix': '',
+    'array_prefix': 'a_',
+    'array_suffix': '',
+    'pointer_prefix': 'p_',
+    'pointer_suffix': '',
+    'function_prefix': '',
+    'function_suffix': '',
+    'uint8_prefix': '',
+    'uint16_prefix': '',
+    'uint32_prefix': '',
+    'style': '下划线 (_)',
+    'case': '全小写',
+    'const_case': '全大写+下划线',
+    'macro_case': '全大写+下划线',
+    'use_type_prefix': False,
+    'use_scope_prefix': True,
+    'use_module_prefix': False,
+    'module_prefix': ''
+}
+
+# 命名规则预设
+NAMING_PRESETS = {
+    'Linux内核风格': {
+        'global_prefix': '',
+        'static_prefix': '',
+        'local_prefix': '',
+        'struct_prefix': '',
+        'union_prefix': '',
+        'enum_prefix': '',
+        'array_prefix': '',
+        'pointer_prefix': '',
+        'function_prefix': '',
+        'style': '下划线 (_)',
+        'case': '全小写',
+        'const_case': '全大写+下划线',
+        'macro_case': '全大写+下划线',
+        'use_type_prefix': False,
+        'use_scope_prefix': False
+    },
+    'Google C++风格': {
+        'global_prefix': 'g_',
+        'static_prefix': 's_',
+        'local_prefix': '',
+        'struct_prefix': '',
+        'union_prefix': '',
+        'enum_prefix': '',
+        'array_prefix': '',
+        'pointer_prefix': '',
+        'function_prefix': '',
+        'style': '下划线 (_)',
+        'case': '全小写',
+        'const_case': 'k前缀+驼峰',
+        'macro_case': '全大写+下划线',
+        'use_type_prefix': False,
+        'use_scope_prefix': True
+    },
+    'Hungarian命名法': {
+        'global_prefix': 'g_',
+        'static_prefix': 's_',
+        'local_prefix': '',
+        'struct_prefix': 'st',
+        'union_prefix': 'un',
+        'enum_prefix': 'e',
+        'array_prefix': 'a',
+        'pointer_prefix': 'p',
+        'function_prefix': 'fn',
+        'uint8_prefix': 'b',
+        'uint16_prefix': 'w',
+        'uint32_prefix': 'dw',
+        'style': '驼峰命名 (camelCase)',
+        'case': '首字母大写',
+        'const_case': 'k前缀+驼峰',
+        'macro_case': '全大写+下划线',
+        'use_type_prefix': True,
+        'use_scope_prefix': True
+    },
+    '嵌入式通用': {
+        'global_prefix': 'g_',
+        'static_prefix': 's_',
+        'local_prefix': 'l_',
+        'struct_prefix': 'st_',
+        'union_prefix': 'un_',
+        'enum_prefix': 'e_',
+        'array_prefix': 'a_',
+        'pointer_prefix': 'p_',
+        'function_prefix': '',
+        'style': '下划线 (_)',
+        'case': '全小写',
+        'const_case': '全大写+下划线',
+        'macro_case': '全大写+下划线',
+        'use_type_prefix': False,
+        'use_scope_prefix': True
+    }
+}
+
+
+def _split_words(parts):
+    """将组成部分拆成单词（部分内部可能含下划线）"""
+    return [word for part in parts for word in part.split('_') if word]
+
+
+class NamingStyle:
+    """
+    编译后的命名风格
+    
+    构造时把前缀、后缀和大小写规则展开为查找表和格式化函数，
+    生成或校验名称时只需查表，切换风格只是替换对象。
+    """
+    
+    # 大小写方式 -> 名称主体的正则（用于校验）
+    CASE_PATTERNS = {
+        'lower': r'[a-z][a-z0-9]*(?:_[a-z0-9]+)*',
+        'upper': r'[A-Z][A-Z0-9]*(?:_[A-Z0-9]+)*',
+        'capitalized': r'[A-Z][a-z0-9]*(?:_[A-Z0-9][a-z0-9]*)*',
+        'camel': r'[a-z][a-zA-Z0-9]*',
+        'pascal': r'[A-Z][a-zA-Z0-9]*',
+        'k_camel': r'k[A-Z][a-zA-Z0-9]*',
+    }
+    
+    # 设置面板选项 -> 大小写方式
+    STYLE_CASES = {
+        '驼峰命名 (camelCase)': 'camel',
+        '帕斯卡 (PascalCase)': 'pascal',
+    }
+    SNAKE_CASES = {
+        '全小写': 'lower',
+        '全大写': 'upper',
+        '首字母大写': 'capitalized',
+    }
+    CONST_CASES = {
+        '全大写+下划线': 'upper',
+        '全小写+下划线': 'lower',
+        'k前缀+驼峰': 'k_camel',
+    }
+    
+    # 使用常量命名方式的修饰类型
+    CONST_MODIFIER = '常量'
+    
+    # 单词直接拼接、不使用分隔符的大小写方式
+    JOINED_CASES = ('camel', 'pascal', 'k_camel')
+    
+    def __init__(self, name, scope_prefixes=None, scope_suffixes=None, type_prefixes=None,
+                 array_prefixes=None, array_marker='', struct_prefix='st', case='lower',
+                 const_case=None, separator='_'):
+        """
+        编译命名风格
+        
+        Args:
+            name: 风格名称
+            scope_prefixes: 修饰类型 -> 前缀原文（如 {'全局变量': 'g_'}）
+            scope_suffixes: 修饰类型 -> 后缀原文
+            type_prefixes: 类型 -> 类型前缀（如 {'uint16_t': 'u16'}）
+            array_prefixes: 数组元素类型 -> 类型前缀（如 {'uint16_t': 'u16a'}）
+            array_marker: 数组标识（放在类型前缀之前，如 'a'）
+            struct_prefix: 结构体变量前缀
+            case: 大小写方式（见 CASE_PATTERNS）
+            const_case: 常量的大小写方式，None 时与 case 相同
+            separator: 下划线风格的分隔符
+        """
+        self.name = name
+        self.scope_prefixes = dict(scope_prefixes or {})
+        self.scope_suffixes = dict(scope_suffixes or {})
+        self.array_marker = array_marker
+        self.struct_prefix = struct_prefix
+        self.case = case
+        self.const_case = const_case or case
+        self.separator = separator
+        
+        # 类型前缀表：(类型, 是否数组) -> 前缀单元
+        marker = (array_marker,) if array_marker else ()
+        self._type_tokens = {}
+        for type_name, prefix in (type_prefixes or {}).items():
+            self._type_tokens[(type_name, False)] = (prefix,) if prefix else ()
+        for type_name, prefix in (array_prefixes or {}).items():
+            self._type_tokens[(type_name, True)] = marker + ((prefix,) if prefix else ())
+        self._array_only = marker
+        
+        # 修饰类型 -> (前缀, 格式化函数, 后缀)
+        joiners = {case_name: self._make_joiner(case_name)
+                   for case_name in {self.case, self.const_case}}
+        self._default_formatter = ('', joiners[self.case], '')
+        self._formatters = {}
+        for modifier in set(self.scope_prefixes) | set(self.scope_suffixes) | {self.CONST_MODIFIER}:
+            case_name = self.const_case if modifier == self.CONST_MODIFIER else self.case
+            self._formatters[modifier] = (
+                self.scope_prefixes.get(modifier, ''),
+                joiners[case_name],
+                self.scope_suffixes.get(modifier, '')
+            )
+        
+        # 校验用的整体正则：可选前缀 + 主体 + 可选后缀
+        prefixes = sorted({p for p in self.scope_prefixes.values() if p}, key=len, reverse=True)
+        suffixes = sorted({s for s in self.scope_suffixes.values() if s}, key=len, reverse=True)
+        bodies = [self.CASE_PATTERNS[case_name] for case_name in sorted(joiners)]
+        self.pattern = (
+            (f"(?:{'|'.join(map(re.escape, prefixes))})?" if prefixes else '')
+            + f"(?:{'|'.join(bodies)})"
+            + (f"(?:{'|'.join(map(re.escape, suffixes))})?" if suffixes else '')
+        )
+    
+    @classmethod
+    def from_settings(cls, name, naming):
+        """
+        由设置面板的命名规则编译风格
+        
+        Args:
+            name: 风格名称（预设名或"自定义"）
+            naming: 设置面板 settings['naming'] 格式的字典，缺少的项取默认值
+        
+        Returns:
+            NamingStyle: 编译后的风格
+        """
+        rules = {**DEFAULT_NAMING, **naming}
+        
+        scopes = {'全局变量': 'global', '静态变量': 'static', '局部变量': 'local'}
+        scope_prefixes = {}
+        if rules['use_scope_prefix']:
+            scope_prefixes = {modifier: rules[f'{key}_prefix'] for modifier, key in scopes.items()}
+        scope_suffixes = {modifier: rules[f'{key}_suffix'] for modifier, key in scopes.items()}
+        
+        type_prefixes = {}
+        if rules['use_type_prefix']:
+            type_prefixes = dict(type_info_manager.type_prefixes)
+            for type_name, key in (('uint8_t', 'uint8_prefix'),
+                                   ('uint16_t', 'uint16_prefix'),
+                                   ('uint32_t', 'uint32_prefix')):
+                if rules[key]:
+                    type_prefixes[type_name] = rules[key]
+        
+        case = cls.STYLE_CASES.get(rules['style'], cls.SNAKE_CASES.get(rules['case'], 'lower'))
+        
+        return cls(
+            name,
+            scope_prefixes=scope_prefixes,
+            scope_suffixes=scope_suffixes,
+            type_prefixes=type_prefixes,
+            array_prefixes=type_prefixes,
+            array_marker=rules['array_prefix'].rstrip('_'),
+            struct_prefix=rules['struct_prefix'].rstrip('_'),
+            case=case,
+            const_case=cls.CONST_CASES.get(rules['const_case'], case)
+        )
+    
+    @classmethod
+    def from_naming_rules(cls, naming_rules):
+        """
+        由 settings.json 的 naming_rules 编译默认风格（g_u16_xxx / g_u16a_xxx）
+        
+        Returns:
+            NamingStyle: 编译后的风格
+        """
+        separator = naming_rules.get('separator', '_')
+        return cls(
+            '默认',
+            scope_prefixes={
+                modifier: prefix + separator
+                for modifier, prefix in naming_rules.get('modifier_prefixes', {}).items()
+                if prefix
+            },
+            type_prefixes=type_info_manager.type_prefixes,
+            array_prefixes=type_info_manager.array_prefixes,
+            struct_prefix=naming_rules.get('struct_prefix', 'st'),
+            separator=separator
+        )
+    
+    def type_tokens(self, var_type, is_array=False):
+        """
+        获取类型前缀单元
+        
+        Returns:
+            tuple: 前缀单元（如 ('u16',)、('a', 'w')），没有前缀时为空
+        """
+        tokens = self._type_tokens.get((var_type, is_array))
+        if tokens is None:
+            return self._array_only if is_array else ()
+        return tokens
+    
+    def word_separator(self, modifier):
+        """修饰类型对应的格式中单词之间的分隔符（驼峰等风格为空字符串）"""
+        case_name = self.const_case if modifier == self.CONST_MODIFIER else self.case
+        return '' if case_name in self.JOINED_CASES else self.separator
+    
+    def format_name(self, modifier, parts, prefix_count=0):
+        """
+        按风格组合名称
+        
+        Args:
+            modifier: 修饰类型（决定作用域前缀/后缀和是否按常量格式）
+            parts: 名称主体的组成部分（类型前缀单元 + 单词部分）
+            prefix_count: parts 开头的类型前缀单元数量
+        
+        Returns:
+            str: 名称
+        """
+        prefix, join, suffix = self._formatters.get(modifier, self._default_formatter)
+        return prefix + join(parts, prefix_count) + suffix
+    
+    def _make_joiner(self, case):
+        """生成大小写方式对应的格式化函数"""
+        separator = self.separator
+        
+        if case == 'lower':
+            return lambda parts, prefix_count: separator.join(parts)
+        if case == 'upper':
+            return lambda parts, prefix_count: separator.join(parts).upper()
+        if case == 'capitalized':
+            return lambda parts, prefix_count: separator.join(
+                word.capitalize() for word in _split_words(parts))
+        
+        def join_camel(parts, prefix_count):
+            prefix = ''.join(parts[:prefix_count]).lower()
+            words = [word.capitalize() for word in _split_words(parts[prefix_count:])]
+            if not prefix and words:
+                words[0] = words[0].lower()
+            return prefix + ''.join(words)
+        
+        if case == 'camel':
+            return join_camel
+        if case == 'pascal':
+            def join_pascal(parts, prefix_count):
+                name = join_camel(parts, prefix_count)
+                return name[:1].upper() + name[1:]
+            return join_pascal
+        if case == 'k_camel':
+            return lambda parts, prefix_count: 'k' + ''.join(
+                word.capitalize() for word in _split_words(parts))
+        raise ValueError(f"未知的大小写方式: {case}")
+
+
+class NamingStyleManager:
+    """命名风格管理器：预编译所有预设，并缓存自定义规则的编译结果"""
+    
+    def __init__(self):
+        """初始化并编译所有预设"""
+        self._cache = {}
+        self.presets = {
+            name: self.compile(naming, name) for name, naming in NAMING_PRESETS.items()
+        }
+    
+    def compile(self, naming, name='自定义'):
+        """
+        编译命名规则（相同规则只编译一次）
+        
+        Args:
+            naming: 设置面板 settings['naming'] 格式的字典
+            name: 风格名称
+        
+        Returns:
+            NamingStyle: 编译后的风格
+        """
+        key = (name, tuple(sorted((k, v) for k, v in naming.items() if k in DEFAULT_NAMING)))
+        style = self._cache.get(key)
+        if style is None:
+            style = NamingStyle.from_settings(name, naming)
+            self._cache[key] = style
+        return style
+    
+    def get(self, name):
+        """获取预设风格，不存在时返回 None"""
+        return self.presets.get(name)
+    
+    def preset_names(self):
+        """获取所有预设名称"""
+        return list(self.presets.keys())
+
+
+# 全局实例
+naming_styles = NamingStyleManager()
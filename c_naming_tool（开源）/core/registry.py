@@ -0,0 +1,256 @@
+"""
+标识符登记模块
+记录项目中已发放的标识符，检测重名并自动加后缀区分
+"""
+
+import json
+import os
+import re
+from .config import config_service
+from .validator import IdentifierValidator
+
+
+class IdentifierRegistry:
+    """项目标识符登记表"""
+    
+    # 导入源码时扫描的文件扩展名
+    SOURCE_EXTENSIONS = ('.c', '.h')
+    
+    # 注释、字符串/字符字面量、预处理指令名、#include 行
+    _SOURCE_NOISE_RE = re.compile(
+        r'/\*.*?\*/|//[^\n]*|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+        r'|^[ \t]*#[ \t]*include[^\n]*|^[ \t]*#[ \t]*\w+',
+        re.DOTALL | re.MULTILINE
+    )
+    _IDENTIFIER_RE = re.compile(r'\b[A-Za-z_]\w*')
+    
+    # 导入的标识符的归属标记前缀
+    IMPORT_OWNER_PREFIX = 'import:'
+    
+    def __init__(self, registry_file=None):
+        """
+        初始化标识符登记表
+        
+        Args:
+            registry_file: 登记文件路径，默认为 config/identifier_registry.json
+        """
+        self.registry_file = registry_file or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)),
+            'config',
+            'identifier_registry.json'
+        )
+        self._owners = {}       # 标识符 -> 归属（生成该名称的输入）
+        self._issued = {}       # 归属 -> 标识符
+        self._next_suffix = {}  # 基础名称 -> 下一个可尝试的后缀编号
+        self._dirty = False     # 是否有未保存的修改
+        self.load()
+    
+    def load(self, registry_file=None):
+        """
+        加载登记文件
+        
+        Args:
+            registry_file: 登记文件路径，None 时使用当前路径
+        """
+        if registry_file:
+            self.registry_file = registry_file
+        
+        self._owners = {}
+        self._issued = {}
+        self._next_suffix = {}
+        self._dirty = False
+        
+        if not os.path.exists(self.registry_file):
+            return
+        
+        try:
+            with open(self.registry_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._owners = data.get('identifiers', {})
+            self._issued = {owner: name for name, owner in self._owners.items()}
+        except Exception as e:
+            print(f"加载标识符登记表失败: {e}")
+    
+    def save(self):
+        """
+        保存登记文件（先写临时文件再替换，避免写到一半损坏）
+        
+        Returns:
+            bool: 是否保存成功
+        """
+        temp_file = self.registry_file + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.registry_file) or '.', exist_ok=True)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'identifiers': self._owners}, f, ensure_ascii=False, indent=0)
+            os.replace(temp_file, self.registry_file)
+            self._dirty = False
+            return True
+        except Exception as e:
+            print(f"保存标识符登记表失败: {e}")
+            return False
+    
+    def save_async(self):
+        """
+        在配置服务的后台线程中保存（供界面使用，不阻塞界面）；
+        没有修改时不写，连续多次保存时只写最新的内容
+        """
+        if not self._dirty:
+            return
+        config_service.write_async(self.registry_file, {'identifiers': dict(self._owners)})
+        self._dirty = False
+    
+    @staticmethod
+    def make_owner(kind, *fields):
+        """
+        生成归属标记：同样的输入总是得到同一个归属
+        
+        Args:
+            kind: 标识符种类（variable、array、struct 等）
+            fields: 生成名称用到的输入（修饰类型、类型、模块、目的等）
+        
+        Returns:
+            str: 归属标记
+        """
+        return '|'.join([kind] + [str(field) for field in fields])
+    
+    def __contains__(self, name):
+        return name in self._owners
+    
+    def __len__(self):
+        return len(self._owners)
+    
+    def owner_of(self, name):
+        """获取标识符的归属，未登记时返回 None"""
+        return self._owners.get(name)
+    
+    def resolve(self, name, owner):
+        """
+        计算 issue() 将要发放的名称，但不登记
+        
+        Args:
+            name: 生成器给出的名称
+            owner: 归属标记（见 make_owner）
+        
+        Returns:
+            str: 不与其他归属重名的标识符
+        """
+        issued = self._issued.get(owner)
+        if issued is not None and self._is_variant(issued, name):
+            return issued
+        
+        if name not in self._owners:
+            return name
+        
+        suffix = self._next_suffix.get(name, 2)
+        while f"{name}_{suffix}" in self._owners:
+            suffix += 1
+        return f"{name}_{suffix}"
+    
+    def issue(self, name, owner):
+        """
+        发放标识符：同一归属重复申请得到同一名称，与其他归属重名时自动加数字后缀
+        
+        Args:
+            name: 生成器给出的名称
+            owner: 归属标记（见 make_owner）
+        
+        Returns:
+            str: 登记后的标识符
+        """
+        issued = self.resolve(name, owner)
+        if issued not in self._owners:
+            previous = self._issued.get(owner)
+            if previous is not None and self._owners.get(previous) == owner:
+                # 输入不变但生成结果变了（如词库更新），释放旧名称
+                del self._owners[previous]
+            self._owners[issued] = owner
+            self._issued[owner] = issued
+            self._dirty = True
+            if issued != name:
+                self._next_suffix[name] = int(issued[len(name) + 1:]) + 1
+        return issued
+    
+    def release(self, name):
+        """
+        释放标识符
+        
+        Returns:
+            bool: 是否存在并已释放
+        """
+        owner = self._owners.pop(name, None)
+        if owner is None:
+            return False
+        if self._issued.get(owner) == name:
+            del self._issued[owner]
+        self._dirty = True
+        return True
+    
+    def import_names(self, names, source=''):
+        """
+        批量导入已有标识符（已登记的保持原归属）
+        
+        Args:
+            names: 标识符可迭代对象
+            source: 来源说明（如文件名）
+        
+        Returns:
+            int: 新登记的数量
+        """
+        owner = self.IMPORT_OWNER_PREFIX + source
+        before = len(self._owners)
+        owners = self._owners
+        for name in names:
+            if name not in owners:
+                owners[name] = owner
+        count = len(self._owners) - before
+        if count:
+            self._dirty = True
+        return count
+    
+    def import_sources(self, paths):
+        """
+        从C源码导入全部标识符（变量、函数、类型、宏等共享同一命名空间）
+        
+        Args:
+            paths: 文件或目录路径列表，目录会递归扫描 .c/.h 文件
+        
+        Returns:
+            int: 新登记的数量
+        """
+        count = 0
+        for file_path in self._iter_source_files(paths):
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    text = f.read()
+            except OSError as e:
+                print(f"读取源文件失败: {file_path}: {e}")
+                continue
+            
+            text = self._SOURCE_NOISE_RE.sub(' ', text)
+            names = set(self._IDENTIFIER_RE.findall(text)) - IdentifierValidator.ALL_KEYWORDS
+            count += self.import_names(names, os.path.basename(file_path))
+        return count
+    
+    def _iter_source_files(self, paths):
+        """展开文件/目录路径"""
+        for path in paths:
+            if os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    for filename in sorted(files):
+                        if filename.endswith(self.SOURCE_EXTENSIONS):
+                            yield os.path.join(root, filename)
+            else:
+                yield path
+    
+    @staticmethod
+    def _is_variant(issued, name):
+        """issued 是否为 name 本身或 name 加数字后缀"""
+        if issued == name:
+            return True
+        return (issued.startswith(name + '_')
+                and issued[len(name) + 1:].isdigit())
+
+
+# 全局实例
+identifier_registry = IdentifierRegistry()
@@ -5,9 +5,26 @@ Translation engine module with pinyin conversion, smart segmentation, multi-stra
 import json
 import os
 import re
+from collections import OrderedDict
 from typing import Dict, List, Tuple
 
 
+# Identifier normalization: ASCII upper->lower and separators -> '_' in one
+# str.translate, then any run of characters outside [a-z0-9] (including
+# underscores) collapses to a single '_' with one regex pass. The batch table
+# leaves '\n' alone so a whole batch can be normalized as one joined string.
+_C_NAME_BATCH_TRANS = str.maketrans({
+    **{chr(c): chr(c + 32) for c in range(ord('A'), ord('Z') + 1)},
+    ' ': '_',
+    '-': '_',
+})
+_C_NAME_TRANS = {**_C_NAME_BATCH_TRANS, ord('\n'): '_'}
+_C_NAME_INVALID_RE = re.compile(r'[^a-z0-9\n]+')
+
+# Identifier words: snake_case pieces and camelCase/PascalCase humps
+_IDENT_WORD_RE = re.compile(r'[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])')
+
+
 class PinyinConverter:
     """Pinyin converter for Chinese characters"""
     
@@ -86,13 +103,40 @@ class PinyinConverter:
 class TranslationEngine:
     """Powerful offline translation engine"""
     
+    # Per-context category weights, used to choose between terms that exist
+    # in several categories (e.g. '通道' is both device.channel and
+    # network.channel). Contexts not listed here rank terms in database order.
+    CONTEXT_CATEGORY_WEIGHTS = {
+        'array': {'peripherals': 3, 'storage': 2, 'device': 1},
+        'struct': {'config': 3, 'device': 2, 'peripherals': 1},
+        'union': {'protocol': 3, 'storage': 2},
+        'enum': {'status': 3, 'config': 2, 'system': 1},
+        'function': {'actions': 3, 'control': 2, 'protocol': 1},
+        'pointer': {'storage': 3, 'peripherals': 2, 'device': 1},
+    }
+    
+    # Number of suggestions kept per entry in the suggestion index
+    SUGGESTION_INDEX_SIZE = 8
+    
+    # Number of non-glossary texts (e.g. keystroke prefixes typed in the UI)
+    # whose suggestions are kept in the LRU cache
+    SUGGESTION_CACHE_SIZE = 1024
+    
     def __init__(self):
         """Initialize translation engine"""
         self.term_db = {}
         self.translation_cache = {}
         self.pinyin_converter = PinyinConverter()
+        self._term_index = {}
+        self._context_tables = {}
+        self._abbreviation_index = {}
+        self._reverse_index = {}
+        self._reverse_max_words = 1
+        self._suggestion_index = {}
+        self._suggestion_cache = OrderedDict()
         self.load_term_database()
         self._init_common_patterns()
+        self._build_suggestion_index()
     
     def _init_common_patterns(self):
         """Initialize common translation patterns"""
@@ -118,6 +162,139 @@ class TranslationEngine:
                 self.term_db = json.load(f)
         except Exception as e:
             print(f"Failed to load term database: {e}")
+        
+        self._build_term_index()
+    
+    def _build_term_index(self):
+        """
+        Build the exact-match index, per-context ranking tables and the
+        English-side abbreviation and reverse indexes
+        
+        The general index keeps the first occurrence of each term in database
+        order. Context tables only store the terms whose best entry differs
+        from the general one, so a context lookup is two dict probes.
+        """
+        entries = {}
+        for category, terms in self.term_db.items():
+            for term_cn, term_info in terms.items():
+                entries.setdefault(term_cn, []).append((category, term_info))
+        
+        self._term_index = {term_cn: candidates[0] for term_cn, candidates in entries.items()}
+        self._context_tables = {}
+        
+        for context, weights in self.CONTEXT_CATEGORY_WEIGHTS.items():
+            table = {}
+            for term_cn, candidates in entries.items():
+                if len(candidates) < 2:
+                    continue
+                # max() keeps the first candidate on ties, i.e. database order
+                best = max(candidates, key=lambda entry: weights.get(entry[0], 0))
+                if best is not candidates[0]:
+                    table[term_cn] = best
+            self._context_tables[context] = table
+        
+        # English primary -> abbreviation, first occurrence wins
+        self._abbreviation_index = {}
+        for category, terms in self.term_db.items():
+            for term_info in terms.values():
+                primary = self._format_for_c_naming(term_info.get('primary', ''))
+                abbr = self._format_for_c_naming(term_info.get('abbreviation', ''))
+                if primary and abbr and len(abbr) < len(primary):
+                    self._abbreviation_index.setdefault(primary, abbr)
+        
+        # English -> (Chinese, kind); primaries win over abbreviations, which
+        # win over alternatives, then database order
+        self._reverse_index = {}
+        for term_cn, (category, term_info) in self._term_index.items():
+            self._add_reverse_entry(term_info.get('primary', ''), term_cn, 'primary')
+        for term_cn, (category, term_info) in self._term_index.items():
+            self._add_reverse_entry(term_info.get('abbreviation', ''), term_cn, 'abbreviation')
+        for term_cn, (category, term_info) in self._term_index.items():
+            for alt in term_info.get('alternatives', []):
+                self._add_reverse_entry(alt, term_cn, 'alternative')
+        self._reverse_max_words = max(
+            (english.count('_') + 1 for english in self._reverse_index), default=1
+        )
+    
+    def _add_reverse_entry(self, english: str, chinese: str, kind: str):
+        """Add one English form to the reverse index (first entry wins)"""
+        english = self._format_for_c_naming(english)
+        if english:
+            self._reverse_index.setdefault(english, (chinese, kind))
+    
+    def get_abbreviation(self, english: str) -> str:
+        """
+        Get the term database abbreviation of an English primary translation
+        
+        Args:
+            english: English word or phrase in C naming form (e.g. 'stepper_motor')
+            
+        Returns:
+            str: Abbreviation, or '' if the database has no shorter form
+        """
+        return self._abbreviation_index.get(english, '')
+    
+    def reverse_lookup(self, english: str):
+        """
+        Look up the Chinese term for an English primary, abbreviation or alternative
+        
+        Args:
+            english: English word or phrase in C naming form (e.g. 'sample', 'cnt')
+            
+        Returns:
+            tuple: (chinese, kind) where kind is 'primary', 'abbreviation' or
+                'alternative', or None if unknown
+        """
+        return self._reverse_index.get(english)
+    
+    def segment_identifier(self, identifier: str) -> List[Dict]:
+        """
+        Split an identifier into words and map them back to Chinese terms
+        
+        Words come from snake_case and camelCase boundaries. Adjacent words are
+        matched greedily against the reverse index, longest phrase first, so
+        'stepper_motor' maps to one term instead of two.
+        
+        Args:
+            identifier: Identifier or identifier fragment (e.g. 'adc_sample_cnt')
+            
+        Returns:
+            list: [{'english': str, 'chinese': str, 'kind': str}], chinese and
+                kind are '' for words that are not in the term database
+        """
+        words = [word.lower() for word in _IDENT_WORD_RE.findall(identifier)]
+        segments = []
+        i = 0
+        while i < len(words):
+            for size in range(min(self._reverse_max_words, len(words) - i), 0, -1):
+                phrase = '_'.join(words[i:i + size])
+                entry = self._reverse_index.get(phrase)
+                if entry:
+                    segments.append({'english': phrase, 'chinese': entry[0], 'kind': entry[1]})
+                    i += size
+                    break
+            else:
+                segments.append({'english': words[i], 'chinese': '', 'kind': ''})
+                i += 1
+        return segments
+    
+    def _resolve_context(self, context: str) -> str:
+        """Map a context to the ranking table it uses ('general' if none)"""
+        return context if self._context_tables.get(context) else 'general'
+    
+    def _lookup_term(self, chinese_text: str, context: str = 'general'):
+        """
+        Look up a term using the ranking table of the given context
+        
+        Returns:
+            tuple: (category, term_info), or None if not found
+        """
+        table = self._context_tables.get(context)
+        if table:
+            entry = table.get(chinese_text)
+            if entry:
+                return entry
+        return self._term_index.get(chinese_text)
     
     def translate(self, chinese_text: str, context: str = 'general') -> Dict:
         """
@@ -131,7 +308,8 @@ class TranslationEngine:
         
         Args:
             chinese_text: Chinese text
-            context: Context type
+            context: Context type (e.g. 'array', 'struct', 'enum'); selects the
+                per-context ranking table for terms found in several categories
             
         Returns:
             dict: Translation result {
@@ -166,25 +344,28 @@ class TranslationEngine:
                 'source': 'already_english'
             }
         
+        # Contexts without their own ranking table share the 'general' entries
+        context = self._resolve_context(context)
+        
         # Check cache
-        cache_key = f"{chinese_text}_{context}"
+        cache_key = (chinese_text, context)
         if cache_key in self.translation_cache:
             return self.translation_cache[cache_key]
         
         # Strategy 1: Exact match in term database
-        result = self._query_term_database(chinese_text, context)
+        result = self._query_term_database(chinese_text, context, allow_partial=False)
         if result['confidence'] >= 1.0:
             self.translation_cache[cache_key] = result
             return result
         
         # Strategy 2: Pattern matching
-        pattern_result = self._try_pattern_match(chinese_text)
+        pattern_result = self._try_pattern_match(chinese_text, context)
         if pattern_result and pattern_result['confidence'] >= 0.8:
             self.translation_cache[cache_key] = pattern_result
             return pattern_result
         
         # Strategy 3: Smart segmentation translation
-        parts_result = self._translate_by_smart_segmentation(chinese_text)
+        parts_result = self._translate_by_smart_segmentation(chinese_text, context)
         if parts_result['confidence'] >= 0.6:
             self.translation_cache[cache_key] = parts_result
             return parts_result
@@ -201,38 +382,43 @@ class TranslationEngine:
         english_chars = re.findall(r'[a-zA-Z0-9_]', text)
         return len(english_chars) / len(text) > 0.8 if text else False
     
-    def _query_term_database(self, chinese_text: str, context: str) -> Dict:
+    def _query_term_database(self, chinese_text: str, context: str,
+                             allow_partial: bool = True) -> Dict:
         """
         Query term database (supports exact and partial matching)
         
         Args:
             chinese_text: Chinese text
             context: Context
+            allow_partial: Whether to try partial matching when there is no
+                exact match. Partial matching scans the whole database, so
+                callers that only accept exact hits should pass False.
             
         Returns:
             dict: Translation result
         """
         # 1. Exact match
-        for category, terms in self.term_db.items():
-            if chinese_text in terms:
-                term_info = terms[chinese_text]
-                primary = term_info.get('primary', '')
-                alternatives = term_info.get('alternatives', [])
-                pinyin = self.pinyin_converter.text_to_pinyin(chinese_text)
-                
-                return {
-                    'primary': primary,
-                    'alternatives': alternatives,
-                    'pinyin': pinyin,
-                    'confidence': 1.0,
-                    'source': 'term_db_exact',
-                    'category': category
-                }
+        entry = self._lookup_term(chinese_text, context)
+        if entry:
+            category, term_info = entry
+            primary = term_info.get('primary', '')
+            alternatives = term_info.get('alternatives', [])
+            pinyin = self.pinyin_converter.text_to_pinyin(chinese_text)
+            
+            return {
+                'primary': primary,
+                'alternatives': alternatives,
+                'pinyin': pinyin,
+                'confidence': 1.0,
+                'source': 'term_db_exact',
+                'category': category
+            }
         
         # 2. Partial matching (text contains terms)
-        best_partial = self._find_best_partial_match(chinese_text)
-        if best_partial:
-            return best_partial
+        if allow_partial:
+            best_partial = self._find_best_partial_match(chinese_text, context)
+            if best_partial:
+                return best_partial
         
         # 3. No match
         pinyin = self.pinyin_converter.text_to_pinyin(chinese_text)
@@ -244,19 +430,19 @@ class TranslationEngine:
             'source': 'not_found'
         }
     
-    def _find_best_partial_match(self, chinese_text: str) -> Dict:
+    def _find_best_partial_match(self, chinese_text: str, context: str = 'general') -> Dict:
         """Find best partial match"""
         matches = []
         
-        for category, terms in self.term_db.items():
-            for term_cn, term_info in terms.items():
-                if term_cn in chinese_text and len(term_cn) > 1:
-                    matches.append({
-                        'term_cn': term_cn,
-                        'term_en': term_info.get('primary', ''),
-                        'length': len(term_cn),
-                        'category': category
-                    })
+        for term_cn in self._term_index:
+            if term_cn in chinese_text and len(term_cn) > 1:
+                category, term_info = self._lookup_term(term_cn, context)
+                matches.append({
+                    'term_cn': term_cn,
+                    'term_en': term_info.get('primary', ''),
+                    'length': len(term_cn),
+                    'category': category
+                })
         
         if not matches:
             return None
@@ -269,7 +455,7 @@ class TranslationEngine:
         result_parts = []
         for part in parts:
             if part:
-                part_trans = self._translate_by_smart_segmentation(part)
+                part_trans = self._translate_by_smart_segmentation(part, context)
                 result_parts.append(part_trans['primary'])
             result_parts.append(best['term_en'])
         
@@ -286,15 +472,15 @@ class TranslationEngine:
             'matched_term': best['term_cn']
         }
     
-    def _try_pattern_match(self, chinese_text: str) -> Dict:
+    def _try_pattern_match(self, chinese_text: str, context: str = 'general') -> Dict:
         """Try pattern matching"""
         for pattern, handler in self.common_patterns:
             match = re.match(pattern, chinese_text)
             if match:
-                return handler(match)
+                return handler(match, context)
         return None
     
-    def _translate_verb_noun(self, match) -> Dict:
+    def _translate_verb_noun(self, match, context: str = 'general') -> Dict:
         """Translate verb+noun pattern"""
         verb_map = {
             '读': 'read', '写': 'write', '发送': 'send', '接收': 'receive',
@@ -306,7 +492,7 @@ class TranslationEngine:
         noun = match.group(2)
         
         verb_en = verb_map.get(verb, self.pinyin_converter.to_pinyin(verb))
-        noun_result = self.translate(noun) if noun else {'primary': ''}
+        noun_result = self.translate(noun, context) if noun else {'primary': ''}
         
         primary = f"{verb_en}_{noun_result['primary']}" if noun_result['primary'] else verb_en
         primary = self._format_for_c_naming(primary)
@@ -319,7 +505,7 @@ class TranslationEngine:
             'source': 'pattern_verb_noun'
         }
     
-    def _translate_adj_noun(self, match) -> Dict:
+    def _translate_adj_noun(self, match, context: str = 'general') -> Dict:
         """Translate adjective+noun pattern"""
         adj_map = {
             '最大': 'max', '最小': 'min', '当前': 'current', '平均': 'average',
@@ -330,7 +516,7 @@ class TranslationEngine:
         noun = match.group(2)
         
         adj_en = adj_map.get(adj, self.pinyin_converter.to_pinyin(adj))
-        noun_result = self.translate(noun) if noun else {'primary': ''}
+        noun_result = self.translate(noun, context) if noun else {'primary': ''}
         
         primary = f"{adj_en}_{noun_result['primary']}" if noun_result['primary'] else adj_en
         primary = self._format_for_c_naming(primary)
@@ -343,7 +529,7 @@ class TranslationEngine:
             'source': 'pattern_adj_noun'
         }
     
-    def _translate_number_unit(self, match) -> Dict:
+    def _translate_number_unit(self, match, context: str = 'general') -> Dict:
         """Translate number+unit pattern"""
         unit_map = {
             '米': 'meter', '秒': 'second', '度': 'degree',
@@ -364,7 +550,7 @@ class TranslationEngine:
             'source': 'pattern_number_unit'
         }
     
-    def _translate_by_smart_segmentation(self, chinese_text: str) -> Dict:
+    def _translate_by_smart_segmentation(self, chinese_text: str, context: str = 'general') -> Dict:
         """
         Smart segmentation translation
         
@@ -375,6 +561,7 @@ class TranslationEngine:
         """
         text_len = len(chinese_text)
         parts = []
+        segments = []
         alternatives_list = []
         i = 0
         
@@ -384,9 +571,10 @@ class TranslationEngine:
             # Try 3-character word
             if i + 3 <= text_len:
                 three_char = chinese_text[i:i+3]
-                result = self._query_term_database(three_char, 'general')
+                result = self._query_term_database(three_char, context, allow_partial=False)
                 if result['confidence'] >= 1.0:
                     parts.append(result['primary'])
+                    segments.append(three_char)
                     if result.get('alternatives'):
                         alternatives_list.append(result['alternatives'][0])
                     i += 3
@@ -396,9 +584,10 @@ class TranslationEngine:
             # Try 2-character word
             if i + 2 <= text_len:
                 two_char = chinese_text[i:i+2]
-                result = self._query_term_database(two_char, 'general')
+                result = self._query_term_database(two_char, context, allow_partial=False)
                 if result['confidence'] >= 1.0:
                     parts.append(result['primary'])
+                    segments.append(two_char)
                     if result.get('alternatives'):
                         alternatives_list.append(result['alternatives'][0])
                     i += 2
@@ -407,14 +596,16 @@ class TranslationEngine:
             
             # Single character processing
             char = chinese_text[i]
-            char_result = self._query_term_database(char, 'general')
+            char_result = self._query_term_database(char, context, allow_partial=False)
             if char_result['confidence'] >= 1.0:
                 parts.append(char_result['primary'])
+                segments.append(char)
                 if char_result.get('alternatives'):
                     alternatives_list.append(char_result['alternatives'][0])
             else:
                 # Use pinyin
                 parts.append(self.pinyin_converter.to_pinyin(char))
+                segments.append(None)
             
             i += 1
         
@@ -433,7 +624,8 @@ class TranslationEngine:
             'pinyin': self.pinyin_converter.text_to_pinyin(chinese_text),
             'confidence': 0.6,
             'source': 'smart_segmentation',
-            'parts': parts
+            'parts': parts,
+            'segments': segments
         }
     
     def _translate_to_pinyin(self, chinese_text: str) -> Dict:
@@ -459,79 +651,135 @@ class TranslationEngine:
         Returns:
             str: Formatted text
         """
-        # To lowercase
-        text = text.lower()
-        # Replace spaces with underscores
-        text = text.replace(' ', '_')
-        text = text.replace('-', '_')
-        # Remove special characters, keep only letters, numbers and underscores
-        text = re.sub(r'[^a-z0-9_]', '_', text)
-        # Remove consecutive underscores
-        text = re.sub(r'_+', '_', text)
+        # Lowercase, map separators, collapse invalid runs to a single '_'
+        text = _C_NAME_INVALID_RE.sub('_', text.translate(_C_NAME_TRANS))
         # Remove leading/trailing underscores
-        text = text.strip('_')
+        return text.strip('_')
+    
+    def format_identifiers(self, texts: List[str]) -> List[str]:
+        """
+        Format a batch of strings for C naming conventions in one pass
+        
+        The batch is joined, normalized with a single translate/regex pass and
+        split again, so the per-string overhead is just the final strip.
+        
+        Args:
+            texts: Original texts
+            
+        Returns:
+            list: Formatted texts, in input order
+        """
+        if not texts:
+            return []
         
-        return text
+        joined = _C_NAME_INVALID_RE.sub('_', '\n'.join(texts).translate(_C_NAME_BATCH_TRANS))
+        formatted = joined.split('\n')
+        
+        # Inputs containing a newline shift the split; fall back per item
+        if len(formatted) != len(texts):
+            return [self._format_for_c_naming(text) for text in texts]
+        
+        return [text.strip('_') for text in formatted]
     
-    def get_translation_suggestions(self, chinese_text: str, max_suggestions: int = 5) -> List[Dict]:
+    def get_translation_suggestions(self, chinese_text: str, max_suggestions: int = 5,
+                                    context: str = 'general') -> List[Dict]:
         """
         Get multiple translation suggestions (enhanced version)
         
+        Suggestion lists for every glossary term are precomputed when the term
+        database is loaded (read-only index); other texts are computed on
+        demand and kept in a bounded LRU cache.
+        
         Args:
             chinese_text: Chinese text
             max_suggestions: Maximum number of suggestions
+            context: Context type
             
         Returns:
             list: Suggestion list, each suggestion contains {'text': str, 'source': str, 'confidence': float}
         """
+        chinese_text = chinese_text.strip()
+        key = (chinese_text, self._resolve_context(context))
+        
+        suggestions = self._suggestion_index.get(key)
+        if suggestions is None:
+            suggestions = self._cached_suggestions(chinese_text, key)
+        
+        return suggestions[:max_suggestions]
+    
+    def _cached_suggestions(self, chinese_text: str, key: Tuple[str, str]) -> List[Dict]:
+        """Suggestions for a non-glossary text, served from the bounded LRU cache"""
+        cache = self._suggestion_cache
+        suggestions = cache.get(key)
+        if suggestions is not None:
+            cache.move_to_end(key)
+            return suggestions
+        
+        suggestions = self._build_suggestions(chinese_text, key[1])
+        cache[key] = suggestions
+        if len(cache) > self.SUGGESTION_CACHE_SIZE:
+            cache.popitem(last=False)
+        return suggestions
+    
+    def _build_suggestion_index(self):
+        """Precompute suggestion lists for all glossary terms and context overrides"""
+        self._suggestion_index = {}
+        self._suggestion_cache.clear()
+        for term_cn in self._term_index:
+            self._suggestion_index[(term_cn, 'general')] = self._build_suggestions(term_cn, 'general')
+        for context, table in self._context_tables.items():
+            for term_cn in table:
+                self._suggestion_index[(term_cn, context)] = self._build_suggestions(term_cn, context)
+    
+    def _build_suggestions(self, chinese_text: str, context: str) -> List[Dict]:
+        """
+        Build the full suggestion list (up to SUGGESTION_INDEX_SIZE entries)
+        
+        Order: main translation, alternatives, pinyin, abbreviation. For
+        segmented phrases, variants that swap one part for an alternative from
+        that part's cached suggestion list are added after the alternatives.
+        Any prefix of the list equals the result for a smaller max_suggestions.
+        """
+        limit = self.SUGGESTION_INDEX_SIZE
         suggestions = []
         seen = set()
         
+        def add(text, source, confidence):
+            if text and text not in seen and len(suggestions) < limit:
+                suggestions.append({'text': text, 'source': source, 'confidence': confidence})
+                seen.add(text)
+        
         # Main translation
-        result = self.translate(chinese_text)
-        if result['primary'] and result['primary'] not in seen:
-            suggestions.append({
-                'text': result['primary'],
-                'source': result.get('source', 'unknown'),
-                'confidence': result.get('confidence', 0)
-            })
-            seen.add(result['primary'])
+        result = self.translate(chinese_text, context)
+        confidence = result.get('confidence', 0)
+        add(result['primary'], result.get('source', 'unknown'), confidence)
         
         # Alternative translations
         for alt in result.get('alternatives', []):
-            if alt and alt not in seen:
-                suggestions.append({
-                    'text': alt,
-                    'source': 'alternative',
-                    'confidence': result.get('confidence', 0) * 0.9
-                })
-                seen.add(alt)
-                if len(suggestions) >= max_suggestions:
-                    break
+            add(alt, 'alternative', confidence * 0.9)
+        
+        # Composite phrases: swap single parts using cached part suggestions
+        parts = result.get('parts', [])
+        for i, segment in enumerate(result.get('segments', [])):
+            if segment is None:
+                continue
+            part_suggestions = self._suggestion_index.get((segment, context))
+            if part_suggestions is None:
+                part_suggestions = self._suggestion_index.get((segment, 'general'), [])
+            for part_suggestion in part_suggestions:
+                if part_suggestion['source'] != 'alternative':
+                    continue
+                variant = parts[:i] + [part_suggestion['text']] + parts[i + 1:]
+                add(self._format_for_c_naming('_'.join(variant)), 'alternative', confidence * 0.9)
         
-        # Pinyin form (if not yet reached quantity limit)
-        if len(suggestions) < max_suggestions:
-            pinyin = result.get('pinyin', '')
-            if pinyin and pinyin not in seen:
-                suggestions.append({
-                    'text': pinyin,
-                    'source': 'pinyin',
-                    'confidence': 0.3
-                })
-                seen.add(pinyin)
+        # Pinyin form
+        add(result.get('pinyin', ''), 'pinyin', 0.3)
         
         # Abbreviation form
-        if len(suggestions) < max_suggestions and result['primary']:
-            abbr = self._generate_abbreviation(result['primary'])
-            if abbr and abbr not in seen:
-                suggestions.append({
-                    'text': abbr,
-                    'source': 'abbreviation',
-                    'confidence': 0.5
-                })
-                seen.add(abbr)
+        if result['primary']:
+            add(self._generate_abbreviation(result['primary']), 'abbreviation', 0.5)
         
-        return suggestions[:max_suggestions]
+        return suggestions
     
     def _generate_abbreviation(self, text: str) -> str:
         """Generate abbreviation"""
@@ -543,9 +791,37 @@ class TranslationEngine:
         abbr = ''.join([p[0] for p in parts if p])
         return abbr if len(abbr) > 1 else ''
     
-    def batch_translate(self, text_list: List[str]) -> List[Dict]:
-        """Batch translation"""
-        return [self.translate(text) for text in text_list]
+    def batch_translate(self, text_list: List[str], context: str = 'general') -> List[Dict]:
+        """
+        Batch translation
+        
+        Duplicate inputs are translated once, and inputs that are already
+        English are formatted together with format_identifiers().
+        """
+        unique = {}
+        english = []
+        for text in text_list:
+            stripped = text.strip()
+            if stripped in unique:
+                continue
+            unique[stripped] = None
+            if stripped and self._is_english(stripped):
+                english.append(stripped)
+        
+        for text, formatted in zip(english, self.format_identifiers(english)):
+            unique[text] = {
+                'primary': formatted,
+                'alternatives': [],
+                'pinyin': formatted,
+                'confidence': 1.0,
+                'source': 'already_english'
+            }
+        
+        for text, result in unique.items():
+            if result is None:
+                unique[text] = self.translate(text, context)
+        
+        return [unique[text.strip()] for text in text_list]
     
     def get_all_categories(self) -> List[str]:
         """Get all term categories"""
@@ -626,8 +902,10 @@ class TranslationEngine:
             'custom': True
         }
         
-        # Clear related cache
+        # Rebuild lookup tables and clear related cache
+        self._build_term_index()
         self.translation_cache.clear()
+        self._build_suggestion_index()
     
     def get_statistics(self) -> Dict:
         """Get term database statistics"""
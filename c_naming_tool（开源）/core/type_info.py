@@ -5,17 +5,36 @@
 
 import json
 import os
+from .config import config_service
 
 
 class TypeInfo:
     """类型信息管理类"""
     
+    # 整数基本类型（按大小递增），定宽整型按大小匹配其中之一以确定对齐
+    INTEGER_KINDS = ('char', 'short', 'int', 'long', 'long long')
+    
+    # 非整数类型对应的ABI基本类型
+    TYPE_KINDS = {
+        'bool': '_Bool',
+        'float': 'float',
+        'double': 'double',
+    }
+    
+    # 与指针同宽的类型
+    POINTER_SIZED_TYPES = ('size_t', 'ptrdiff_t', 'intptr_t', 'uintptr_t')
+    
     def __init__(self):
         """初始化类型信息"""
         self.type_ranges = {}
         self.type_prefixes = {}
         self.array_prefixes = {}
+        self.abi_profiles = {}   # ABI名称 -> 说明
+        self.abi_profile = None  # 当前ABI
+        self._abi_tables = {}    # ABI名称 -> {类型: (大小, 对齐)}
+        self._hard_float = {}    # ABI名称 -> 有硬件浮点支持的类型
         self.load_type_data()
+        self.load_abi_profiles()
     
     def load_type_data(self):
         """从配置文件加载类型数据"""
@@ -34,6 +53,149 @@ class TypeInfo:
         except Exception as e:
             print(f"加载类型数据失败: {e}")
     
+    def load_abi_profiles(self):
+        """加载目标平台ABI，并为每个ABI预先展开类型大小/对齐表"""
+        data = config_service.get('abi_profiles', {})
+        profiles = data.get('profiles', {})
+        
+        self.abi_profiles = {
+            name: profile.get('description', '') for name, profile in profiles.items()
+        }
+        self._abi_tables = {
+            name: self._build_abi_table(profile.get('types', {}))
+            for name, profile in profiles.items()
+        }
+        self._hard_float = {
+            name: frozenset(profile.get('hard_float', ('float', 'double')))
+            for name, profile in profiles.items()
+        }
+        
+        default = data.get('default')
+        if default not in self._abi_tables:
+            default = next(iter(self._abi_tables), None)
+        self.abi_profile = default
+    
+    def _build_abi_table(self, base_types):
+        """
+        展开单个ABI的类型表
+        
+        Args:
+            base_types: {C基本类型: [大小, 对齐]}
+        
+        Returns:
+            dict: {类型名称: (大小, 对齐)}，包含基本类型、signed/unsigned 变体、
+                  指针同宽类型以及 type_ranges 中的所有类型
+        """
+        table = {kind: tuple(layout) for kind, layout in base_types.items()}
+        
+        for kind in self.INTEGER_KINDS:
+            if kind in table:
+                table[f'signed {kind}'] = table[kind]
+                table[f'unsigned {kind}'] = table[kind]
+        
+        if 'pointer' in table:
+            for type_name in self.POINTER_SIZED_TYPES:
+                table[type_name] = table['pointer']
+        
+        for type_name, info in self.type_ranges.items():
+            if type_name in table:
+                continue
+            kind = self.TYPE_KINDS.get(type_name)
+            if kind is None:
+                # 定宽整型：取大小相同的整数基本类型的对齐
+                kind = next((k for k in self.INTEGER_KINDS
+                             if k in table and table[k][0] == info.get('bytes')), None)
+            if kind in table:
+                table[type_name] = table[kind]
+        
+        return table
+    
+    def get_abi_profiles(self):
+        """获取所有ABI名称"""
+        return list(self._abi_tables.keys())
+    
+    def set_abi_profile(self, profile):
+        """
+        切换当前ABI
+        
+        Returns:
+            bool: 是否切换成功
+        """
+        if profile not in self._abi_tables:
+            return False
+        self.abi_profile = profile
+        return True
+    
+    def has_hardware_float(self, type_name, profile=None):
+        """
+        浮点类型在指定ABI下是否有硬件FPU支持（否则为软件浮点）
+        
+        Args:
+            type_name: 类型名称（float/double）
+            profile: ABI名称，None 时使用当前ABI
+        
+        Returns:
+            bool: 有硬件支持或不是浮点类型时为 True
+        """
+        if not self.is_float_type(type_name):
+            return True
+        hard_float = self._hard_float.get(profile or self.abi_profile)
+        if hard_float is None:
+            return True
+        kind = self.TYPE_KINDS.get(type_name, type_name)
+        return self.effective_float_type(kind, profile) in hard_float
+    
+    def effective_float_type(self, type_name, profile=None):
+        """
+        获取浮点类型在指定ABI下实际对应的类型
+        
+        double 与 float 同宽（如 AVR）时 double 即为 float，
+        取值范围和精度应按 float 计算。
+        
+        Args:
+            type_name: 类型名称
+            profile: ABI名称，None 时使用当前ABI
+        
+        Returns:
+            str: 实际类型名称，非浮点类型原样返回
+        """
+        if (type_name == 'double' and
+                self.get_type_size('double', profile) == self.get_type_size('float', profile)):
+            return 'float'
+        return type_name
+    
+    def get_type_layout(self, type_name, profile=None):
+        """
+        获取类型在指定ABI下的大小和对齐
+        
+        Args:
+            type_name: 类型名称（支持以 * 结尾的指针类型）
+            profile: ABI名称，None 时使用当前ABI
+        
+        Returns:
+            tuple: (字节数, 对齐字节数)，未知类型为 (0, 1)
+        """
+        table = self._abi_tables.get(profile or self.abi_profile)
+        if table is None:
+            # 没有ABI配置时沿用旧的假设：按自身大小对齐，最大4字节
+            size = self.get_type_info(type_name).get('bytes', 0)
+            return (size, max(1, min(size, 4)))
+        
+        layout = table.get(type_name)
+        if layout is None:
+            if type_name.endswith('*'):
+                return table.get('pointer', (0, 1))
+            return (0, 1)
+        return layout
+    
+    def get_type_size(self, type_name, profile=None):
+        """获取类型在指定ABI下的字节数"""
+        return self.get_type_layout(type_name, profile)[0]
+    
+    def get_type_alignment(self, type_name, profile=None):
+        """获取类型在指定ABI下的对齐字节数"""
+        return self.get_type_layout(type_name, profile)[1]
+    
     def get_type_info(self, type_name):
         """
         获取指定类型的详细信息
@@ -61,17 +223,18 @@ class TypeInfo:
             return self.array_prefixes.get(type_name, 'a')
         return self.type_prefixes.get(type_name, '')
     
-    def get_range_str(self, type_name):
+    def get_range_str(self, type_name, profile=None):
         """
         获取类型的取值范围字符串
         
         Args:
             type_name: 类型名称
+            profile: ABI名称，None 时使用当前ABI
             
         Returns:
             str: 取值范围字符串
         """
-        info = self.get_type_info(type_name)
+        info = self.get_type_info(self.effective_float_type(type_name, profile))
         if not info:
             return "未知范围"
         
@@ -90,23 +253,22 @@ class TypeInfo:
         
         return "未知范围"
     
-    def get_memory_size(self, type_name, array_size=None):
+    def get_memory_size(self, type_name, array_size=None, profile=None):
         """
         计算内存占用大小
         
         Args:
             type_name: 类型名称
             array_size: 数组大小（如果是数组）
+            profile: ABI名称，None 时使用当前ABI
             
         Returns:
             tuple: (字节数, 格式化字符串)
         """
-        info = self.get_type_info(type_name)
-        if not info:
+        bytes_per_element = self.get_type_size(type_name, profile)
+        if not bytes_per_element:
             return (0, "未知")
         
-        bytes_per_element = info.get('bytes', 0)
-        
         if array_size:
             total_bytes = bytes_per_element * array_size
         else:
@@ -122,6 +284,19 @@ class TypeInfo:
             mb = total_bytes / (1024 * 1024)
             return (total_bytes, f"{total_bytes} bytes ({mb:.4f} MB)")
     
+    def get_memory_footprints(self, type_name, array_size=None):
+        """
+        计算在所有ABI下的内存占用
+        
+        Returns:
+            dict: {ABI名称: 字节数}
+        """
+        count = array_size or 1
+        return {
+            profile: self.get_type_layout(type_name, profile)[0] * count
+            for profile in self._abi_tables
+        }
+    
     def get_all_types(self):
         """获取所有可用的类型列表"""
         return list(self.type_ranges.keys())
@@ -166,13 +341,20 @@ class TypeInfo:
             'type': type_name,
             'description': info.get('description', ''),
             'range': self.get_range_str(type_name),
-            'bytes': info.get('bytes', 0),
+            'bytes': self.get_type_size(type_name) or info.get('bytes', 0),
             'signed': info.get('signed', False),
             'notes': info.get('notes', [])
         }
         
         # 浮点类型的额外信息
         if self.is_float_type(type_name):
+            effective_type = self.effective_float_type(type_name)
+            if effective_type != type_name:
+                info = self.get_type_info(effective_type)
+                display_info['notes'] = display_info['notes'] + [
+                    f"当前ABI下 {type_name} 与 {effective_type} 相同（{display_info['bytes']} bytes），"
+                    f"范围和精度按 {effective_type} 计算"
+                ]
             display_info['precision'] = info.get('precision', 0)
             display_info['decimal_places'] = info.get('decimal_places', '')
             if 'min_positive' in info:
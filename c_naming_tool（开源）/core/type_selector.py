@@ -0,0 +1,218 @@
+"""
+类型选择模块
+根据取值范围（及可选的分辨率）选出能容纳的最窄整型，支持按结构体/信号表批量选择
+"""
+
+import math
+from bisect import bisect_left
+from .type_info import type_info_manager
+from .layout import layout_engine
+
+
+class TypeSelector:
+    """最窄类型选择"""
+    
+    # 不参与选择的类型（char 的符号由实现决定，bool 只能存 0/1）
+    EXCLUDED_TYPES = ('char', 'bool')
+    
+    def __init__(self):
+        """初始化类型选择"""
+        self._cache = {}
+        self.build_tables()
+    
+    def build_tables(self):
+        """按最大值排序整型，建立有符号/无符号两张范围表"""
+        unsigned = []
+        signed = []
+        for type_name, info in type_info_manager.type_ranges.items():
+            if type_name in self.EXCLUDED_TYPES or type_info_manager.is_float_type(type_name):
+                continue
+            entry = (info['max'], info['bytes'], info['min'], type_name)
+            (signed if info.get('signed') else unsigned).append(entry)
+        
+        self._unsigned = sorted(unsigned)
+        self._unsigned_max = [entry[0] for entry in self._unsigned]
+        self._signed = sorted(signed)
+        self._signed_max = [entry[0] for entry in self._signed]
+        self._cache.clear()
+    
+    @staticmethod
+    def parse_number(text):
+        """
+        解析数值文本（支持十进制、十六进制、小数）
+        
+        Returns:
+            int/float，空文本或无法解析时返回 None
+        """
+        text = str(text).strip()
+        if not text:
+            return None
+        try:
+            return int(text, 0)
+        except ValueError:
+            pass
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    
+    def select(self, min_value, max_value, resolution=None):
+        """
+        选择能容纳取值范围的最窄整型
+        
+        有分辨率时按 值/分辨率 的定点整数选择；没有分辨率且范围含小数时选 float。
+        
+        Args:
+            min_value: 最小值
+            max_value: 最大值
+            resolution: 分辨率（如 0.1 表示存储 值×10），None 表示按整数存储
+        
+        Returns:
+            dict: {
+                'type': 类型名称，没有能容纳的类型时为 None,
+                'bytes': 字节数,
+                'min': 存储的最小整数,
+                'max': 存储的最大整数,
+                'resolution': 分辨率
+            }
+        """
+        key = (min_value, max_value, resolution)
+        result = self._cache.get(key)
+        if result is None:
+            result = self._select(min_value, max_value, resolution)
+            self._cache[key] = result
+        return result
+    
+    def _select(self, min_value, max_value, resolution):
+        """查范围表"""
+        if min_value > max_value:
+            min_value, max_value = max_value, min_value
+        
+        if resolution:
+            low = math.floor(min_value / resolution)
+            high = math.ceil(max_value / resolution)
+        elif min_value != int(min_value) or max_value != int(max_value):
+            size = type_info_manager.get_type_info('float').get('bytes', 4)
+            return {'type': 'float', 'bytes': size, 'min': min_value,
+                    'max': max_value, 'resolution': None}
+        else:
+            low, high = int(min_value), int(max_value)
+        
+        if low >= 0:
+            index = bisect_left(self._unsigned_max, high)
+            candidates = self._unsigned[index:]
+        else:
+            index = bisect_left(self._signed_max, high)
+            candidates = self._signed[index:]
+        
+        for type_max, size, type_min, type_name in candidates:
+            if type_min <= low:
+                return {'type': type_name, 'bytes': size, 'min': low,
+                        'max': high, 'resolution': resolution}
+        return {'type': None, 'bytes': 0, 'min': low, 'max': high, 'resolution': resolution}
+    
+    def select_many(self, ranges):
+        """
+        批量选择（信号表等）
+        
+        Args:
+            ranges: [(最小值, 最大值)] 或 [(最小值, 最大值, 分辨率)]
+        
+        Returns:
+            list: select() 的结果列表，顺序与输入一致
+        """
+        return [self.select(*item) for item in ranges]
+    
+    def compare(self, current_type, min_value, max_value, resolution=None):
+        """
+        与当前选择的类型比较
+        
+        Returns:
+            dict: select() 的结果，附加 'current_type'、'current_bytes'、
+                  'saved'（每个变量节省的字节数）、
+                  'fits'（当前类型能否容纳该范围，大小相同但符号或范围不对时也为 False）
+        """
+        result = dict(self.select(min_value, max_value, resolution))
+        current_info = type_info_manager.get_type_info(current_type)
+        current_bytes = current_info.get('bytes', 0)
+        result['current_type'] = current_type
+        result['current_bytes'] = current_bytes
+        result['saved'] = current_bytes - result['bytes'] if result['type'] else 0
+        result['fits'] = self._fits(current_type, current_info, min_value, max_value, result)
+        return result
+    
+    @staticmethod
+    def _fits(current_type, current_info, min_value, max_value, selection):
+        """当前类型能否容纳取值范围（整型按存储的整数值比较，浮点按原值比较）"""
+        if 'min' not in current_info or 'max' not in current_info:
+            return False
+        if type_info_manager.is_float_type(current_type):
+            low, high = min(min_value, max_value), max(min_value, max_value)
+        else:
+            low, high = selection['min'], selection['max']
+            if low != int(low) or high != int(high):
+                # 没有分辨率的小数范围，整型放不下
+                return False
+        return current_info['min'] <= low and high <= current_info['max']
+    
+    def select_members(self, members, profile=None, array_count=1):
+        """
+        为结构体中带 'min'/'max'（可选 'resolution'）的成员选择最窄类型
+        
+        Args:
+            members: 成员列表
+            profile: ABI名称，None 时使用当前ABI
+            array_count: 结构体数组的元素个数
+        
+        Returns:
+            dict: {
+                'members': 换成建议类型后的成员列表,
+                'changes': [{'name', 'from', 'to', 'resolution'}],
+                'unfit': 没有类型能容纳的成员名称列表,
+                'profile': ABI名称,
+                'original_size': 原大小,
+                'optimized_size': 换类型后的大小,
+                'saved': 每个结构体节省的字节数,
+                'member_saved': 成员本身节省的字节数（不计填充，可配合成员重排兑现）,
+                'array_count': 数组元素个数,
+                'array_saved': 整个数组节省的字节数
+            }
+        """
+        selected = []
+        changes = []
+        unfit = []
+        for member in members:
+            if member.get('min') is None or member.get('max') is None:
+                selected.append(member)
+                continue
+            
+            result = self.select(member['min'], member['max'], member.get('resolution'))
+            if result['type'] is None:
+                unfit.append(member['name'])
+                selected.append(member)
+            elif result['type'] != member['type']:
+                changes.append({'name': member['name'], 'from': member['type'],
+                                'to': result['type'], 'resolution': result['resolution']})
+                selected.append(dict(member, type=result['type']))
+            else:
+                selected.append(member)
+        
+        original = layout_engine.layout(members, profile=profile)
+        optimized = layout_engine.layout(selected, profile=profile)
+        saved = original['size'] - optimized['size']
+        return {
+            'members': selected,
+            'changes': changes,
+            'unfit': unfit,
+            'profile': original['profile'],
+            'original_size': original['size'],
+            'optimized_size': optimized['size'],
+            'saved': saved,
+            'member_saved': original['data_size'] - optimized['data_size'],
+            'array_count': array_count,
+            'array_saved': saved * array_count,
+        }
+
+
+# 全局实例
+type_selector = TypeSelector()
@@ -0,0 +1,216 @@
+"""
+标识符校验模块
+按C语言标准、保留标识符规则、长度限制和项目命名风格校验标识符
+"""
+
+import re
+from .config import config_service
+
+
+# 各C标准的关键字（后一标准包含前一标准）
+_C89_KEYWORDS = frozenset([
+    'auto', 'break', 'case', 'char', 'const', 'continue', 'default', 'do',
+    'double', 'else', 'enum', 'extern', 'float', 'for', 'goto', 'if',
+    'int', 'long', 'register', 'return', 'short', 'signed', 'sizeof', 'static',
+    'struct', 'switch', 'typedef', 'union', 'unsigned', 'void', 'volatile', 'while'
+])
+_C99_KEYWORDS = _C89_KEYWORDS | frozenset([
+    'inline', 'restrict', '_Bool', '_Complex', '_Imaginary'
+])
+_C11_KEYWORDS = _C99_KEYWORDS | frozenset([
+    '_Alignas', '_Alignof', '_Atomic', '_Generic', '_Noreturn',
+    '_Static_assert', '_Thread_local'
+])
+_C23_KEYWORDS = _C11_KEYWORDS | frozenset([
+    'alignas', 'alignof', 'bool', 'constexpr', 'false', 'nullptr',
+    'static_assert', 'thread_local', 'true', 'typeof', 'typeof_unqual',
+    '_BitInt', '_Decimal32', '_Decimal64', '_Decimal128'
+])
+
+
+class IdentifierValidator:
+    """标识符校验器"""
+    
+    KEYWORDS = {
+        'C89': _C89_KEYWORDS,
+        'C99': _C99_KEYWORDS,
+        'C11': _C11_KEYWORDS,
+        'C23': _C23_KEYWORDS,
+    }
+    
+    # 所有标准的关键字（源码扫描等不区分标准的场合使用）
+    ALL_KEYWORDS = _C23_KEYWORDS
+    
+    # 项目命名风格
+    STYLE_PATTERNS = {
+        'snake_case': r'[a-z][a-z0-9]*(?:_[a-z0-9]+)*',
+        'UPPER_CASE': r'[A-Z][A-Z0-9]*(?:_[A-Z0-9]+)*',
+        'camelCase': r'[a-z][a-zA-Z0-9]*',
+        'PascalCase': r'[A-Z][a-zA-Z0-9]*',
+    }
+    
+    _IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+    
+    def __init__(self):
+        """初始化标识符校验器"""
+        self.standard = 'C99'
+        self.max_length = 63  # C99 内部标识符的最少有效字符数
+        self.style = 'snake_case'
+        self.load_rules()
+        config_service.subscribe('settings', lambda data: self.load_rules())
+    
+    def load_rules(self):
+        """从 settings.json 的 validation 节加载校验规则"""
+        rules = config_service.get('settings', {}).get('validation', {})
+        self.standard = rules.get('standard', self.standard)
+        self.max_length = rules.get('max_length', self.max_length)
+        self.style = rules.get('style', self.style)
+        
+        self.configure()
+    
+    def configure(self, standard=None, max_length=None, style=None):
+        """
+        修改校验规则并重新编译
+        
+        Args:
+            standard: C标准（C89/C99/C11/C23）
+            max_length: 最大长度，0 表示不限制
+            style: 命名风格（见 STYLE_PATTERNS），空字符串表示不检查风格
+        """
+        if standard is not None:
+            self.standard = standard
+        if max_length is not None:
+            self.max_length = max_length
+        if style is not None:
+            self.style = style
+        
+        if self.standard not in self.KEYWORDS:
+            print(f"未知的C标准: {self.standard}，使用C99")
+            self.standard = 'C99'
+        if self.style and self.style not in self.STYLE_PATTERNS:
+            print(f"未知的命名风格: {self.style}，不检查风格")
+            self.style = ''
+        
+        self._keywords = self.KEYWORDS[self.standard]
+        self._style_rules = {}
+        self._default_rules = self._compile_style_rules(
+            self.STYLE_PATTERNS[self.style] if self.style else None, self.style
+        )
+    
+    def _compile_style_rules(self, pattern, label):
+        """
+        编译风格检查正则和快速路径
+        
+        快速路径一次匹配即可确认合法、非保留、长度合规且符合风格；
+        关键字仍需查表，这里用所有标准的关键字，以便也能发现未来标准的关键字。
+        
+        Returns:
+            tuple: (风格正则的 fullmatch 或 None, 快速路径 fullmatch, 风格名称)
+        """
+        length = f'(?=[\\s\\S]{{1,{self.max_length}}}\\Z)' if self.max_length else ''
+        body = pattern or r'[A-Za-z_][A-Za-z0-9_]*'
+        style_match = re.compile(pattern).fullmatch if pattern else None
+        fast_match = re.compile(f'{length}(?!_)(?:{body})').fullmatch
+        return style_match, fast_match, label
+    
+    def _get_style_rules(self, style):
+        """获取命名风格（NamingStyle）对应的检查规则，None 时为配置的风格"""
+        if style is None:
+            return self._default_rules
+        rules = self._style_rules.get(style.pattern)
+        if rules is None:
+            rules = self._compile_style_rules(style.pattern, style.name)
+            self._style_rules[style.pattern] = rules
+        return rules
+    
+    def validate(self, name, style=None):
+        """
+        校验单个标识符
+        
+        Args:
+            name: 标识符
+            style: 命名风格（NamingStyle），None 时使用配置的风格
+        
+        Returns:
+            dict: {
+                'valid': 是否为合法且可用的标识符,
+                'issues': 错误列表,
+                'warnings': 警告列表（风格问题、未来标准的关键字等）
+            }
+        """
+        issues = []
+        warnings = []
+        
+        if not name:
+            issues.append("变量名不能为空")
+            return {'valid': False, 'issues': issues, 'warnings': warnings}
+        
+        if not self._IDENTIFIER_RE.fullmatch(name):
+            if not (name[0].isascii() and (name[0].isalpha() or name[0] == '_')):
+                issues.append("变量名必须以字母或下划线开头")
+            if not all(c.isascii() and (c.isalnum() or c == '_') for c in name):
+                issues.append("变量名只能包含字母、数字和下划线")
+        
+        if name in self._keywords:
+            issues.append(f"'{name}' 是C语言关键字，不能用作变量名")
+        elif name in self.ALL_KEYWORDS:
+            newer = next(std for std, keywords in self.KEYWORDS.items() if name in keywords)
+            warnings.append(f"'{name}' 在 {newer} 中是关键字")
+        
+        if name.startswith('__') or (name[0] == '_' and name[1:2].isupper()):
+            issues.append("以双下划线或下划线加大写字母开头的标识符由实现保留")
+        elif name[0] == '_':
+            warnings.append("以下划线开头的标识符在文件作用域中由实现保留")
+        
+        if self.max_length and len(name) > self.max_length:
+            issues.append(f"变量名过长，建议不超过{self.max_length}个字符")
+        
+        style_match, _, style_label = self._get_style_rules(style)
+        if style_match and not name.startswith('_') and not style_match(name):
+            warnings.append(f"不符合项目命名风格 {style_label}")
+        
+        return {
+            'valid': len(issues) == 0,
+            'issues': issues,
+            'warnings': warnings
+        }
+    
+    def is_valid(self, name, style=None):
+        """
+        快速判断标识符是否完全合规（无错误也无警告）
+        
+        Returns:
+            bool: 是否合规
+        """
+        fast_match = self._get_style_rules(style)[1]
+        return fast_match(name) is not None and name not in self.ALL_KEYWORDS
+    
+    def validate_many(self, names, style=None):
+        """
+        批量校验标识符，只返回有问题的结果
+        
+        绝大多数名称只需一次正则匹配和一次集合查询，其余再逐个详细校验。
+        
+        Args:
+            names: 标识符可迭代对象
+            style: 命名风格（NamingStyle），None 时使用配置的风格
+        
+        Returns:
+            dict: 名称 -> validate() 的结果（只包含有错误或警告的名称）
+        """
+        fast_match = self._get_style_rules(style)[1]
+        keywords = self.ALL_KEYWORDS
+        suspects = {
+            name for name in names
+            if fast_match(name) is None or name in keywords
+        }
+        results = {}
+        for name in suspects:
+            result = self.validate(name, style)
+            if result['issues'] or result['warnings']:
+                results[name] = result
+        return results
+
+
+# 全局实例
+identifier_validator = IdentifierValidator()
@@ -0,0 +1,86 @@
+"""
+增量生成测试
+"""
+
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.layout import layout_engine
+from utils.incremental import IncrementalGenerator
+
+
+def struct_spec(name, members):
+    """结构体定义描述"""
+    return {
+        'kind': 'struct',
+        'struct_name': name,
+        'members': [{'type': member_type, 'name': member_name, 'comment': ''}
+                    for member_type, member_name in members],
+    }
+
+
+class IncrementalNestedStructTest(unittest.TestCase):
+    """嵌套结构体变化时，引用它的定义重新渲染"""
+    
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.output_dir, 'types.h')
+    
+    def tearDown(self):
+        layout_engine.unregister('pt_t')
+        layout_engine.unregister('outer_t')
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+    
+    def generate(self, pt_members):
+        """生成 pt 和引用它的 outer，返回输出内容和统计"""
+        files = {'types.h': [
+            struct_spec('pt', pt_members),
+            struct_spec('outer', [('pt_t', 'p'), ('uint8_t', 'z')]),
+        ]}
+        stats = IncrementalGenerator(self.output_dir).generate(files)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.read(), stats
+    
+    def test_nested_struct_layout(self):
+        text, stats = self.generate([('uint8_t', 'x'), ('uint32_t', 'y')])
+        self.assertEqual(stats['rendered'], 2)
+        self.assertIn("总大小: 12 bytes", text)
+    
+    def test_nested_struct_change_rerenders_outer(self):
+        self.generate([('uint8_t', 'x'), ('uint32_t', 'y')])
+        text, stats = self.generate([('uint8_t', 'x'), ('uint32_t', 'y'), ('uint64_t', 'w')])
+        self.assertEqual(stats['rendered'], 2)
+        self.assertEqual(stats['reused'], 0)
+        self.assertIn("总大小: 24 bytes", text)
+    
+    def test_unchanged_definitions_reused(self):
+        self.generate([('uint8_t', 'x'), ('uint32_t', 'y')])
+        mtime = os.stat(self.path).st_mtime_ns
+        _, stats = self.generate([('uint8_t', 'x'), ('uint32_t', 'y')])
+        self.assertEqual(stats['rendered'], 0)
+        self.assertEqual(stats['written'], [])
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+    
+    def test_new_date_without_manifest_keeps_file(self):
+        text, _ = self.generate([('uint8_t', 'x'), ('uint32_t', 'y')])
+        # 模拟前一天生成且清单丢失
+        old_text = re.sub(r'(?m)^( \* @date +).*$', r'\g<1>2000-01-01', text)
+        self.assertNotEqual(old_text, text)
+        with open(self.path, 'w', encoding='utf-8', newline='') as f:
+            f.write(old_text)
+        os.remove(os.path.join(self.output_dir, IncrementalGenerator.MANIFEST_NAME))
+        mtime = os.stat(self.path).st_mtime_ns
+        
+        _, stats = self.generate([('uint8_t', 'x'), ('uint32_t', 'y')])
+        self.assertEqual(stats['written'], [])
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+查找表生成测试
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.lut_generator import lut_generator, main
+
+
+class LutUnsignedRangeTest(unittest.TestCase):
+    """值域含负数的函数量化到无符号类型"""
+    
+    def generate(self, **kwargs):
+        return lut_generator.generate_lut('x', 'uint8_t', 'sin(2 * pi * x)', 0.0, 1.0, 16,
+                                          endpoint=False, **kwargs)
+    
+    def test_sin_into_unsigned_is_centred(self):
+        report = self.generate()['report']
+        self.assertEqual(report['offset'], 128)
+        self.assertEqual(report['scale'], 127)
+        self.assertLess(report['max_error'], 0.01)
+    
+    def test_zero_offset_raises_value_error(self):
+        with self.assertRaisesRegex(ValueError, "无符号类型需要 offset"):
+            self.generate(offset=0)
+    
+    def test_zero_scale_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self.generate(scale=0)
+    
+    def test_cli_default_succeeds(self):
+        with open(os.devnull, 'w') as devnull:
+            stdout, stderr = sys.stdout, sys.stderr
+            sys.stdout = sys.stderr = devnull
+            try:
+                code = main(['sin', '--type', 'uint8_t', '--size', '16', '--name', 'x'])
+            finally:
+                sys.stdout, sys.stderr = stdout, stderr
+        self.assertEqual(code, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
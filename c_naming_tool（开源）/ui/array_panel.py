@@ -2,16 +2,20 @@
 数组定义面板
 """
 
+import os
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QComboBox, QPushButton, QTextEdit, QGroupBox, QMessageBox,
-    QScrollArea, QSpinBox
+    QScrollArea, QSpinBox, QFileDialog, QInputDialog
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from core.naming import naming_generator
+from core.registry import identifier_registry
 from core.type_info import type_info_manager
 from core.translator import translator
 from utils.code_generator import code_generator
+from utils.blob_converter import blob_converter
+from utils.lut_generator import lut_generator, LutGenerator
 
 
 class ArrayPanel(QWidget):
@@ -173,6 +177,16 @@ class ArrayPanel(QWidget):
         self.generate_btn.clicked.connect(self.generate_code)
         button_layout.addWidget(self.generate_btn)
         
+        self.blob_btn = QPushButton("📦 从文件生成")
+        self.blob_btn.setToolTip("把二进制文件（校准表、字库、固件等）转换为带初始值的数组")
+        self.blob_btn.clicked.connect(self.generate_from_file)
+        button_layout.addWidget(self.blob_btn)
+        
+        self.lut_btn = QPushButton("📈 查找表")
+        self.lut_btn.setToolTip("按函数表达式或CRC多项式生成 const 查找表")
+        self.lut_btn.clicked.connect(self.generate_lut)
+        button_layout.addWidget(self.lut_btn)
+        
         self.copy_btn = QPushButton("📄 复制代码")
         self.copy_btn.clicked.connect(self.copy_code)
         button_layout.addWidget(self.copy_btn)
@@ -249,13 +263,17 @@ class ArrayPanel(QWidget):
         result = naming_generator.generate_array_name(
             modifier, element_type, module, purpose, array_size
         )
+        owner = identifier_registry.make_owner('array', modifier, element_type, module, purpose)
+        name = identifier_registry.resolve(result['name'], owner)
         
-        self.preview_label.setText(f"{result['name']}[{array_size}]")
+        self.preview_label.setText(f"{name}[{array_size}]")
         
         # 显示命名解析
         breakdown_text = "<p><b>命名解析:</b></p>"
         for part in result['breakdown']:
             breakdown_text += f"<p>• <b>{part['part']}</b>: {part['description']}</p>"
+        if name != result['name']:
+            breakdown_text += f"<p>• {result['name']} 已被使用，自动改为 <b>{name}</b></p>"
         
         self.breakdown_label.setText(breakdown_text)
     
@@ -265,7 +283,7 @@ class ArrayPanel(QWidget):
         if not chinese:
             return
             
-        result = translator.translate(chinese)
+        result = translator.translate(chinese, 'array')
         self.module_input.setText(result['primary'])
         
         if result.get('alternatives'):
@@ -281,7 +299,7 @@ class ArrayPanel(QWidget):
         if not chinese:
             return
             
-        result = translator.translate(chinese)
+        result = translator.translate(chinese, 'array')
         self.purpose_input.setText(result['primary'])
         
         if result.get('alternatives'):
@@ -303,19 +321,182 @@ class ArrayPanel(QWidget):
             QMessageBox.warning(self, "提示", "请至少输入功能模块或使用目的")
             return
         
-        # 生成数组名
+        # 生成数组名并登记，避免与项目中已有标识符重名
         result = naming_generator.generate_array_name(
             modifier, element_type, module, purpose, array_size
         )
+        owner = identifier_registry.make_owner('array', modifier, element_type, module, purpose)
+        name = identifier_registry.issue(result['name'], owner)
+        identifier_registry.save_async()
         
         # 生成代码
         code = code_generator.generate_array_code(
-            result['name'], element_type, array_size, modifier, module, purpose
+            name, element_type, array_size, modifier, module, purpose
         )
         
         self.code_display.setPlainText(code)
         self.code_generated.emit(code)
     
+    def generate_from_file(self):
+        """把二进制文件转换为数组定义（元素类型取 uint8_t/uint16_t/uint32_t）"""
+        modifier = self.modifier_combo.currentText()
+        element_type = self.type_combo.currentText()
+        module = self.module_input.text().strip()
+        purpose = self.purpose_input.text().strip()
+        
+        element_bits = {'uint8_t': 8, 'uint16_t': 16, 'uint32_t': 32}.get(element_type)
+        if element_bits is None:
+            QMessageBox.warning(self, "提示", "从文件生成时元素类型请选择 uint8_t、uint16_t 或 uint32_t")
+            return
+        if not module and not purpose:
+            QMessageBox.warning(self, "提示", "请至少输入功能模块或使用目的")
+            return
+        
+        input_path, _ = QFileDialog.getOpenFileName(self, "选择二进制文件", "", "所有文件 (*)")
+        if not input_path:
+            return
+        
+        endian = 'little'
+        if element_bits > 8:
+            choice, ok = QInputDialog.getItem(
+                self, "字节序", "多字节元素的字节序:", ["小端", "大端"], 0, False
+            )
+            if not ok:
+                return
+            endian = 'little' if choice == "小端" else 'big'
+        
+        alignment, ok = QInputDialog.getInt(
+            self, "对齐", "对齐字节数（0 表示不加对齐属性）:", element_bits // 8, 0, 4096
+        )
+        if not ok:
+            return
+        if alignment and alignment & (alignment - 1):
+            QMessageBox.warning(self, "提示", "对齐字节数必须是2的幂")
+            return
+        
+        try:
+            count = blob_converter.element_count(os.path.getsize(input_path), element_bits)
+        except OSError as e:
+            QMessageBox.warning(self, "错误", f"读取文件失败: {str(e)}")
+            return
+        
+        # 生成数组名并登记
+        result = naming_generator.generate_array_name(
+            modifier, element_type, module, purpose, count
+        )
+        owner = identifier_registry.make_owner('array', modifier, element_type, module, purpose)
+        name = identifier_registry.issue(result['name'], owner)
+        
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "保存C文件", f"{name}.c", "C文件 (*.c *.h)"
+        )
+        if not output_path:
+            return
+        
+        try:
+            info = blob_converter.convert_file(
+                input_path, output_path, name,
+                element_bits=element_bits, endian=endian, alignment=alignment or None,
+                modifier=modifier, module=module, purpose=purpose
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "错误", f"转换失败: {str(e)}")
+            return
+        identifier_registry.save_async()
+        
+        # 大文件只预览开头部分
+        preview_lines = []
+        with open(output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                preview_lines.append(line)
+                if len(preview_lines) >= 40:
+                    preview_lines.append("    ...\n")
+                    break
+        self.code_display.setPlainText(''.join(preview_lines))
+        
+        QMessageBox.information(
+            self, "完成",
+            f"已写入 {output_path}\n{info['size']} bytes -> {info['element_type']}[{info['count']}]"
+        )
+    
+    def generate_lut(self):
+        """生成查找表（元素类型和个数取自面板，CRC表固定256项）"""
+        modifier = self.modifier_combo.currentText()
+        element_type = self.type_combo.currentText()
+        module = self.module_input.text().strip()
+        purpose = self.purpose_input.text().strip()
+        count = self.size_spinbox.value()
+        
+        if not module and not purpose:
+            QMessageBox.warning(self, "提示", "请至少输入功能模块或使用目的")
+            return
+        
+        kinds = {'正弦 sin': 'sin', '余弦 cos': 'cos', 'gamma 校正': 'gamma',
+                 '自定义表达式': 'expr', 'CRC 查表': 'crc'}
+        choice, ok = QInputDialog.getItem(self, "查找表", "表格类型:", list(kinds), 0, False)
+        if not ok:
+            return
+        kind = kinds[choice]
+        
+        try:
+            if kind == 'crc':
+                crc_name, ok = QInputDialog.getItem(
+                    self, "CRC", "CRC参数:", list(LutGenerator.CRC_PRESETS), 2, False
+                )
+                if not ok:
+                    return
+                width, polynomial, reflected = LutGenerator.CRC_PRESETS[crc_name]
+                element_type = f"uint{width}_t"
+                count = 256
+                name = self._issue_lut_name(modifier, element_type, module, purpose, count)
+                result = lut_generator.generate_crc_table(
+                    name, width, polynomial, reflected, modifier, module, purpose,
+                    description=f"{crc_name} 查找表"
+                )
+                report = f"{crc_name}，256 项"
+            else:
+                preset = dict(LutGenerator.PRESETS.get(kind, {}))
+                params = dict(preset.get('params', {}))
+                if kind == 'gamma':
+                    gamma, ok = QInputDialog.getDouble(self, "gamma", "gamma 值:", params['gamma'], 0.1, 10.0, 2)
+                    if not ok:
+                        return
+                    params['gamma'] = gamma
+                elif kind == 'expr':
+                    expression, ok = QInputDialog.getText(self, "表达式", "以 x 为自变量的表达式（如 exp(-x) * 100）:")
+                    if not ok or not expression.strip():
+                        return
+                    domain, ok = QInputDialog.getText(self, "定义域", "x 的范围（起点, 终点）:", text="0, 1")
+                    if not ok:
+                        return
+                    start, stop = (float(item) for item in domain.split(','))
+                    preset.update(expression=expression.strip(), start=start, stop=stop, endpoint=True)
+                
+                name = self._issue_lut_name(modifier, element_type, module, purpose, count)
+                result = lut_generator.generate_lut(
+                    name, element_type, preset['expression'], preset['start'], preset['stop'],
+                    count, preset['endpoint'], params,
+                    modifier=modifier, module=module, purpose=purpose,
+                    description=preset.get('description', '')
+                )
+                info = result['report']
+                report = (f"最大误差 {info['max_error']:.3g}（下标 {info['max_error_index']}），"
+                          f"均方根误差 {info['rms_error']:.3g}")
+        except ValueError as e:
+            QMessageBox.warning(self, "错误", f"生成查找表失败: {str(e)}")
+            return
+        
+        identifier_registry.save_async()
+        self.code_display.setPlainText(result['code'])
+        self.code_generated.emit(result['code'])
+        QMessageBox.information(self, "查找表", report)
+    
+    def _issue_lut_name(self, modifier, element_type, module, purpose, count):
+        """生成并登记查找表的数组名"""
+        result = naming_generator.generate_array_name(modifier, element_type, module, purpose, count)
+        owner = identifier_registry.make_owner('array', modifier, element_type, module, purpose)
+        return identifier_registry.issue(result['name'], owner)
+    
     def copy_code(self):
         """复制代码到剪贴板"""
         code = self.code_display.toPlainText()
@@ -5,11 +5,13 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QTextEdit, QGroupBox, QMessageBox,
-    QScrollArea, QListWidget, QDialog, QDialogButtonBox, QSpinBox, QCheckBox
+    QScrollArea, QListWidget, QDialog, QDialogButtonBox, QSpinBox, QCheckBox,
+    QComboBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from core.naming import naming_generator
 from core.translator import translator
+from utils.enum_tables import enum_table_generator
 
 
 class EnumValueDialog(QDialog):
@@ -177,6 +179,35 @@ class EnumPanel(QWidget):
         
         layout.addWidget(values_group)
         
+        # 字符串表选项
+        table_group = QGroupBox("🔤 字符串表")
+        table_layout = QHBoxLayout(table_group)
+        self.string_table_check = QCheckBox("生成字符串表（枚举值 ↔ 名称）")
+        self.string_table_check.toggled.connect(self.on_string_table_toggled)
+        table_layout.addWidget(self.string_table_check)
+        
+        table_layout.addWidget(QLabel("名称查找:"))
+        self.lookup_combo = QComboBox()
+        self.lookup_combo.addItem("完美哈希", 'hash')
+        self.lookup_combo.addItem("二分查找", 'sorted')
+        self.lookup_combo.addItem("不生成", None)
+        self.lookup_combo.setEnabled(False)
+        table_layout.addWidget(self.lookup_combo)
+        table_layout.addStretch()
+        layout.addWidget(table_group)
+        
+        # 存储方式
+        storage_group = QGroupBox("💾 存储方式")
+        storage_layout = QHBoxLayout(storage_group)
+        storage_layout.addWidget(QLabel("底层类型:"))
+        self.storage_combo = QComboBox()
+        for mode, description in enum_table_generator.STORAGE_MODES.items():
+            self.storage_combo.addItem(description, mode)
+        self.storage_combo.currentIndexChanged.connect(self.update_enum_info)
+        storage_layout.addWidget(self.storage_combo)
+        storage_layout.addStretch()
+        layout.addWidget(storage_group)
+        
         # 枚举信息显示
         self.enum_info_group = QGroupBox("📊 枚举信息")
         self.enum_info_layout = QVBoxLayout(self.enum_info_group)
@@ -314,19 +345,47 @@ class EnumPanel(QWidget):
 <p><b>枚举值数量:</b> {len(self.enum_values)}</p>
 <p><b>指定值:</b> {specified_count}</p>
 <p><b>自动编号:</b> {auto_count}</p>
-<p><b>存储大小:</b> 通常为 4 bytes (int)</p>
+"""
+        info_text += self.format_storage_info()
+        info_text += """
 <p style="color: #007AFF;"><b>💡 提示:</b> 枚举值建议使用全大写命名，用下划线分隔</p>
 """
         
         self.enum_info_display.setText(info_text)
     
+    def format_storage_info(self):
+        """存储大小说明"""
+        storage = self.storage_combo.currentData()
+        try:
+            info = enum_table_generator.storage_info(self.enum_values, storage)
+            narrowest = enum_table_generator.storage_info(self.enum_values, 'packed')
+        except ValueError as e:
+            message = str(e).replace("\n", "<br>")
+            return f'<p style="color: #FF3B30;"><b>⚠️ 枚举值错误:</b><br>{message}</p>'
+        
+        text = f"<p><b>取值范围:</b> {info['min']} ~ {info['max']}</p>"
+        if storage == 'int':
+            text += f"<p><b>存储大小:</b> {info['bytes']} bytes (int)</p>"
+            if narrowest['bytes'] < info['bytes']:
+                text += f"""
+<p style="color: #FF9500;"><b>⚠️ 建议:</b> 取值可放入 {narrowest['type']}，选择固定存储类型后每个实例
+占 {narrowest['bytes']} bytes，节省 {info['bytes'] - narrowest['bytes']} bytes</p>
+"""
+        else:
+            text += f"<p><b>存储大小:</b> {info['bytes']} bytes ({info['type']}，int 为 {info['int_bytes']} bytes)</p>"
+        return text
+    
+    def on_string_table_toggled(self, checked):
+        """字符串表选项切换"""
+        self.lookup_combo.setEnabled(checked)
+    
     def translate_enum_name(self):
         """翻译枚举名称"""
         chinese = self.enum_name_input.text().strip()
         if not chinese:
             return
-            
-        result = translator.translate(chinese)
+        
+        result = translator.translate(chinese, 'enum')
         self.enum_name_input.setText(result['primary'])
         
         if result.get('alternatives'):
@@ -358,11 +417,41 @@ class EnumPanel(QWidget):
             return
         
         # 生成枚举类型名
-        enum_name_en = translator.translate(enum_name)['primary']
+        enum_name_en = translator.translate(enum_name, 'enum')['primary']
         
         # 生成代码
         from utils.code_generator import code_generator
-        code = code_generator.generate_enum_code(enum_name_en, self.enum_values, enum_name)
+        storage = self.storage_combo.currentData()
+        try:
+            code = code_generator.generate_enum_code(enum_name_en, self.enum_values, enum_name, storage)
+        except ValueError as e:
+            QMessageBox.warning(self, "枚举值错误", str(e))
+            return
+        
+        # 登记存储大小，结构体中该枚举类型的成员按实际大小布局
+        # （枚举值有误时信息区已给出提示，不登记）
+        try:
+            enum_table_generator.register_layout(enum_name_en, self.enum_values, storage)
+        except ValueError:
+            pass
+        
+        # 字符串表
+        if self.string_table_check.isChecked():
+            try:
+                result = enum_table_generator.generate_code(
+                    enum_name_en, self.enum_values, self.lookup_combo.currentData()
+                )
+            except ValueError as e:
+                QMessageBox.warning(self, "枚举值错误", str(e))
+                return
+            code += result['code']
+            if result['aliases']:
+                aliases = "\n".join(
+                    f"{number}: {', '.join(names)}" for number, names in result['aliases'].items()
+                )
+                QMessageBox.information(
+                    self, "提示", f"以下枚举常量取值相同，转换为名称时使用第一个:\n{aliases}"
+                )
         
         self.code_display.setPlainText(code)
         self.code_generated.emit(code)
@@ -104,7 +104,7 @@ class ParameterDialog(QDialog):
         """翻译参数名"""
         chinese_text = self.chinese_name_edit.text().strip()
         if chinese_text:
-            result = translator.translate(chinese_text)
+            result = translator.translate(chinese_text, 'function')
             self.english_name_edit.setText(result['primary'])
     
     def load_param(self):
@@ -331,7 +331,7 @@ class FunctionPanel(QWidget):
         """中文名称改变"""
         chinese_text = self.chinese_name_edit.text().strip()
         if chinese_text:
-            suggestions = translator.get_translation_suggestions(chinese_text, 3)
+            suggestions = translator.get_translation_suggestions(chinese_text, 3, 'function')
             if suggestions:
                 suggestion_text = "建议: " + ", ".join([s['text'] for s in suggestions[:3]])
                 self.suggestion_label.setText(suggestion_text)
@@ -345,7 +345,7 @@ class FunctionPanel(QWidget):
             QMessageBox.warning(self, "提示", "请先输入中文名称")
             return
         
-        result = translator.translate(chinese_text)
+        result = translator.translate(chinese_text, 'function')
         self.english_name_edit.setText(result['primary'])
         self.update_preview()
     
@@ -9,6 +9,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from core.type_info import type_info_manager
+from core.layout import layout_engine
+from core.naming import naming_generator
 
 
 class ParserPanel(QWidget):
@@ -144,15 +146,19 @@ float gfa_calibration_table[10];
         # 解析结果
         result_html = "<h2>解析结果</h2>"
         
-        # 解析结构体定义
+        # 解析结构体、联合体定义，并登记以便嵌套成员按其布局计算
         structs = self.parse_structs(code)
+        unions = self.parse_unions(code)
+        for struct in structs:
+            layout_engine.register(struct['name'], struct['members'], 'struct')
+        for union in unions:
+            layout_engine.register(union['name'], union['members'], 'union')
+        
         if structs:
             result_html += "<h3>✅ 识别到结构体定义</h3>"
             for struct in structs:
                 result_html += self.format_struct_result(struct)
         
-        # 解析联合体定义
-        unions = self.parse_unions(code)
         if unions:
             result_html += "<h3>✅ 识别到联合体定义</h3>"
             for union in unions:
@@ -194,12 +200,7 @@ float gfa_calibration_table[10];
             struct_name = match.group(2)
             
             # 解析成员
-            members = []
-            member_pattern = r'(\w+)\s+(\w+)\s*;'
-            for m in re.finditer(member_pattern, members_text):
-                member_type = m.group(1)
-                member_name = m.group(2)
-                members.append({'type': member_type, 'name': member_name})
+            members = self.parse_members(members_text)
             
             structs.append({
                 'name': struct_name,
@@ -218,12 +219,7 @@ float gfa_calibration_table[10];
             members_text = match.group(1)
             union_name = match.group(2)
             
-            members = []
-            member_pattern = r'(\w+)\s+(\w+)\s*;'
-            for m in re.finditer(member_pattern, members_text):
-                member_type = m.group(1)
-                member_name = m.group(2)
-                members.append({'type': member_type, 'name': member_name})
+            members = self.parse_members(members_text)
             
             unions.append({
                 'name': union_name,
@@ -232,6 +228,18 @@ float gfa_calibration_table[10];
         
         return unions
     
+    def parse_members(self, members_text):
+        """解析结构体/联合体成员（支持一维数组成员）"""
+        members = []
+        member_pattern = r'(\w+)\s+(\w+)\s*(?:\[\s*(\w+)\s*\])?\s*;'
+        for m in re.finditer(member_pattern, members_text):
+            members.append({
+                'type': m.group(1),
+                'name': m.group(2),
+                'array_size': m.group(3)
+            })
+        return members
+    
     def parse_enums(self, code):
         """解析枚举定义"""
         enums = []
@@ -287,21 +295,27 @@ float gfa_calibration_table[10];
     <p><b>成员数量:</b> {len(struct['members'])}</p>
 """
         
-        offset = 0
-        for i, member in enumerate(struct['members']):
+        layout = layout_engine.layout(struct['members'])
+        for i, (member, member_layout) in enumerate(zip(struct['members'], layout['members'])):
             type_info = type_info_manager.get_type_info(member['type'])
-            if type_info:
+            if layout_engine.is_aggregate(member['type']):
+                html += f"""
+    <p><b>成员{i+1}:</b> {member['name']}<br>
+    • 类型: {member['type']}（嵌套）<br>
+    • 大小: {member_layout['size']} bytes<br>
+    • 偏移: {member_layout['offset']}</p>
+"""
+            elif type_info:
                 range_str = type_info_manager.get_range_str(member['type'])
-                bytes_info = type_info.get('bytes', 0)
+                bytes_info = member_layout['size']
                 
                 html += f"""
     <p><b>成员{i+1}:</b> {member['name']}<br>
     • 类型: {member['type']}<br>
     • 大小: {bytes_info} bytes<br>
-    • 偏移: {offset}<br>
+    • 偏移: {member_layout['offset']}<br>
     • 取值范围: {range_str}</p>
 """
-                offset += bytes_info
             else:
                 html += f"""
     <p><b>成员{i+1}:</b> {member['name']}<br>
@@ -310,7 +324,7 @@ float gfa_calibration_table[10];
 """
         
         html += f"""
-    <p><b>总大小:</b> 约 {offset} bytes (未考虑对齐)</p>
+    <p><b>总大小:</b> {'' if layout['complete'] else '至少 '}{layout['size']} bytes ({type_info_manager.abi_profile} 对齐，填充 {layout['padding']} bytes)</p>
 </div>
 """
         return html
@@ -323,17 +337,15 @@ float gfa_calibration_table[10];
     <p><b>成员数量:</b> {len(union['members'])}</p>
 """
         
-        max_size = 0
-        for i, member in enumerate(union['members']):
-            type_info = type_info_manager.get_type_info(member['type'])
-            if type_info:
-                bytes_info = type_info.get('bytes', 0)
-                max_size = max(max_size, bytes_info)
+        layout = layout_engine.layout(union['members'], 'union')
+        for i, (member, member_layout) in enumerate(zip(union['members'], layout['members'])):
+            if member_layout['size'] > 0:
+                bytes_info = member_layout['size']
                 html += f"<p><b>成员{i+1}:</b> {member['name']} ({member['type']}, {bytes_info} bytes)</p>"
             else:
                 html += f"<p><b>成员{i+1}:</b> {member['name']} ({member['type']})</p>"
         
-        html += f"<p><b>联合体大小:</b> {max_size} bytes (最大成员)</p></div>"
+        html += f"<p><b>联合体大小:</b> {layout['size']} bytes ({type_info_manager.abi_profile} 对齐)</p></div>"
         return html
     
     def format_enum_result(self, enum):
@@ -392,34 +404,27 @@ float gfa_calibration_table[10];
     def parse_variable_name(self, name):
         """解析变量命名"""
         parts = []
+        info = naming_generator.explain_name(name)
         
         # 解析前缀
-        if name.startswith('g'):
-            parts.append("g: 全局变量 (Global)")
-            name = name[1:]
-        elif name.startswith('s'):
-            parts.append("s: 静态变量 (Static)")
-            name = name[1:]
+        if info['modifier']:
+            modifier_desc = naming_generator.MODIFIER_DESCRIPTIONS.get(info['modifier'], '')
+            parts.append(f"{info['modifier']}: {modifier_desc}")
         
         # 解析类型前缀
-        type_prefixes = {
-            'u8': 'uint8_t', 'i8': 'int8_t',
-            'u16': 'uint16_t', 'i16': 'int16_t',
-            'u32': 'uint32_t', 'i32': 'int32_t',
-            'u64': 'uint64_t', 'i64': 'int64_t',
-            'f': 'float', 'd': 'double',
-            'st': '结构体', 'un': '联合体'
-        }
-        
-        for prefix, type_name in type_prefixes.items():
-            if name.startswith(prefix + '_'):
-                parts.append(f"{prefix}: {type_name}")
-                name = name[len(prefix)+1:]
-                break
+        if info['type_prefix']:
+            type_desc = f"{info['type']} 数组" if info['is_array'] else info['type']
+            parts.append(f"{info['type_prefix']}: {type_desc}")
+        
+        # 逐词还原中文
+        for word in info['words']:
+            if word['chinese']:
+                parts.append(f"{word['english']}: {word['chinese']}")
         
         # 剩余部分
-        if name:
-            parts.append(f"名称: {name}")
+        if info['words']:
+            english = '_'.join(word['english'] for word in info['words'])
+            parts.append(f"名称: {english} ({info['description']})")
         
         return parts
     
@@ -253,7 +253,7 @@ class PointerPanel(QWidget):
         """中文名称改变"""
         chinese_text = self.chinese_name_edit.text().strip()
         if chinese_text:
-            suggestions = translator.get_translation_suggestions(chinese_text, 3)
+            suggestions = translator.get_translation_suggestions(chinese_text, 3, 'pointer')
             if suggestions:
                 suggestion_text = "建议: " + ", ".join([s['text'] for s in suggestions[:3]])
                 self.suggestion_label.setText(suggestion_text)
@@ -267,7 +267,7 @@ class PointerPanel(QWidget):
             QMessageBox.warning(self, "提示", "请先输入中文名称")
             return
         
-        result = translator.translate(chinese_text)
+        result = translator.translate(chinese_text, 'pointer')
         self.english_name_edit.setText(result['primary'])
         self.update_preview()
     
@@ -3,13 +3,16 @@
 """
 
 import json
-import os
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QGroupBox, QComboBox, QCheckBox, QLineEdit,
     QPushButton, QMessageBox, QScrollArea, QSpinBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal
+from core.config import config_service
+from core.naming import naming_generator
+from core.naming_style import DEFAULT_NAMING, NAMING_PRESETS, naming_styles
+from utils.code_templates import code_templates, DEFAULT_STYLE
 
 
 class SettingsPanel(QWidget):
@@ -20,7 +23,7 @@ class SettingsPanel(QWidget):
     
     def __init__(self):
         super().__init__()
-        self.settings_file = os.path.join('c_naming_tool', 'config', 'app_settings.json')
+        self.settings_file = config_service.path('app_settings')
         self.settings = {}
         self.init_ui()
         self.load_settings()
@@ -68,6 +71,10 @@ class SettingsPanel(QWidget):
         preset_select_layout.addStretch()
         preset_layout.addLayout(preset_select_layout)
         
+        # 命名规则默认只保存，勾选后才用于名称生成
+        self.apply_naming_style_check = QCheckBox("名称生成使用以下命名规则（不勾选时使用内置命名方案，如 g_u16_xxx）")
+        preset_layout.addWidget(self.apply_naming_style_check)
+        
         layout.addWidget(preset_group)
         
         # 命名规则设置
@@ -316,6 +323,20 @@ class SettingsPanel(QWidget):
         indent_layout.addStretch()
         codegen_layout.addLayout(indent_layout)
         
+        # 注释风格（config/code_templates.json 中的模板）
+        comment_style_layout = QHBoxLayout()
+        comment_style_layout.addWidget(QLabel("注释风格:"))
+        self.comment_style_combo = QComboBox()
+        for style in code_templates.get_styles():
+            self.comment_style_combo.addItem(style)
+            self.comment_style_combo.setItemData(
+                self.comment_style_combo.count() - 1,
+                code_templates.styles[style], Qt.ItemDataRole.ToolTipRole
+            )
+        comment_style_layout.addWidget(self.comment_style_combo)
+        comment_style_layout.addStretch()
+        codegen_layout.addLayout(comment_style_layout)
+        
         # 生成选项
         self.include_range_check = QCheckBox("包含范围注释")
         self.include_range_check.setChecked(True)
@@ -469,13 +490,17 @@ class SettingsPanel(QWidget):
     def load_settings(self):
         """加载设置"""
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    self.settings = json.load(f)
+            saved = config_service.exists('app_settings')
+            if saved:
+                self.settings = config_service.get_mutable('app_settings')
             else:
                 self.settings = self.get_default_settings()
             
             self.apply_settings_to_ui()
+            
+            # 只有勾选了“名称生成使用命名规则”的设置才作用于名称生成
+            if saved:
+                self.apply_naming_style()
         except Exception as e:
             QMessageBox.warning(self, "错误", f"加载设置失败: {str(e)}")
             self.settings = self.get_default_settings()
@@ -485,40 +510,12 @@ class SettingsPanel(QWidget):
         """获取默认设置"""
         return {
             'preset': '自定义',
-            'naming': {
-                'global_prefix': 'g_',
-                'global_suffix': '',
-                'static_prefix': 's_',
-                'static_suffix': '',
-                'local_prefix': 'l_',
-                'local_suffix': '',
-                'struct_prefix': 'st_',
-                'struct_suffix': '',
-                'union_prefix': 'un_',
-                'union_suffix': '',
-                'enum_prefix': 'e_',
-                'enum_suffix': '',
-                'array_prefix': 'a_',
-                'array_suffix': '',
-                'pointer_prefix': 'p_',
-                'pointer_suffix': '',
-                'function_prefix': '',
-                'function_suffix': '',
-                'uint8_prefix': '',
-                'uint16_prefix': '',
-                'uint32_prefix': '',
-                'style': '下划线 (_)',
-                'case': '全小写',
-                'const_case': '全大写+下划线',
-                'macro_case': '全大写+下划线',
-                'use_type_prefix': False,
-                'use_scope_prefix': True,
-                'use_module_prefix': False,
-                'module_prefix': ''
-            },
+            'apply_naming_style': False,
+            'naming': dict(DEFAULT_NAMING),
             'codegen': {
                 'comment_lang': '中文',
                 'indent': '4空格',
+                'comment_style': DEFAULT_STYLE,
                 'include_range': True,
                 'include_naming': True,
                 'include_memory': True,
@@ -548,6 +545,7 @@ class SettingsPanel(QWidget):
         # 预设
         preset = self.settings.get('preset', '自定义')
         self.preset_combo.setCurrentText(preset)
+        self.apply_naming_style_check.setChecked(self.settings.get('apply_naming_style', False))
         
         # 命名规则
         naming = self.settings.get('naming', {})
@@ -585,6 +583,7 @@ class SettingsPanel(QWidget):
         codegen = self.settings.get('codegen', {})
         self.comment_lang_combo.setCurrentText(codegen.get('comment_lang', '中文'))
         self.indent_combo.setCurrentText(codegen.get('indent', '4空格'))
+        self.comment_style_combo.setCurrentText(codegen.get('comment_style', code_templates.style))
         self.include_range_check.setChecked(codegen.get('include_range', True))
         self.include_naming_breakdown_check.setChecked(codegen.get('include_naming', True))
         self.include_memory_layout_check.setChecked(codegen.get('include_memory', True))
@@ -614,6 +613,7 @@ class SettingsPanel(QWidget):
         """从UI控件获取设置"""
         return {
             'preset': self.preset_combo.currentText(),
+            'apply_naming_style': self.apply_naming_style_check.isChecked(),
             'naming': {
                 'global_prefix': self.global_prefix_edit.text(),
                 'global_suffix': self.global_suffix_edit.text(),
@@ -648,6 +648,7 @@ class SettingsPanel(QWidget):
             'codegen': {
                 'comment_lang': self.comment_lang_combo.currentText(),
                 'indent': self.indent_combo.currentText(),
+                'comment_style': self.comment_style_combo.currentText(),
                 'include_range': self.include_range_check.isChecked(),
                 'include_naming': self.include_naming_breakdown_check.isChecked(),
                 'include_memory': self.include_memory_layout_check.isChecked(),
@@ -677,11 +678,10 @@ class SettingsPanel(QWidget):
         try:
             self.settings = self.get_settings_from_ui()
             
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
+            # 文件在后台写入，不阻塞界面
+            config_service.update('app_settings', self.settings)
             
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, ensure_ascii=False, indent=2)
+            self.apply_naming_style()
             
             # 发送设置变更信号
             self.settings_changed.emit(self.settings)
@@ -747,82 +747,8 @@ class SettingsPanel(QWidget):
         if preset_name == '自定义':
             return
         
-        presets = {
-            'Linux内核风格': {
-                'global_prefix': '',
-                'static_prefix': '',
-                'local_prefix': '',
-                'struct_prefix': '',
-                'union_prefix': '',
-                'enum_prefix': '',
-                'array_prefix': '',
-                'pointer_prefix': '',
-                'function_prefix': '',
-                'style': '下划线 (_)',
-                'case': '全小写',
-                'const_case': '全大写+下划线',
-                'macro_case': '全大写+下划线',
-                'use_type_prefix': False,
-                'use_scope_prefix': False
-            },
-            'Google C++风格': {
-                'global_prefix': 'g_',
-                'static_prefix': 's_',
-                'local_prefix': '',
-                'struct_prefix': '',
-                'union_prefix': '',
-                'enum_prefix': '',
-                'array_prefix': '',
-                'pointer_prefix': '',
-                'function_prefix': '',
-                'style': '下划线 (_)',
-                'case': '全小写',
-                'const_case': 'k前缀+驼峰',
-                'macro_case': '全大写+下划线',
-                'use_type_prefix': False,
-                'use_scope_prefix': True
-            },
-            'Hungarian命名法': {
-                'global_prefix': 'g_',
-                'static_prefix': 's_',
-                'local_prefix': '',
-                'struct_prefix': 'st',
-                'union_prefix': 'un',
-                'enum_prefix': 'e',
-                'array_prefix': 'a',
-                'pointer_prefix': 'p',
-                'function_prefix': 'fn',
-                'uint8_prefix': 'b',
-                'uint16_prefix': 'w',
-                'uint32_prefix': 'dw',
-                'style': '驼峰命名 (camelCase)',
-                'case': '首字母大写',
-                'const_case': 'k前缀+驼峰',
-                'macro_case': '全大写+下划线',
-                'use_type_prefix': True,
-                'use_scope_prefix': True
-            },
-            '嵌入式通用': {
-                'global_prefix': 'g_',
-                'static_prefix': 's_',
-                'local_prefix': 'l_',
-                'struct_prefix': 'st_',
-                'union_prefix': 'un_',
-                'enum_prefix': 'e_',
-                'array_prefix': 'a_',
-                'pointer_prefix': 'p_',
-                'function_prefix': '',
-                'style': '下划线 (_)',
-                'case': '全小写',
-                'const_case': '全大写+下划线',
-                'macro_case': '全大写+下划线',
-                'use_type_prefix': False,
-                'use_scope_prefix': True
-            }
-        }
-        
-        if preset_name in presets:
-            preset_config = presets[preset_name]
+        if preset_name in NAMING_PRESETS:
+            preset_config = NAMING_PRESETS[preset_name]
             
             # 应用预设到UI控件
             self.global_prefix_edit.setText(preset_config.get('global_prefix', ''))
@@ -846,6 +772,18 @@ class SettingsPanel(QWidget):
             
             QMessageBox.information(self, "提示", f"已应用 {preset_name} 预设")
     
+    def apply_naming_style(self):
+        """
+        将当前命名规则编译为命名风格，供名称生成和校验使用；
+        未勾选“名称生成使用命名规则”时恢复内置命名方案
+        """
+        if not self.settings.get('apply_naming_style', False):
+            naming_generator.set_style(None)
+            return
+        preset = self.settings.get('preset', '自定义')
+        naming = self.settings.get('naming', {})
+        naming_generator.set_style(naming_styles.compile(naming, preset))
+    
     def get_naming_config(self):
         """获取当前命名配置供其他模块使用"""
         naming = self.settings.get('naming', {})
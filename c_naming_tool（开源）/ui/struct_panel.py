@@ -5,13 +5,18 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QComboBox, QPushButton, QTextEdit, QGroupBox, QMessageBox,
-    QScrollArea, QListWidget, QListWidgetItem, QDialog, QDialogButtonBox
+    QScrollArea, QListWidget, QListWidgetItem, QDialog, QDialogButtonBox,
+    QCheckBox, QSpinBox, QInputDialog
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from core.naming import naming_generator
 from core.type_info import type_info_manager
+from core.layout import layout_engine
+from core.type_selector import type_selector
 from core.translator import translator
 from utils.code_generator import code_generator
+from utils.flag_packer import flag_packer
+from utils.fixed_point import fixed_point_advisor
 
 
 class MemberDialog(QDialog):
@@ -34,6 +39,8 @@ class MemberDialog(QDialog):
         type_layout.addWidget(QLabel("类型:"))
         self.type_combo = QComboBox()
         self.type_combo.addItems(type_info_manager.get_all_types())
+        # 已生成的枚举等类型，按登记的存储类型计算布局
+        self.type_combo.addItems(layout_engine.get_alias_names())
         if self.member_data.get('type'):
             index = self.type_combo.findText(self.member_data['type'])
             if index >= 0:
@@ -59,6 +66,30 @@ class MemberDialog(QDialog):
         comment_layout.addWidget(self.comment_input)
         layout.addLayout(comment_layout)
         
+        # 取值范围（可选，用于按范围选类型和标志位打包）
+        range_layout = QHBoxLayout()
+        range_layout.addWidget(QLabel("范围:"))
+        self.min_input = QLineEdit()
+        self.min_input.setPlaceholderText("最小值(可选)")
+        range_layout.addWidget(self.min_input)
+        range_layout.addWidget(QLabel("~"))
+        self.max_input = QLineEdit()
+        self.max_input.setPlaceholderText("最大值(可选)")
+        range_layout.addWidget(self.max_input)
+        self.resolution_input = QLineEdit()
+        self.resolution_input.setPlaceholderText("分辨率(可选)")
+        range_layout.addWidget(self.resolution_input)
+        for field, widget in (('min', self.min_input), ('max', self.max_input),
+                              ('resolution', self.resolution_input)):
+            if self.member_data.get(field) is not None:
+                widget.setText(str(self.member_data[field]))
+        layout.addLayout(range_layout)
+        
+        # 固定位置
+        self.pinned_check = QCheckBox("固定位置（优化成员顺序时不移动）")
+        self.pinned_check.setChecked(bool(self.member_data.get('pinned')))
+        layout.addWidget(self.pinned_check)
+        
         # 按钮
         buttons = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
@@ -69,11 +100,19 @@ class MemberDialog(QDialog):
     
     def get_member_data(self):
         """获取成员数据"""
-        return {
+        data = {
             'type': self.type_combo.currentText(),
             'name': self.name_input.text().strip(),
-            'comment': self.comment_input.text().strip()
+            'comment': self.comment_input.text().strip(),
+            'pinned': self.pinned_check.isChecked()
         }
+        min_value = type_selector.parse_number(self.min_input.text())
+        max_value = type_selector.parse_number(self.max_input.text())
+        if min_value is not None and max_value is not None:
+            data['min'] = min_value
+            data['max'] = max_value
+            data['resolution'] = type_selector.parse_number(self.resolution_input.text()) or None
+        return data
 
 
 class StructPanel(QWidget):
@@ -132,6 +171,25 @@ class StructPanel(QWidget):
         self.struct_suggestions.hide()
         name_layout.addWidget(self.struct_suggestions)
         
+        # 目标平台和数组长度（用于计算布局和优化收益）
+        target_layout = QHBoxLayout()
+        target_layout.addWidget(QLabel("目标平台:"))
+        self.abi_combo = QComboBox()
+        self.abi_combo.addItems(type_info_manager.get_abi_profiles())
+        if type_info_manager.abi_profile:
+            self.abi_combo.setCurrentText(type_info_manager.abi_profile)
+        self.abi_combo.currentTextChanged.connect(self.update_struct_info)
+        target_layout.addWidget(self.abi_combo)
+        
+        target_layout.addWidget(QLabel("数组长度:"))
+        self.array_count_spin = QSpinBox()
+        self.array_count_spin.setRange(1, 1000000)
+        self.array_count_spin.setToolTip("按结构体数组统计节省的内存，单个结构体为 1")
+        self.array_count_spin.valueChanged.connect(self.update_struct_info)
+        target_layout.addWidget(self.array_count_spin)
+        target_layout.addStretch()
+        name_layout.addLayout(target_layout)
+        
         layout.addWidget(name_group)
         
         # 成员列表
@@ -160,6 +218,26 @@ class StructPanel(QWidget):
         move_down_btn.clicked.connect(self.move_down)
         member_btn_layout.addWidget(move_down_btn)
         
+        optimize_btn = QPushButton("🧩 优化顺序")
+        optimize_btn.setToolTip("重排成员以减少填充字节（固定位置的成员不移动）")
+        optimize_btn.clicked.connect(self.optimize_order)
+        member_btn_layout.addWidget(optimize_btn)
+        
+        pack_flags_btn = QPushButton("🚩 标志位打包")
+        pack_flags_btn.setToolTip("把布尔/小范围成员合并为位域或标志字")
+        pack_flags_btn.clicked.connect(self.pack_flags)
+        member_btn_layout.addWidget(pack_flags_btn)
+        
+        select_types_btn = QPushButton("🎯 按范围选类型")
+        select_types_btn.setToolTip("为填写了取值范围的成员选择最窄的类型")
+        select_types_btn.clicked.connect(self.select_member_types)
+        member_btn_layout.addWidget(select_types_btn)
+        
+        fixed_point_btn = QPushButton("🔢 定点化")
+        fixed_point_btn.setToolTip("目标平台没有FPU时，把填写了范围和分辨率的浮点成员换成Q格式")
+        fixed_point_btn.clicked.connect(self.convert_fixed_point)
+        member_btn_layout.addWidget(fixed_point_btn)
+        
         member_btn_layout.addStretch()
         members_layout.addLayout(member_btn_layout)
         
@@ -283,9 +361,13 @@ class StructPanel(QWidget):
             range_str = type_info_manager.get_range_str(member['type'])
             
             item_text = f"{i+1}. {member['name']} ({member['type']})"
+            if member.get('pinned'):
+                item_text += " 📌"
             if member['comment']:
                 item_text += f" - {member['comment']}"
             item_text += f"\n   范围: {range_str}"
+            if member.get('min') is not None:
+                item_text += f"（需要: {member['min']} ~ {member['max']}）"
             
             self.members_list.addItem(item_text)
     
@@ -296,50 +378,171 @@ class StructPanel(QWidget):
             self.struct_info_display.setText(info_text)
             return
         
-        # 计算结构体大小
-        unaligned, aligned, padding = self.calculate_struct_size()
+        # 计算结构体布局
+        profile = self.abi_combo.currentText() or None
+        array_count = self.array_count_spin.value()
+        layout = layout_engine.layout(self.members, profile=profile)
+        padding = layout['padding']
         
         info_text = f"""
 <p><b>成员数量:</b> {len(self.members)}</p>
-<p><b>总大小:</b> {unaligned} bytes (未对齐)</p>
-<p><b>对齐后:</b> {aligned} bytes (4字节对齐)</p>
+<p><b>成员大小:</b> {layout['data_size']} bytes (不含填充)</p>
+<p><b>对齐后:</b> {layout['size']} bytes ({layout['profile']} 对齐)</p>
 """
+        if array_count > 1:
+            info_text += f"<p><b>数组总大小:</b> {layout['size'] * array_count} bytes ({array_count} 个)</p>"
+        
+        # 各目标平台下的大小
+        footprints = [
+            f"{profile}: {size}"
+            for profile, size in layout_engine.get_footprints(self.members).items()
+        ]
+        if len(footprints) > 1:
+            info_text += f"<p><b>各平台大小:</b> {', '.join(footprints)} bytes</p>"
         
         if padding > 0:
             info_text += f"<p><b>填充字节:</b> {padding} bytes</p>"
-            info_text += """
-<p style="color: #FF9500;"><b>⚠️ 建议:</b> 调整成员顺序可能减少填充字节</p>
+            result = code_generator.optimize_struct_order(self.members, profile, array_count)
+            if result['saved'] > 0:
+                info_text += f"""
+<p style="color: #FF9500;"><b>⚠️ 建议:</b> 点击“优化顺序”可减少到 {result['optimized_size']} bytes，
+每个节省 {result['saved']} bytes，数组共节省 {result['array_saved']} bytes</p>
+"""
+        
+        soft_float = [
+            member['name'] for member in self.members
+            if not type_info_manager.has_hardware_float(member['type'], layout['profile'])
+        ]
+        if soft_float:
+            info_text += f"""
+<p style="color: #FF9500;"><b>🔢 软件浮点:</b> {', '.join(soft_float)} 在 {layout['profile']} 上没有硬件FPU支持，
+可填写范围和分辨率后使用“定点化”</p>
+"""
+        
+        flags = flag_packer.analyze(self.members, profile, array_count)
+        if flags['saved'] > 0:
+            info_text += f"""
+<p style="color: #FF9500;"><b>🚩 标志位:</b> {len(flags['fields'])} 个成员可合并为位域/标志字，
+每个节省 {flags['saved']} bytes，数组共节省 {flags['array_saved']} bytes</p>
 """
         
         self.struct_info_display.setText(info_text)
     
-    def calculate_struct_size(self):
-        """计算结构体大小"""
-        offset = 0
-        max_alignment = 1
+    def optimize_order(self):
+        """按当前目标平台重排成员以减少填充"""
+        if len(self.members) < 2:
+            return
         
-        for member in self.members:
-            type_info = type_info_manager.get_type_info(member['type'])
-            member_bytes = type_info.get('bytes', 0)
-            
-            if member_bytes > 0:
-                alignment = min(member_bytes, 4)
-                max_alignment = max(max_alignment, alignment)
-                
-                if offset % alignment != 0:
-                    offset += alignment - (offset % alignment)
-                
-                offset += member_bytes
-        
-        unaligned_size = offset
-        if offset % max_alignment != 0:
-            aligned_size = offset + (max_alignment - offset % max_alignment)
-        else:
-            aligned_size = offset
+        result = code_generator.optimize_struct_order(
+            self.members, self.abi_combo.currentText() or None, self.array_count_spin.value()
+        )
+        if result['saved'] <= 0:
+            QMessageBox.information(self, "提示", f"当前顺序已是最紧凑的布局（{result['profile']}）")
+            return
+        
+        order = "\n".join(f"  {i+1}. {m['name']} ({m['type']})"
+                          for i, m in enumerate(result['members']))
+        reply = QMessageBox.question(
+            self, "优化成员顺序",
+            f"目标平台: {result['profile']}\n"
+            f"大小: {result['original_size']} → {result['optimized_size']} bytes，"
+            f"每个节省 {result['saved']} bytes\n"
+            f"数组 {result['array_count']} 个共节省 {result['array_saved']} bytes\n\n"
+            f"建议顺序:\n{order}\n\n是否应用？"
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.members = result['members']
+            self.update_members_list()
+            self.update_struct_info()
+    
+    def select_member_types(self):
+        """按成员的取值范围选择最窄类型"""
+        result = type_selector.select_members(
+            self.members, self.abi_combo.currentText() or None, self.array_count_spin.value()
+        )
+        if result['unfit']:
+            QMessageBox.warning(self, "提示", f"没有能容纳取值范围的整型: {', '.join(result['unfit'])}")
+        if not result['changes']:
+            QMessageBox.information(self, "提示", "没有需要调整类型的成员（请在成员中填写取值范围）")
+            return
+        
+        changes = "\n".join(
+            f"  {change['name']}: {change['from']} → {change['to']}"
+            + (f"（按 值/{change['resolution']:g} 存储）" if change['resolution'] else "")
+            for change in result['changes']
+        )
+        reply = QMessageBox.question(
+            self, "按范围选类型",
+            f"{changes}\n\n"
+            f"成员共节省 {result['member_saved']} bytes，"
+            f"结构体 {result['original_size']} → {result['optimized_size']} bytes "
+            f"({result['profile']})，数组 {result['array_count']} 个共节省 {result['array_saved']} bytes\n"
+            f"（调整类型后可再用“优化顺序”减少填充）\n\n是否应用？"
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.members = result['members']
+            self.update_members_list()
+            self.update_struct_info()
+    
+    def convert_fixed_point(self):
+        """生成浮点成员换成Q格式后的结构体代码"""
+        struct_name = self.struct_name_input.text().strip()
+        if not struct_name:
+            QMessageBox.warning(self, "提示", "请输入结构体名称")
+            return
+        
+        profile = self.abi_combo.currentText() or None
+        result = fixed_point_advisor.convert_members(self.members, profile)
+        if not result['advices']:
+            message = f"没有需要定点化的浮点成员（{profile} 有硬件浮点支持的类型不转换）"
+            if result['skipped']:
+                message = f"请为这些浮点成员填写取值范围和分辨率: {', '.join(result['skipped'])}"
+            QMessageBox.information(self, "提示", message)
+            return
+        
+        code = code_generator.generate_struct_code(
+            struct_name, result['members'], profile=profile
+        )
+        for member, advice in result['advices']:
+            code += fixed_point_advisor.generate_macros(
+                f"{struct_name}_{member['name']}", advice, member['type']
+            )
+        
+        self.code_display.setPlainText(code)
+        self.code_generated.emit(code)
+    
+    def pack_flags(self):
+        """生成标志位打包后的结构体代码"""
+        struct_name = self.struct_name_input.text().strip()
+        if not struct_name:
+            QMessageBox.warning(self, "提示", "请输入结构体名称")
+            return
+        
+        analysis = flag_packer.analyze(
+            self.members, self.abi_combo.currentText() or None, self.array_count_spin.value()
+        )
+        if not analysis['fields']:
+            QMessageBox.information(self, "提示", "没有可以合并的标志成员，或合并后不能减少内存")
+            return
         
-        padding = aligned_size - unaligned_size
+        forms = ["位域", "标志字 + 访问宏"]
+        form, ok = QInputDialog.getItem(
+            self, "标志位打包",
+            f"{len(analysis['fields'])} 个成员可合并，"
+            f"{analysis['original_size']} → {analysis['packed_size']} bytes，"
+            f"数组共节省 {analysis['array_saved']} bytes\n选择生成形式:",
+            forms, 0, False
+        )
+        if not ok:
+            return
+        
+        if form == forms[0]:
+            code = flag_packer.generate_bitfield_code(struct_name, self.members, analysis)
+        else:
+            code = flag_packer.generate_flags_code(struct_name, self.members, analysis)
         
-        return unaligned_size, aligned_size, padding
+        self.code_display.setPlainText(code)
+        self.code_generated.emit(code)
     
     def translate_struct_name(self):
         """翻译结构体名称"""
@@ -347,7 +550,7 @@ class StructPanel(QWidget):
         if not chinese:
             return
             
-        result = translator.translate(chinese)
+        result = translator.translate(chinese, 'struct')
         self.struct_name_input.setText(result['primary'])
         
         if result.get('alternatives'):
@@ -379,7 +582,9 @@ class StructPanel(QWidget):
             return
         
         # 生成代码
-        code = code_generator.generate_struct_code(struct_name, self.members)
+        code = code_generator.generate_struct_code(
+            struct_name, self.members, profile=self.abi_combo.currentText() or None
+        )
         
         self.code_display.setPlainText(code)
         self.code_generated.emit(code)
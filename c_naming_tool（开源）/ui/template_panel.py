@@ -3,7 +3,6 @@
 """
 
 import json
-import os
 from datetime import datetime
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
@@ -12,6 +11,7 @@ from PyQt6.QtWidgets import (
     QFileDialog
 )
 from PyQt6.QtCore import Qt
+from core.config import config_service
 
 
 class TemplateDialog(QDialog):
@@ -113,7 +113,7 @@ class TemplatePanel(QWidget):
     
     def __init__(self):
         super().__init__()
-        self.templates_file = os.path.join('c_naming_tool', 'config', 'templates.json')
+        self.templates_file = config_service.path('templates')
         self.templates = []
         self.init_ui()
         self.load_templates()
@@ -216,9 +216,8 @@ class TemplatePanel(QWidget):
     def load_templates(self):
         """加载模板列表"""
         try:
-            if os.path.exists(self.templates_file):
-                with open(self.templates_file, 'r', encoding='utf-8') as f:
-                    self.templates = json.load(f)
+            if config_service.exists('templates'):
+                self.templates = config_service.get_mutable('templates')
             else:
                 # 创建默认模板
                 self.templates = self.create_default_templates()
@@ -282,11 +281,8 @@ pid_controller_t g_st_pid_controller;''',
     def save_templates(self):
         """保存模板列表"""
         try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self.templates_file), exist_ok=True)
-            
-            with open(self.templates_file, 'w', encoding='utf-8') as f:
-                json.dump(self.templates, f, ensure_ascii=False, indent=2)
+            # 文件在后台写入，不阻塞界面
+            config_service.update('templates', self.templates)
         except Exception as e:
             QMessageBox.warning(self, "错误", f"保存模板失败: {str(e)}")
     
@@ -10,6 +10,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from core.naming import naming_generator
 from core.type_info import type_info_manager
+from core.layout import layout_engine
 from core.translator import translator
 from utils.code_generator import code_generator
 
@@ -269,20 +270,13 @@ class UnionPanel(QWidget):
             self.union_info_display.setText(info_text)
             return
         
-        # 计算联合体大小（取最大成员的大小）
-        max_size = 0
-        max_member = None
-        
-        for member in self.members:
-            type_info = type_info_manager.get_type_info(member['type'])
-            member_bytes = type_info.get('bytes', 0)
-            if member_bytes > max_size:
-                max_size = member_bytes
-                max_member = member
+        # 计算联合体大小（最大成员按最严格的对齐补齐）
+        layout = layout_engine.layout(self.members, 'union')
+        max_member = max(layout['members'], key=lambda m: m['size'])
         
         info_text = f"""
 <p><b>成员数量:</b> {len(self.members)}</p>
-<p><b>联合体大小:</b> {max_size} bytes (取最大成员)</p>
+<p><b>联合体大小:</b> {layout['size']} bytes ({type_info_manager.abi_profile} 对齐)</p>
 <p><b>最大成员:</b> {max_member['name']} ({max_member['type']})</p>
 <p style="color: #FF9500;"><b>💡 提示:</b> 联合体所有成员共享同一块内存，大小由最大成员决定</p>
 <p style="color: #FF9500;"><b>⚠️ 注意:</b> 同一时刻只能使用一个成员</p>
@@ -296,7 +290,7 @@ class UnionPanel(QWidget):
         if not chinese:
             return
             
-        result = translator.translate(chinese)
+        result = translator.translate(chinese, 'union')
         self.union_name_input.setText(result['primary'])
         
         if result.get('alternatives'):
@@ -328,14 +322,11 @@ class UnionPanel(QWidget):
             return
         
         # 生成联合体类型名
-        union_name_en = translator.translate(union_name)['primary']
+        union_name_en = translator.translate(union_name, 'union')['primary']
         
-        # 计算最大成员大小
-        max_size = 0
-        for member in self.members:
-            type_info = type_info_manager.get_type_info(member['type'])
-            member_bytes = type_info.get('bytes', 0)
-            max_size = max(max_size, member_bytes)
+        # 计算联合体布局
+        layout = layout_engine.layout(self.members, 'union')
+        max_size = layout['size']
         
         # 生成代码
         code = f"""/*******************************************************************************
@@ -350,10 +341,9 @@ typedef union {{
 """
         
         # 添加成员
-        for member in self.members:
-            type_info = type_info_manager.get_type_info(member['type'])
+        for member, member_layout in zip(self.members, layout['members']):
             range_str = type_info_manager.get_range_str(member['type'])
-            bytes_info = type_info.get('bytes', 0)
+            bytes_info = member_layout['size']
             
             if member['comment']:
                 code += f"    {member['type']:<12} {member['name']};  // {member['comment']}, Range: {range_str}, {bytes_info} bytes\n"
@@ -9,9 +9,12 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from core.naming import naming_generator
+from core.registry import identifier_registry
 from core.type_info import type_info_manager
+from core.type_selector import type_selector
 from core.translator import translator
 from utils.code_generator import code_generator
+from utils.fixed_point import fixed_point_advisor
 
 
 class VariablePanel(QWidget):
@@ -72,6 +75,39 @@ class VariablePanel(QWidget):
         type_layout.addStretch()
         input_layout.addLayout(type_layout)
         
+        # 按取值范围选择类型
+        select_layout = QHBoxLayout()
+        select_layout.addWidget(QLabel("    按取值范围选择:"))
+        self.range_min_input = QLineEdit()
+        self.range_min_input.setPlaceholderText("最小值")
+        self.range_min_input.setMaximumWidth(100)
+        select_layout.addWidget(self.range_min_input)
+        select_layout.addWidget(QLabel("~"))
+        self.range_max_input = QLineEdit()
+        self.range_max_input.setPlaceholderText("最大值")
+        self.range_max_input.setMaximumWidth(100)
+        select_layout.addWidget(self.range_max_input)
+        self.resolution_input = QLineEdit()
+        self.resolution_input.setPlaceholderText("分辨率(可选)")
+        self.resolution_input.setToolTip("例如 0.1：按 值×10 的定点整数存储")
+        self.resolution_input.setMaximumWidth(100)
+        select_layout.addWidget(self.resolution_input)
+        select_type_btn = QPushButton("🎯 选择类型")
+        select_type_btn.clicked.connect(self.select_type_by_range)
+        select_layout.addWidget(select_type_btn)
+        fixed_point_btn = QPushButton("🔢 定点化")
+        fixed_point_btn.setToolTip("float/double 按取值范围和分辨率换成Q格式定点数（适用于无FPU的目标）")
+        fixed_point_btn.clicked.connect(self.generate_fixed_point_code)
+        select_layout.addWidget(fixed_point_btn)
+        select_layout.addStretch()
+        input_layout.addLayout(select_layout)
+        
+        self.select_type_hint = QLabel()
+        self.select_type_hint.setWordWrap(True)
+        self.select_type_hint.setProperty("class", "hint")
+        self.select_type_hint.hide()
+        input_layout.addWidget(self.select_type_hint)
+        
         # 3. 功能模块
         module_layout = QVBoxLayout()
         module_input_layout = QHBoxLayout()
@@ -193,6 +229,78 @@ class VariablePanel(QWidget):
         # 初始化显示
         self.on_type_changed(self.type_combo.currentText())
     
+    def select_type_by_range(self):
+        """按取值范围选择最窄的类型"""
+        min_value = type_selector.parse_number(self.range_min_input.text())
+        max_value = type_selector.parse_number(self.range_max_input.text())
+        resolution = type_selector.parse_number(self.resolution_input.text())
+        if min_value is None or max_value is None:
+            QMessageBox.warning(self, "提示", "请输入有效的最小值和最大值")
+            return
+        
+        current_type = self.type_combo.currentText()
+        result = type_selector.compare(current_type, min_value, max_value, resolution or None)
+        if result['type'] is None:
+            QMessageBox.warning(self, "提示", f"没有能容纳 {min_value} ~ {max_value} 的整型")
+            return
+        
+        self.type_combo.setCurrentText(result['type'])
+        
+        hint = f"建议类型: {result['type']} ({result['bytes']} bytes)"
+        if result['resolution']:
+            hint += f"，按 值/{result['resolution']:g} 存储为 {result['min']} ~ {result['max']}"
+        if not result['fits']:
+            hint += f"，{current_type} 放不下该范围"
+        elif result['saved'] > 0:
+            hint += f"，比 {current_type} 每个节省 {result['saved']} bytes"
+        self.select_type_hint.setText(hint)
+        self.select_type_hint.show()
+    
+    def generate_fixed_point_code(self):
+        """把浮点变量换成Q格式定点数并生成代码"""
+        float_type = self.type_combo.currentText()
+        if not type_info_manager.is_float_type(float_type):
+            QMessageBox.warning(self, "提示", "定点化只适用于 float/double 变量")
+            return
+        
+        min_value = type_selector.parse_number(self.range_min_input.text())
+        max_value = type_selector.parse_number(self.range_max_input.text())
+        resolution = type_selector.parse_number(self.resolution_input.text())
+        if min_value is None or max_value is None or not resolution:
+            QMessageBox.warning(self, "提示", "请输入最小值、最大值和分辨率")
+            return
+        
+        advice = fixed_point_advisor.advise(min_value, max_value, resolution)
+        if advice is None:
+            QMessageBox.warning(self, "提示", "32位以内的Q格式无法同时满足该范围和分辨率")
+            return
+        
+        modifier = self.modifier_combo.currentText()
+        module = self.module_input.text().strip()
+        purpose = self.purpose_input.text().strip()
+        if not module and not purpose:
+            QMessageBox.warning(self, "提示", "请至少输入功能模块或使用目的")
+            return
+        
+        # 按定点存储类型命名并登记
+        result = naming_generator.generate_variable_name(
+            modifier, advice['type'], module, purpose
+        )
+        owner = identifier_registry.make_owner('variable', modifier, advice['type'], module, purpose)
+        name = identifier_registry.issue(result['name'], owner)
+        identifier_registry.save_async()
+        
+        initial_value = type_selector.parse_number(self.value_input.text()) or 0
+        code = fixed_point_advisor.generate_variable_code(
+            name, float_type, modifier, module, purpose,
+            min_value, max_value, resolution, initial_value
+        )
+        
+        if not type_info_manager.has_hardware_float(float_type):
+            code = f"/* {type_info_manager.abi_profile} 没有 {float_type} 的硬件浮点支持 */\n" + code
+        self.code_display.setPlainText(code)
+        self.code_generated.emit(code)
+    
     def on_type_changed(self, type_name):
         """类型改变时更新取值范围显示"""
         display_info = type_info_manager.format_type_display(type_name)
@@ -236,13 +344,17 @@ class VariablePanel(QWidget):
         result = naming_generator.generate_variable_name(
             modifier, var_type, module, purpose
         )
+        owner = identifier_registry.make_owner('variable', modifier, var_type, module, purpose)
+        name = identifier_registry.resolve(result['name'], owner)
         
-        self.preview_label.setText(result['name'])
+        self.preview_label.setText(name)
         
         # 显示命名解析
         breakdown_text = "<p><b>命名解析:</b></p>"
         for part in result['breakdown']:
             breakdown_text += f"<p>• <b>{part['part']}</b>: {part['description']}</p>"
+        if name != result['name']:
+            breakdown_text += f"<p>• {result['name']} 已被使用，自动改为 <b>{name}</b></p>"
         
         self.breakdown_label.setText(breakdown_text)
     
@@ -292,14 +404,17 @@ class VariablePanel(QWidget):
             QMessageBox.warning(self, "提示", "请至少输入功能模块或使用目的")
             return
         
-        # 生成变量名
+        # 生成变量名并登记，避免与项目中已有标识符重名
         result = naming_generator.generate_variable_name(
             modifier, var_type, module, purpose
         )
+        owner = identifier_registry.make_owner('variable', modifier, var_type, module, purpose)
+        name = identifier_registry.issue(result['name'], owner)
+        identifier_registry.save_async()
         
         # 生成代码
         code = code_generator.generate_variable_code(
-            result['name'], var_type, modifier, module, purpose, initial_value
+            name, var_type, modifier, module, purpose, initial_value
         )
         
         self.code_display.setPlainText(code)
@@ -320,6 +435,10 @@ class VariablePanel(QWidget):
         self.module_input.clear()
         self.purpose_input.clear()
         self.value_input.setText("0")
+        self.range_min_input.clear()
+        self.range_max_input.clear()
+        self.resolution_input.clear()
+        self.select_type_hint.hide()
         self.code_display.clear()
         self.preview_label.setText("")
         self.breakdown_label.setText("")
@@ -0,0 +1,409 @@
+"""
+批量命名模块
+从CSV/XLSX需求表（信号表）批量生成变量名、命名解析和变量定义代码
+
+命令行用法（在工具根目录下运行）:
+    python -m utils.batch_naming signals.csv -o signals_named.csv --code signals.c
+"""
+
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from core.naming import naming_generator
+from core.naming_style import naming_styles
+from core.registry import identifier_registry
+from core.translator import translator
+from core.type_selector import type_selector
+from core.validator import identifier_validator
+from utils.code_generator import code_generator
+
+
+class BatchNamer:
+    """批量命名器"""
+    
+    # 表头别名 -> 字段名（支持中英文表头）
+    COLUMN_ALIASES = {
+        'modifier': 'modifier', '修饰类型': 'modifier', '修饰': 'modifier',
+        'type': 'type', 'var_type': 'type', '变量类型': 'type', '类型': 'type',
+        'module': 'module', '功能模块': 'module', '模块': 'module',
+        'purpose': 'purpose', '使用目的': 'purpose', '目的': 'purpose',
+        'initial_value': 'initial_value', 'init': 'initial_value', '初始值': 'initial_value',
+        'array_size': 'array_size', 'size': 'array_size', '数组大小': 'array_size',
+        'comment': 'comment', '备注': 'comment',
+        'min': 'min', '最小值': 'min',
+        'max': 'max', '最大值': 'max',
+        'resolution': 'resolution', '分辨率': 'resolution',
+    }
+    
+    # 输出CSV的列
+    OUTPUT_COLUMNS = ['row', 'modifier', 'type', 'suggested_type', 'saved_bytes', 'type_warning',
+                      'module', 'purpose', 'name', 'breakdown', 'error']
+    
+    # 每批处理的行数（批内翻译去重，也是多进程的任务粒度）
+    CHUNK_SIZE = 2000
+    
+    def read_rows(self, path, sheet=None):
+        """
+        流式读取需求表
+        
+        Args:
+            path: CSV 或 XLSX 文件路径
+            sheet: XLSX 工作表名称（默认第一个）
+        
+        Yields:
+            dict: 以字段名为键的行数据，附带 'row'（数据行号，从1开始）
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext in ('.xlsx', '.xlsm'):
+            rows = self._iter_xlsx(path, sheet)
+        else:
+            rows = self._iter_csv(path)
+        
+        header = None
+        row_number = 0
+        for values in rows:
+            if header is None:
+                header = [self.COLUMN_ALIASES.get(str(cell or '').strip().lower(),
+                                                  self.COLUMN_ALIASES.get(str(cell or '').strip()))
+                          for cell in values]
+                continue
+            
+            row_number += 1
+            row = {'row': row_number}
+            for field, value in zip(header, values):
+                if field:
+                    row[field] = '' if value is None else str(value).strip()
+            yield row
+    
+    def _iter_csv(self, path):
+        """逐行读取CSV（兼容Excel导出的BOM）"""
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            yield from csv.reader(f)
+    
+    def _iter_xlsx(self, path, sheet=None):
+        """以只读模式逐行读取XLSX"""
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise RuntimeError("读取XLSX需要安装 openpyxl: pip install openpyxl")
+        
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+            yield from worksheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    
+    def name_rows(self, rows, workers=1, max_length=None, with_code=True, styles=()):
+        """
+        批量生成变量名
+        
+        Args:
+            rows: 行数据可迭代对象（见 read_rows）
+            workers: 工作进程数，1 表示在当前进程中处理
+            max_length: 名称长度预算，None 时使用配置值
+            with_code: 是否生成变量定义代码
+            styles: 额外输出的命名风格（预设名称），结果中以 'name[预设名]' 给出
+        
+        Yields:
+            dict: 每行的结果，顺序与输入一致
+        """
+        chunks = self._iter_chunks(rows)
+        
+        if workers <= 1:
+            for chunk in chunks:
+                yield from self.name_chunk(chunk, max_length, with_code, styles)
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tasks = ((chunk, max_length, with_code, styles) for chunk in chunks)
+            for results in executor.map(_name_chunk_task, tasks):
+                yield from results
+    
+    def _iter_chunks(self, rows):
+        """按 CHUNK_SIZE 分批"""
+        iterator = iter(rows)
+        while True:
+            chunk = list(islice(iterator, self.CHUNK_SIZE))
+            if not chunk:
+                return
+            yield chunk
+    
+    def name_chunk(self, chunk, max_length=None, with_code=True, styles=()):
+        """
+        处理一批行数据
+        
+        先对批内的模块/目的去重并批量翻译，之后逐行生成时全部命中翻译缓存。
+        
+        Returns:
+            list: 结果列表
+        """
+        by_context = {}
+        for row in chunk:
+            context = 'array' if row.get('array_size') else 'variable'
+            texts = by_context.setdefault(context, set())
+            for field in ('module', 'purpose'):
+                if row.get(field):
+                    texts.add(row[field])
+        for context, texts in by_context.items():
+            translator.batch_translate(list(texts), context)
+        
+        compiled_styles = [(name, naming_styles.get(name)) for name in styles]
+        return [self.name_row(row, max_length, with_code, compiled_styles) for row in chunk]
+    
+    def name_row(self, row, max_length=None, with_code=True, styles=()):
+        """
+        为单行生成变量名、命名解析和定义代码
+        
+        Args:
+            styles: [(预设名称, NamingStyle)]，额外按这些风格生成名称
+        
+        Returns:
+            dict: {'row', 'modifier', 'type', 'suggested_type', 'saved_bytes', 'type_warning',
+                   'module', 'purpose', 'name', 'breakdown', 'code', 'error'}
+        """
+        modifier = row.get('modifier', '')
+        var_type = row.get('type', '')
+        module = row.get('module', '')
+        purpose = row.get('purpose', '')
+        array_size = row.get('array_size', '')
+        
+        result = {
+            'row': row.get('row', 0),
+            'modifier': modifier,
+            'type': var_type,
+            'module': module,
+            'purpose': purpose,
+            'array_size': array_size,
+            'initial_value': row.get('initial_value') or '0',
+            'comment': row.get('comment', ''),
+            'suggested_type': '',
+            'saved_bytes': 0,
+            'type_warning': '',
+            'name': '',
+            'breakdown': '',
+            'code': '',
+            'error': ''
+        }
+        
+        if not module and not purpose:
+            result['error'] = "功能模块和使用目的不能同时为空"
+            return result
+        
+        if array_size and not array_size.isdigit():
+            result['error'] = f"数组大小无效: {array_size}"
+            return result
+        
+        if row.get('min') or row.get('max'):
+            # 按取值范围选择最窄的类型：类型为空时直接采用，否则给出建议和可节省的内存
+            min_value = type_selector.parse_number(row.get('min', ''))
+            max_value = type_selector.parse_number(row.get('max', ''))
+            if min_value is None or max_value is None:
+                result['error'] = "取值范围无效，需要同时填写最小值和最大值"
+                return result
+            selection = type_selector.compare(
+                var_type, min_value, max_value,
+                type_selector.parse_number(row.get('resolution', '')) or None
+            )
+            if selection['type'] is None:
+                result['error'] = f"没有能容纳 {min_value} ~ {max_value} 的整型"
+                return result
+            result['suggested_type'] = selection['type']
+            if not var_type:
+                var_type = result['type'] = selection['type']
+            elif not selection['fits']:
+                result['type_warning'] = f"{var_type} 放不下 {min_value} ~ {max_value}"
+            else:
+                result['saved_bytes'] = selection['saved'] * (int(array_size) if array_size else 1)
+        
+        naming = naming_generator.generate_variable_name(
+            modifier, var_type, module, purpose, is_array=bool(array_size), max_length=max_length
+        )
+        
+        # 翻译结果为空的部分会生成 s_f_channel_1_ 这样的残缺名称，按失败处理
+        untranslated = [item['description'] for item in naming['breakdown'] if not item['part']]
+        if untranslated:
+            result['error'] = f"无法翻译: {'、'.join(untranslated)}"
+            return result
+        validation = identifier_validator.validate(naming['name'])
+        if not validation['valid']:
+            result['error'] = f"生成的名称无效: {'; '.join(validation['issues'])}"
+            return result
+        
+        result['name'] = naming['name']
+        result['breakdown'] = '; '.join(
+            f"{item['part']}: {item['description']}" for item in naming['breakdown']
+        )
+        
+        for style_name, style in styles:
+            result[f'name[{style_name}]'] = naming_generator.generate_variable_name(
+                modifier, var_type, module, purpose, is_array=bool(array_size),
+                max_length=max_length, style=style
+            )['name']
+        
+        if with_code:
+            result['code'] = self.generate_code(result)
+        
+        return result
+    
+    def generate_code(self, result):
+        """
+        根据命名结果生成变量/数组定义代码
+        
+        Args:
+            result: name_row 返回的结果
+        
+        Returns:
+            str: 定义代码
+        """
+        if result['array_size']:
+            return code_generator.generate_array_code(
+                result['name'], result['type'], int(result['array_size']),
+                result['modifier'], result['module'], result['purpose'], result['comment']
+            )
+        return code_generator.generate_variable_code(
+            result['name'], result['type'], result['modifier'], result['module'],
+            result['purpose'], result['initial_value'], result['comment']
+        )
+    
+    def register_result(self, result):
+        """
+        在标识符登记表中登记结果，重名时改用登记表给出的名称并重新生成代码
+        
+        Returns:
+            dict: 结果（名称可能已改变）
+        """
+        kind = 'array' if result['array_size'] else 'variable'
+        owner = identifier_registry.make_owner(
+            kind, result['modifier'], result['type'], result['module'], result['purpose']
+        )
+        name = identifier_registry.issue(result['name'], owner)
+        if name != result['name']:
+            result['breakdown'] += f"; {result['name']} 已被使用，自动改为 {name}"
+            result['name'] = name
+            if result['code']:
+                result['code'] = self.generate_code(result)
+        return result
+    
+    def run(self, input_path, output_path, code_path=None, sheet=None,
+            workers=1, max_length=None, use_registry=False, styles=()):
+        """
+        读取需求表，写出命名结果CSV（以及可选的C代码文件）
+        
+        Args:
+            use_registry: 是否通过标识符登记表去重（登记在主进程中按行序进行）；
+                          不使用时本次生成中重名的行记为错误
+            styles: 额外输出的命名风格（预设名称），每种风格一列
+        
+        Returns:
+            dict: 统计信息 {'total': 行数, 'named': 成功数, 'errors': 失败数,
+                            'saved_bytes': 按建议类型可节省的内存,
+                            'type_warnings': 类型放不下取值范围的行数}
+        """
+        stats = {'total': 0, 'named': 0, 'errors': 0, 'saved_bytes': 0, 'type_warnings': 0}
+        rows = self.read_rows(input_path, sheet)
+        results = self.name_rows(rows, workers, max_length, bool(code_path), tuple(styles))
+        columns = self.OUTPUT_COLUMNS[:]
+        columns[columns.index('name') + 1:columns.index('name') + 1] = [
+            f'name[{style_name}]' for style_name in styles
+        ]
+        
+        code_file = open(code_path, 'w', encoding='utf-8') if code_path else None
+        code_writer = (code_generator.open_writer(code_file, os.path.basename(code_path))
+                       if code_file else None)
+        try:
+            with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+                writer.writeheader()
+                
+                issued_rows = {}  # 名称 -> 行号，同名只输出一次，避免C文件重复定义
+                for result in results:
+                    stats['total'] += 1
+                    if not result['error']:
+                        if use_registry:
+                            self.register_result(result)
+                        first_row = issued_rows.setdefault(result['name'], result['row'])
+                        if first_row != result['row']:
+                            result['error'] = f"与第{first_row}行重复"
+                    
+                    if result['error']:
+                        stats['errors'] += 1
+                    else:
+                        stats['named'] += 1
+                        stats['saved_bytes'] += result['saved_bytes']
+                        stats['type_warnings'] += bool(result['type_warning'])
+                        if code_writer:
+                            code_writer.write(result['code'])
+                    writer.writerow(result)
+                
+                if code_writer:
+                    code_writer.close()
+        finally:
+            if code_file:
+                code_file.close()
+            if use_registry:
+                identifier_registry.save()
+        
+        return stats
+
+
+def _name_chunk_task(args):
+    """工作进程入口（需为模块级函数以便序列化）"""
+    chunk, max_length, with_code, styles = args
+    return batch_namer.name_chunk(chunk, max_length, with_code, styles)
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="从CSV/XLSX需求表批量生成C变量名")
+    parser.add_argument('input', help="需求表路径（.csv 或 .xlsx）")
+    parser.add_argument('-o', '--output', help="命名结果CSV路径（默认: <输入名>_named.csv）")
+    parser.add_argument('--code', help="同时输出变量定义代码到此文件")
+    parser.add_argument('--sheet', help="XLSX工作表名称（默认第一个）")
+    parser.add_argument('-j', '--workers', type=int, default=1, help="工作进程数（默认1）")
+    parser.add_argument('--max-length', type=int, default=None,
+                        help="名称长度预算（默认使用配置的 max_name_length）")
+    parser.add_argument('--registry', nargs='?', const='', default=None,
+                        help="通过标识符登记表去重（可指定登记文件，默认 config/identifier_registry.json）")
+    parser.add_argument('--import-sources', nargs='+', metavar='PATH', default=[],
+                        help="先从已有C源码（文件或目录）导入标识符到登记表")
+    parser.add_argument('--style', action='append', default=[], metavar='PRESET',
+                        choices=naming_styles.preset_names(),
+                        help="同时按命名预设生成名称（可重复指定）")
+    args = parser.parse_args(argv)
+    
+    output = args.output or f"{os.path.splitext(args.input)[0]}_named.csv"
+    use_registry = args.registry is not None or bool(args.import_sources)
+    
+    try:
+        if args.registry:
+            identifier_registry.load(args.registry)
+        if args.import_sources:
+            count = identifier_registry.import_sources(args.import_sources)
+            print(f"从源码导入 {count} 个标识符")
+        
+        stats = batch_namer.run(args.input, output, args.code, args.sheet,
+                                args.workers, args.max_length, use_registry, args.style)
+    except (OSError, RuntimeError) as e:
+        print(f"批量命名失败: {e}", file=sys.stderr)
+        return 1
+    
+    print(f"共 {stats['total']} 行，生成 {stats['named']} 个变量名，失败 {stats['errors']} 行")
+    if stats['saved_bytes']:
+        print(f"按建议类型（suggested_type 列）可节省 {stats['saved_bytes']} bytes")
+    if stats['type_warnings']:
+        print(f"{stats['type_warnings']} 行的类型放不下取值范围（见 type_warning 列）")
+    print(f"结果已写入: {output}")
+    return 0
+
+
+# 全局实例
+batch_namer = BatchNamer()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+二进制文件转C数组模块
+把校准表、字库、固件镜像等文件内存映射后分块格式化为 8/16/32 位元素的数组初始化代码，
+支持字节序和对齐属性，注释块沿用数组的注释模板
+
+命令行用法:
+    python -m utils.blob_converter font.bin -o font_data.c --name c_u8a_font_data --bits 8 --align 4
+"""
+
+import argparse
+import binascii
+import mmap
+import os
+import sys
+from array import array
+from core.type_info import type_info_manager
+from utils.code_templates import code_templates
+
+
+class BlobConverter:
+    """二进制文件转C数组"""
+    
+    # 元素位宽 -> (元素类型, array 模块的类型码)
+    ELEMENT_TYPES = {8: ('uint8_t', 'B'), 16: ('uint16_t', 'H'), 32: ('uint32_t', 'I')}
+    
+    # 每行的元素个数
+    PER_LINE = {8: 16, 16: 8, 32: 8}
+    
+    # 修饰类型 -> 存储类
+    STORAGE_CLASSES = {
+        '全局变量': '', '全局数组': '',
+        '静态变量': 'static ', '静态数组': 'static ',
+        '常量': 'const ', '常量数组': 'const ',
+        '静态常量': 'static const ',
+    }
+    
+    # 对齐属性写法
+    ALIGN_STYLES = {
+        'gcc': '__attribute__((aligned({alignment})))',  # GCC/Clang/armcc，放在数组名之后
+        'c11': '_Alignas({alignment})',                  # C11，放在声明最前面
+    }
+    
+    # 每次格式化的字节数（行字节数的整数倍）
+    CHUNK_SIZE = 64 * 1024
+    
+    def element_count(self, size, element_bits=8):
+        """文件大小对应的元素个数（不足一个元素的尾部补零）"""
+        element_bytes = element_bits // 8
+        return (size + element_bytes - 1) // element_bytes
+    
+    def format_lines(self, data, element_bits=8, endian='little', per_line=None):
+        """
+        把一段数据格式化为初始化列表的若干行
+        
+        Args:
+            data: bytes/memoryview，长度为元素大小的整数倍
+            element_bits: 元素位宽（8/16/32）
+            endian: 多字节元素的字节序（'little'/'big'）
+            per_line: 每行元素个数，None 时使用默认值
+        
+        Returns:
+            str: 以换行结尾的若干行，每个元素后带逗号
+        """
+        element_bytes = element_bits // 8
+        per_line = per_line or self.PER_LINE[element_bits]
+        if element_bytes > 1 and endian == 'little':
+            # 转成大端字节序，按元素分组的十六进制文本即为元素值
+            values = array(self.ELEMENT_TYPES[element_bits][1])
+            values.frombytes(data)
+            if sys.byteorder == 'little':
+                values.byteswap()
+            data = values.tobytes()
+        
+        # 每行宽度固定（"    " + 每个元素 "0xHH, "，行尾的 ", " 换成 ",\n"），
+        # 先铺好整块的行模板，再按列把十六进制数字成片写入
+        digits = element_bytes * 2
+        cell = digits + 4
+        width = 4 + per_line * cell
+        step = per_line * digits
+        hex_digits = binascii.hexlify(data).upper()
+        full_lines = len(hex_digits) // step
+        
+        template = (b'    ' + (b'0x' + b'0' * digits + b', ') * per_line)[:-2] + b',\n'
+        text = bytearray(template * full_lines)
+        for column in range(per_line):
+            for digit in range(digits):
+                source = column * digits + digit
+                text[4 + column * cell + 2 + digit::width] = hex_digits[source:full_lines * step:step]
+        
+        rest = hex_digits[full_lines * step:]
+        if rest:
+            text += b'    ' + b', '.join(
+                b'0x' + rest[i:i + digits] for i in range(0, len(rest), digits)
+            ) + b',\n'
+        return text.decode('ascii')
+    
+    def convert(self, path, stream, var_name, element_bits=8, endian='little', alignment=None,
+                align_style='gcc', modifier='常量', module='', purpose='', comment='', per_line=None):
+        """
+        把文件转换为数组定义并写入文本流
+        
+        文件通过内存映射分块读取，每块格式化后立即写出，内存占用与文件大小无关。
+        
+        Args:
+            path: 输入文件路径
+            stream: 输出文本流
+            var_name: 数组名
+            element_bits: 元素位宽（8/16/32）
+            endian: 多字节元素的字节序（'little'/'big'）
+            alignment: 对齐字节数（2的幂），None 表示不加对齐属性
+            align_style: 对齐属性写法（见 ALIGN_STYLES）
+            modifier: 修饰类型（见 STORAGE_CLASSES）
+            module: 功能模块
+            purpose: 使用目的
+            comment: 额外注释
+            per_line: 每行元素个数，None 时使用默认值
+        
+        Returns:
+            dict: {'size': 文件字节数, 'count': 元素个数, 'padding': 尾部补零的字节数,
+                   'element_type': 元素类型}
+        """
+        if element_bits not in self.ELEMENT_TYPES:
+            raise ValueError(f"不支持的元素位宽: {element_bits}（可选 8/16/32）")
+        if endian not in ('little', 'big'):
+            raise ValueError(f"未知的字节序: {endian}")
+        if alignment is not None and (alignment <= 0 or alignment & (alignment - 1)):
+            raise ValueError(f"对齐字节数必须是2的幂: {alignment}")
+        
+        size = os.path.getsize(path)
+        if size == 0:
+            raise ValueError(f"文件为空: {path}")
+        
+        element_type = self.ELEMENT_TYPES[element_bits][0]
+        element_bytes = element_bits // 8
+        count = self.element_count(size, element_bits)
+        padding = count * element_bytes - size
+        
+        notes = [f"由 {os.path.basename(path)} 生成，{size} bytes"]
+        if element_bytes > 1:
+            notes.append('小端' if endian == 'little' else '大端')
+            if padding:
+                notes.append(f"末尾补 {padding} 个 0x00")
+        if alignment:
+            notes.append(f"{alignment} 字节对齐")
+        if comment:
+            notes.append(comment)
+        
+        total_bytes, memory_str = type_info_manager.get_memory_size(element_type, count)
+        stream.write(code_templates.get('array', 'comment')({
+            'var_name': var_name,
+            'element_type': element_type,
+            'array_size': count,
+            'range': type_info_manager.get_range_str(element_type),
+            'memory': memory_str,
+            'element_bytes': element_bytes,
+            'total_bytes': total_bytes,
+            'module': module,
+            'purpose': purpose,
+            'modifier': modifier,
+            'comment': '，'.join(notes),
+        }))
+        stream.write(self.declaration(var_name, element_type, count, modifier, alignment, align_style)
+                     + " = {\n")
+        
+        per_line = per_line or self.PER_LINE[element_bits]
+        chunk_size = self.CHUNK_SIZE - self.CHUNK_SIZE % (per_line * element_bytes)
+        with open(path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                memoryview(mapped) as view:
+            for start in range(0, size, chunk_size):
+                chunk = view[start:start + chunk_size]
+                if len(chunk) % element_bytes:
+                    chunk = bytes(chunk) + b'\0' * padding
+                stream.write(self.format_lines(chunk, element_bits, endian, per_line))
+                del chunk
+        stream.write("};\n\n")
+        
+        return {'size': size, 'count': count, 'padding': padding, 'element_type': element_type}
+    
+    def declaration(self, var_name, element_type, count, modifier='常量', alignment=None,
+                    align_style='gcc'):
+        """生成数组声明部分（不含初始化列表）"""
+        storage_class = self.STORAGE_CLASSES.get(modifier, '')
+        prefix = suffix = ''
+        if alignment:
+            attribute = self.ALIGN_STYLES[align_style].format(alignment=alignment)
+            if align_style == 'c11':
+                prefix = attribute + ' '
+            else:
+                suffix = ' ' + attribute
+        return f"{prefix}{storage_class}{element_type} {var_name}[{count}]{suffix}"
+    
+    def convert_file(self, path, output_path, var_name, **options):
+        """
+        转换到输出文件（先写临时文件再替换）
+        
+        Args:
+            path: 输入文件路径
+            output_path: 输出文件路径
+            var_name: 数组名
+            **options: 同 convert()
+        
+        Returns:
+            dict: convert() 的结果
+        """
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        temp_file = f"{output_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8', newline='\n', buffering=1024 * 1024) as f:
+                result = self.convert(path, f, var_name, **options)
+            os.replace(temp_file, output_path)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+        return result
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="把二进制文件转换为C数组")
+    parser.add_argument('input', help="输入文件")
+    parser.add_argument('-o', '--output', help="输出文件（默认输出到标准输出）")
+    parser.add_argument('--name', required=True, help="数组名")
+    parser.add_argument('--bits', type=int, default=8, choices=(8, 16, 32), help="元素位宽")
+    parser.add_argument('--endian', default='little', choices=('little', 'big'), help="多字节元素的字节序")
+    parser.add_argument('--align', type=int, help="对齐字节数")
+    parser.add_argument('--align-style', default='gcc', choices=tuple(BlobConverter.ALIGN_STYLES),
+                        help="对齐属性写法")
+    parser.add_argument('--modifier', default='常量', help="修饰类型（常量/静态常量/全局数组等）")
+    parser.add_argument('--module', default='', help="功能模块")
+    parser.add_argument('--purpose', default='', help="使用目的")
+    args = parser.parse_args(argv)
+    
+    options = {
+        'element_bits': args.bits, 'endian': args.endian, 'alignment': args.align,
+        'align_style': args.align_style, 'modifier': args.modifier,
+        'module': args.module, 'purpose': args.purpose,
+    }
+    try:
+        if args.output:
+            result = blob_converter.convert_file(args.input, args.output, args.name, **options)
+        else:
+            result = blob_converter.convert(args.input, sys.stdout, args.name, **options)
+    except Exception as e:
+        print(f"转换失败: {e}", file=sys.stderr)
+        return 1
+    
+    if args.output:
+        print(f"{args.input}: {result['size']} bytes -> {result['element_type']}[{result['count']}]")
+    return 0
+
+
+# 全局实例
+blob_converter = BlobConverter()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,8 +3,103 @@
 负责生成格式化的C代码
 """
 
+import io
 from datetime import datetime
 from core.type_info import type_info_manager
+from core.layout import layout_engine
+from utils.code_templates import code_templates
+from utils.enum_tables import enum_table_generator
+
+
+# 文件结尾
+FILE_FOOTER = """/*******************************************************************************
+ * End of file
+ ******************************************************************************/\n"""
+
+
+class CodeWriter:
+    """
+    流式C文件写入器
+    
+    定义逐个写入有界缓冲区，缓冲区满时整块写到目标流，
+    内存占用与定义数量无关，耗时与输出大小成正比。
+    """
+    
+    # 默认缓冲区大小（字符数）
+    BUFFER_SIZE = 64 * 1024
+    
+    def __init__(self, stream, header='', buffer_size=None):
+        """
+        初始化写入器
+        
+        Args:
+            stream: 有 write() 方法的文本流（文件、io.StringIO、socket.makefile('w') 等）
+            header: 文件头，空字符串表示不写文件头
+            buffer_size: 缓冲区大小（字符数），None 时使用 BUFFER_SIZE
+        """
+        self.stream = stream
+        self.buffer_size = buffer_size or self.BUFFER_SIZE
+        self.written = 0  # 已写入的字符数（含缓冲区中的）
+        self.count = 0    # 已写入的定义数
+        self._chunks = []
+        self._buffered = 0
+        self._closed = False
+        if header:
+            self._append(header)
+    
+    def write(self, definition):
+        """写入一个定义"""
+        self._append(definition)
+        self.count += 1
+    
+    def write_all(self, definitions):
+        """
+        写入多个定义（可以是生成器，边生成边写出）
+        
+        Returns:
+            int: 本次写入的定义数
+        """
+        before = self.count
+        for definition in definitions:
+            self.write(definition)
+        return self.count - before
+    
+    def flush(self):
+        """把缓冲区写到目标流"""
+        if self._chunks:
+            self.stream.write(''.join(self._chunks))
+            self._chunks = []
+            self._buffered = 0
+        if hasattr(self.stream, 'flush'):
+            self.stream.flush()
+    
+    def close(self):
+        """写入文件结尾并刷新（不关闭目标流）"""
+        if not self._closed:
+            self._closed = True
+            self._append(FILE_FOOTER)
+            self.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # 出错时不写文件结尾，只把已生成的内容写出
+            self.flush()
+        return False
+    
+    def _append(self, text):
+        """加入缓冲区，超过上限时写出"""
+        self._chunks.append(text)
+        self._buffered += len(text)
+        self.written += len(text)
+        if self._buffered >= self.buffer_size:
+            self.stream.write(''.join(self._chunks))
+            self._chunks = []
+            self._buffered = 0
 
 
 class CodeGenerator:
@@ -41,27 +136,6 @@ class CodeGenerator:
         Returns:
             str: 生成的代码
         """
-        # 获取类型信息
-        type_info = type_info_manager.get_type_info(var_type)
-        range_str = type_info_manager.get_range_str(var_type)
-        bytes_str = type_info.get('bytes', 0)
-        
-        # 生成注释块
-        code = f"""/*******************************************************************************
- * 变量名称: {var_name}
- * 变量类型: {var_type}
- * 取值范围: {range_str}
- * 内存占用: {bytes_str} bytes
- * 功能模块: {module}
- * 使用目的: {purpose}
- * 修饰属性: {modifier}
-"""
-        
-        if comment:
-            code += f" * 备注: {comment}\n"
-        
-        code += " ******************************************************************************/\n"
-        
         # 生成变量定义
         storage_class = ""
         if modifier == "静态变量":
@@ -71,9 +145,20 @@ class CodeGenerator:
         elif modifier == "volatile":
             storage_class = "volatile "
         
-        code += f"{storage_class}{var_type} {var_name} = {initial_value};\n\n"
-        
-        return code
+        fields = {
+            'var_name': var_name,
+            'var_type': var_type,
+            'range': type_info_manager.get_range_str(var_type),
+            'bytes': type_info_manager.get_type_size(var_type),
+            'module': module,
+            'purpose': purpose,
+            'modifier': modifier,
+            'comment': comment,
+            'storage_class': storage_class,
+            'initial_value': initial_value,
+        }
+        return (code_templates.get('variable', 'comment')(fields)
+                + code_templates.get('variable', 'declaration')(fields))
     
     def generate_array_code(self, var_name, element_type, array_size, 
                            modifier, module, purpose, comment=""):
@@ -93,26 +178,7 @@ class CodeGenerator:
             str: 生成的代码
         """
         # 获取类型信息
-        range_str = type_info_manager.get_range_str(element_type)
         total_bytes, memory_str = type_info_manager.get_memory_size(element_type, array_size)
-        element_bytes = type_info_manager.get_type_info(element_type).get('bytes', 0)
-        
-        # 生成注释块
-        code = f"""/*******************************************************************************
- * 变量名称: {var_name}
- * 变量类型: {element_type}[{array_size}]
- * 元素范围: {range_str}
- * 数组大小: {array_size}
- * 内存占用: {memory_str} ({element_bytes} bytes × {array_size})
- * 功能模块: {module}
- * 使用目的: {purpose}
- * 修饰属性: {modifier}
-"""
-        
-        if comment:
-            code += f" * 备注: {comment}\n"
-        
-        code += " ******************************************************************************/\n"
         
         # 生成数组定义
         storage_class = ""
@@ -121,113 +187,160 @@ class CodeGenerator:
         elif modifier == "常量":
             storage_class = "const "
         
-        code += f"{storage_class}{element_type} {var_name}[{array_size}] = {{0}};\n\n"
-        
-        return code
+        fields = {
+            'var_name': var_name,
+            'element_type': element_type,
+            'array_size': array_size,
+            'range': type_info_manager.get_range_str(element_type),
+            'memory': memory_str,
+            'element_bytes': type_info_manager.get_type_size(element_type),
+            'total_bytes': total_bytes,
+            'module': module,
+            'purpose': purpose,
+            'modifier': modifier,
+            'comment': comment,
+            'storage_class': storage_class,
+        }
+        return (code_templates.get('array', 'comment')(fields)
+                + code_templates.get('array', 'declaration')(fields))
     
-    def generate_struct_code(self, struct_name, members, comment=""):
+    def generate_struct_code(self, struct_name, members, comment="", profile=None):
         """
         生成结构体定义代码
         
         Args:
             struct_name: 结构体名称（不含_t后缀）
-            members: 成员列表，每个成员是字典 {'type': '', 'name': '', 'comment': ''}
+            members: 成员列表，每个成员是字典 {'type': '', 'name': '', 'comment': ''}，
+                     可选 'array_size'
             comment: 结构体注释
+            profile: ABI名称，None 时使用当前ABI
             
         Returns:
             str: 生成的代码
         """
-        # 计算结构体大小和对齐
-        total_size, aligned_size, padding = self._calculate_struct_size(members)
-        
-        # 生成注释块
-        code = f"""/*******************************************************************************
- * 结构体名称: {struct_name}_t
- * 功能描述: {comment if comment else struct_name}
- * 总大小: {aligned_size} bytes (4字节对齐)
- * 成员数量: {len(members)}
-"""
-        
-        if padding > 0:
-            code += f" * 填充字节: {padding} bytes\n"
-        
-        code += " ******************************************************************************/\n"
-        
-        # 生成结构体定义
-        code += "typedef struct {\n"
-        
-        offset = 0
-        for i, member in enumerate(members):
-            member_type = member['type']
+        # 计算结构体布局
+        layout = layout_engine.layout(members, profile=profile)
+        fields = {
+            'struct_name': struct_name,
+            'description': comment if comment else struct_name,
+            'comment': comment,
+            'size': layout['size'],
+            'profile': layout['profile'],
+            'member_count': len(members),
+            'padding': layout['padding'],
+        }
+        
+        # 注释块和结构体定义
+        parts = [
+            code_templates.get('struct', 'comment')(fields),
+            code_templates.get('struct', 'begin')(fields),
+        ]
+        
+        render_member = code_templates.get('struct', 'member')
+        for member, member_layout in zip(members, layout['members']):
             member_name = member['name']
-            member_comment = member.get('comment', '')
-            
-            # 获取成员类型信息
-            type_info = type_info_manager.get_type_info(member_type)
-            range_str = type_info_manager.get_range_str(member_type)
-            member_bytes = type_info.get('bytes', 0)
-            
-            # 计算对齐
-            if member_bytes > 0:
-                alignment = min(member_bytes, 4)  # 假设最大4字节对齐
-                if offset % alignment != 0:
-                    offset += alignment - (offset % alignment)
+            if member.get('array_size'):
+                member_name += f"[{member['array_size']}]"
             
-            # 生成成员定义
-            padding_str = f"Offset: {offset}" if i > 0 else f"Offset: {offset}"
-            
-            if member_comment:
-                code += f"    {member_type:<12} {member_name};  // {member_comment}, Range: {range_str}, {padding_str}\n"
-            else:
-                code += f"    {member_type:<12} {member_name};  // Range: {range_str}, {padding_str}\n"
-            
-            offset += member_bytes
+            parts.append(render_member({
+                'type': member['type'],
+                'name': member_name,
+                'comment': member.get('comment', ''),
+                'range': type_info_manager.get_range_str(member['type'], layout['profile']),
+                'offset': member_layout['offset'],
+                'size': member_layout['size'],
+                'padding_before': member_layout['padding_before'],
+            }))
+        
+        parts.append(code_templates.get('struct', 'end')(fields))
+        return ''.join(parts)
+    
+    def optimize_struct_order(self, members, profile=None, array_count=1):
+        """
+        重排结构体成员以减少填充（标记 'pinned' 的成员保持原位置）
         
-        code += f"}} {struct_name}_t;\n\n"
+        依次尝试按对齐/大小降序、升序排列，以及逐个位置挑选填充最少的成员，
+        取总大小最小的方案；都不比原顺序小时保持原顺序。
         
-        return code
+        Args:
+            members: 成员列表（同 generate_struct_code）
+            profile: ABI名称，None 时使用当前ABI
+            array_count: 结构体数组的元素个数，用于统计数组总共节省的字节数
+        
+        Returns:
+            dict: {
+                'members': 建议的成员顺序,
+                'profile': ABI名称,
+                'original_size': 原大小,
+                'optimized_size': 优化后大小,
+                'saved': 每个结构体节省的字节数,
+                'array_count': 数组元素个数,
+                'array_saved': 整个数组节省的字节数,
+                'moved': 位置发生变化的成员数
+            }
+        """
+        original = layout_engine.layout(members, profile=profile)
+        items = [
+            (member, member_layout['size'], member_layout['alignment'])
+            for member, member_layout in zip(members, original['members'])
+        ]
+        slots = [i for i, member in enumerate(members) if not member.get('pinned')]
+        free = [items[i] for i in slots]
+        
+        candidates = []
+        for order in (
+            sorted(free, key=lambda item: (-item[2], -item[1])),
+            sorted(free, key=lambda item: (item[2], item[1])),
+        ):
+            candidate = list(members)
+            for slot, item in zip(slots, order):
+                candidate[slot] = item[0]
+            candidates.append(candidate)
+        candidates.append(self._greedy_struct_order(items))
+        
+        best = list(members)
+        best_size = original['size']
+        for candidate in candidates:
+            size = layout_engine.layout(candidate, profile=profile)['size']
+            if size < best_size:
+                best, best_size = candidate, size
+        
+        saved = original['size'] - best_size
+        return {
+            'members': best,
+            'profile': original['profile'],
+            'original_size': original['size'],
+            'optimized_size': best_size,
+            'saved': saved,
+            'array_count': array_count,
+            'array_saved': saved * array_count,
+            'moved': sum(1 for a, b in zip(members, best) if a is not b),
+        }
     
-    def _calculate_struct_size(self, members):
+    def _greedy_struct_order(self, items):
         """
-        计算结构体大小
+        逐个位置挑选成员：固定成员原样放置，其余位置选当前偏移下填充最少、
+        对齐和大小最大的成员
         
         Args:
-            members: 成员列表
-            
+            items: [(成员, 大小, 对齐)]
+        
         Returns:
-            tuple: (未对齐大小, 对齐后大小, 填充字节数)
+            list: 成员顺序
         """
+        remaining = [item for item in items if not item[0].get('pinned')]
+        order = []
         offset = 0
-        max_alignment = 1
-        
-        for member in members:
-            member_type = member['type']
-            type_info = type_info_manager.get_type_info(member_type)
-            member_bytes = type_info.get('bytes', 0)
-            
-            if member_bytes > 0:
-                # 计算对齐
-                alignment = min(member_bytes, 4)  # 假设最大4字节对齐
-                max_alignment = max(max_alignment, alignment)
-                
-                # 对齐当前偏移
-                if offset % alignment != 0:
-                    offset += alignment - (offset % alignment)
-                
-                offset += member_bytes
-        
-        # 结构体末尾对齐
-        unaligned_size = offset
-        if offset % max_alignment != 0:
-            aligned_size = offset + (max_alignment - offset % max_alignment)
-        else:
-            aligned_size = offset
-        
-        padding = aligned_size - unaligned_size
-        
-        return unaligned_size, aligned_size, padding
+        for item in items:
+            if not item[0].get('pinned'):
+                item = min(remaining, key=lambda c: ((-offset) % c[2], -c[2], -c[1]))
+                remaining.remove(item)
+            member, size, alignment = item
+            offset += (-offset) % alignment + size
+            order.append(member)
+        return order
     
-    def generate_enum_code(self, enum_name, values, comment=""):
+    def generate_enum_code(self, enum_name, values, comment="", storage='int'):
         """
         生成枚举定义代码
         
@@ -235,44 +348,186 @@ class CodeGenerator:
             enum_name: 枚举名称（不含_e后缀）
             values: 枚举值列表，每个值是字典 {'name': '', 'value': None, 'comment': ''}
             comment: 枚举注释
+            storage: 存储方式（见 EnumTableGenerator.STORAGE_MODES）：
+                     'int' 为普通枚举，'c23' 为 enum : 最窄类型，'packed' 为紧凑枚举，
+                     'typedef' 为枚举常量 + 最窄类型的 typedef（{enum_name}_e 即该类型）
             
         Returns:
             str: 生成的代码
         """
-        # 生成注释块
-        code = f"""/*******************************************************************************
- * 枚举名称: {enum_name}_e
- * 功能描述: {comment if comment else enum_name}
- * 成员数量: {len(values)}
- ******************************************************************************/\n"""
-        
-        # 生成枚举定义
-        code += f"typedef enum {{\n"
-        
+        fields = {
+            'enum_name': enum_name,
+            'description': comment if comment else enum_name,
+            'comment': comment,
+            'value_count': len(values),
+            'storage': '',
+            'size': '',
+            'attribute': '',
+            'underlying': '',
+        }
+        info = None
+        if storage != 'int':
+            info = enum_table_generator.storage_info(values, storage)
+            fields['storage'] = (f"{info['type']}（{enum_table_generator.STORAGE_MODES[storage]}，"
+                                 f"{info['bytes']} bytes）")
+            fields['size'] = info['bytes']
+            if storage == 'c23':
+                fields['underlying'] = info['type']
+            elif storage == 'packed':
+                fields['attribute'] = '__attribute__((packed))'
+        
+        # 注释块和枚举定义
+        parts = [
+            code_templates.get('enum', 'comment')(fields),
+            code_templates.get('enum', 'begin')(fields),
+        ]
+        
+        render_value = code_templates.get('enum', 'value')
+        last = len(values) - 1
         for i, value in enumerate(values):
-            value_name = value['name']
             value_num = value.get('value')
-            value_comment = value.get('comment', '')
-            
-            # 生成枚举值定义
-            if value_num is not None:
-                code += f"    {value_name} = {value_num}"
-            else:
-                code += f"    {value_name}"
-            
-            # 添加逗号（最后一个除外）
-            if i < len(values) - 1:
-                code += ","
-            
-            # 添加注释
-            if value_comment:
-                code += f"  // {value_comment}"
-            
-            code += "\n"
+            parts.append(render_value({
+                'name': value['name'],
+                # 值为 0 时也要输出，转成文本
+                'value': '' if value_num is None else str(value_num),
+                # 逗号（最后一个除外）
+                'comma': ',' if i < last else '',
+                'comment': value.get('comment', ''),
+                'index': i,
+            }))
+        
+        if storage == 'typedef':
+            # 枚举只提供常量，{enum_name}_e 由 storage_code 定义为窄类型
+            parts.append(code_templates.get('enum', 'end')(dict(fields, enum_name=f"{enum_name}_value")))
+        else:
+            parts.append(code_templates.get('enum', 'end')(fields))
+        if info:
+            parts.append(enum_table_generator.storage_code(enum_name, info))
+        return ''.join(parts)
+    
+    # 可由 render_definition 渲染的定义种类
+    DEFINITION_KINDS = ('variable', 'array', 'struct', 'enum', 'raw')
+    
+    # 放在头文件中的定义种类（类型定义），其余放源文件
+    HEADER_KINDS = ('struct', 'enum')
+    
+    def render_definition(self, spec):
+        """
+        按定义描述渲染代码
         
-        code += f"}} {enum_name}_e;\n\n"
+        Args:
+            spec: {'kind': 定义种类, 其余键为对应 generate_<kind>_code 的参数}，
+                  kind 为 'raw' 时直接使用 spec['code']
         
-        return code
+        Returns:
+            str: 生成的代码
+        """
+        kind = spec.get('kind')
+        if kind not in self.DEFINITION_KINDS:
+            raise ValueError(f"未知的定义种类: {kind}")
+        if kind == 'raw':
+            return spec['code']
+        args = {key: value for key, value in spec.items() if key != 'kind'}
+        return getattr(self, f'generate_{kind}_code')(**args)
+    
+    def generate_extern_declaration(self, spec):
+        """
+        生成变量/数组定义对应的 extern 声明（用于头文件）
+        
+        Args:
+            spec: 定义描述（见 render_definition）
+        
+        Returns:
+            str: 声明代码，静态变量、局部变量和非变量定义返回空字符串
+        """
+        kind = spec.get('kind')
+        modifier = spec.get('modifier', '')
+        if kind not in ('variable', 'array') or modifier in ('静态变量', '局部变量'):
+            return ''
+        
+        # 与 generate_variable_code/generate_array_code 的存储类保持一致
+        qualifier = ''
+        if modifier == '常量':
+            qualifier = 'const '
+        elif modifier == 'volatile' and kind == 'variable':
+            qualifier = 'volatile '
+        
+        if kind == 'array':
+            declaration = f"extern {qualifier}{spec['element_type']} {spec['var_name']}[{spec['array_size']}];"
+        else:
+            declaration = f"extern {qualifier}{spec['var_type']} {spec['var_name']};"
+        
+        description = spec.get('purpose') or spec.get('comment')
+        if description:
+            declaration += f"  // {description}"
+        return declaration + "\n"
+    
+    @staticmethod
+    def definition_types(spec):
+        """定义用到的类型名称（用于计算依赖的类型信息）"""
+        types = [spec.get('var_type'), spec.get('element_type')]
+        types.extend(member.get('type') for member in spec.get('members', ()))
+        return sorted({type_name for type_name in types if type_name})
+    
+    def register_definition_types(self, specs):
+        """
+        登记定义中的枚举（按存储类型）和结构体类型，之后引用它们的成员按实际定义布局
+        
+        Args:
+            specs: 定义描述列表（见 render_definition），其他种类的定义忽略
+        """
+        for spec in specs:
+            if spec.get('kind') == 'enum':
+                try:
+                    enum_table_generator.register_layout(
+                        spec['enum_name'], spec['values'], spec.get('storage', 'int')
+                    )
+                except ValueError as e:
+                    print(f"登记枚举 {spec['enum_name']} 失败: {e}")
+        for spec in specs:
+            if spec.get('kind') == 'struct':
+                layout_engine.register(f"{spec['struct_name']}_t", spec['members'])
+    
+    def file_header(self, filename):
+        """生成文件头"""
+        return self.file_header_template.format(
+            filename=filename,
+            date=datetime.now().strftime("%Y-%m-%d")
+        )
+    
+    def open_writer(self, stream, filename, include_header=True, buffer_size=None):
+        """
+        创建流式写入器，之后逐个 write() 定义，最后 close() 写入文件结尾
+        
+        Args:
+            stream: 目标文本流（文件、socket.makefile('w') 等）
+            filename: 文件名（用于文件头）
+            include_header: 是否包含文件头
+            buffer_size: 缓冲区大小（字符数）
+        
+        Returns:
+            CodeWriter: 写入器（也可用作 with 语句的上下文管理器）
+        """
+        header = self.file_header(filename) if include_header else ''
+        return CodeWriter(stream, header, buffer_size)
+    
+    def write_file(self, stream, filename, definitions, include_header=True, buffer_size=None):
+        """
+        把定义流式写成完整的C文件
+        
+        Args:
+            stream: 目标文本流
+            filename: 文件名
+            definitions: 定义的可迭代对象（可以是生成器）
+            include_header: 是否包含文件头
+            buffer_size: 缓冲区大小（字符数）
+        
+        Returns:
+            int: 写入的字符数
+        """
+        with self.open_writer(stream, filename, include_header, buffer_size) as writer:
+            writer.write_all(definitions)
+        return writer.written
     
     def generate_file(self, filename, definitions, include_header=True):
         """
@@ -286,25 +541,9 @@ class CodeGenerator:
         Returns:
             str: 完整的C文件内容
         """
-        code = ""
-        
-        if include_header:
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            code = self.file_header_template.format(
-                filename=filename,
-                date=date_str
-            )
-        
-        # 添加所有定义
-        for definition in definitions:
-            code += definition
-        
-        # 添加文件结尾
-        code += """/*******************************************************************************
- * End of file
- ******************************************************************************/\n"""
-        
-        return code
+        buffer = io.StringIO()
+        self.write_file(buffer, filename, definitions, include_header)
+        return buffer.getvalue()
 
 
 # 全局实例
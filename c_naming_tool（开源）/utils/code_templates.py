@@ -0,0 +1,272 @@
+"""
+代码模板模块
+变量/数组/结构体/枚举的注释块和声明格式由模板定义（config/code_templates.json，可在设置中切换风格），
+模板在加载时编译成渲染函数，生成代码时不再解析格式
+
+模板语法与 str.format 相同（字面的花括号写成 {{ }}），另外:
+    <? ... ?>  可选片段，其中的字段都非空时才输出
+模板可以写成字符串，也可以写成行列表（每行末尾补换行，整行是可选片段时换行也属于该片段）
+"""
+
+import re
+import string
+from core.config import config_service
+
+
+# 内置模板（“标准”风格），配置中的风格缺少某部分时使用
+DEFAULT_TEMPLATES = {
+    'variable': {
+        'comment': [
+            "/*******************************************************************************",
+            " * 变量名称: {var_name}",
+            " * 变量类型: {var_type}",
+            " * 取值范围: {range}",
+            " * 内存占用: {bytes} bytes",
+            " * 功能模块: {module}",
+            " * 使用目的: {purpose}",
+            " * 修饰属性: {modifier}",
+            "<? * 备注: {comment}?>",
+            " ******************************************************************************/",
+        ],
+        'declaration': ["{storage_class}{var_type} {var_name} = {initial_value};", ""],
+    },
+    'array': {
+        'comment': [
+            "/*******************************************************************************",
+            " * 变量名称: {var_name}",
+            " * 变量类型: {element_type}[{array_size}]",
+            " * 元素范围: {range}",
+            " * 数组大小: {array_size}",
+            " * 内存占用: {memory} ({element_bytes} bytes × {array_size})",
+            " * 功能模块: {module}",
+            " * 使用目的: {purpose}",
+            " * 修饰属性: {modifier}",
+            "<? * 备注: {comment}?>",
+            " ******************************************************************************/",
+        ],
+        'declaration': ["{storage_class}{element_type} {var_name}[{array_size}] = {{0}};", ""],
+    },
+    'struct': {
+        'comment': [
+            "/*******************************************************************************",
+            " * 结构体名称: {struct_name}_t",
+            " * 功能描述: {description}",
+            " * 总大小: {size} bytes ({profile} 对齐)",
+            " * 成员数量: {member_count}",
+            "<? * 填充字节: {padding} bytes?>",
+            " ******************************************************************************/",
+        ],
+        'begin': ["typedef struct {{"],
+        'member': ["    {type:<12} {name};  // <?{comment}, ?>Range: {range}, Offset: {offset}"],
+        'end': ["}} {struct_name}_t;", ""],
+    },
+    'enum': {
+        'comment': [
+            "/*******************************************************************************",
+            " * 枚举名称: {enum_name}_e",
+            " * 功能描述: {description}",
+            " * 成员数量: {value_count}",
+            "<? * 存储类型: {storage}?>",
+            " ******************************************************************************/",
+        ],
+        'begin': ["typedef enum <?{attribute} ?><?: {underlying} ?>{{"],
+        'value': ["    {name}<? = {value}?>{comma}<?  // {comment}?>"],
+        'end': ["}} {enum_name}_e;", ""],
+    },
+}
+
+# 各模板可以使用的字段
+TEMPLATE_FIELDS = {
+    'variable': {
+        'comment': ('var_name', 'var_type', 'range', 'bytes', 'module', 'purpose', 'modifier', 'comment'),
+        'declaration': ('storage_class', 'var_type', 'var_name', 'initial_value', 'modifier'),
+    },
+    'array': {
+        'comment': ('var_name', 'element_type', 'array_size', 'range', 'memory', 'element_bytes',
+                    'total_bytes', 'module', 'purpose', 'modifier', 'comment'),
+        'declaration': ('storage_class', 'element_type', 'var_name', 'array_size', 'modifier'),
+    },
+    'struct': {
+        'comment': ('struct_name', 'description', 'size', 'profile', 'member_count', 'padding',
+                    'comment'),
+        'begin': ('struct_name',),
+        'member': ('type', 'name', 'comment', 'range', 'offset', 'size', 'padding_before'),
+        'end': ('struct_name', 'size'),
+    },
+    'enum': {
+        'comment': ('enum_name', 'description', 'value_count', 'comment', 'storage', 'size'),
+        'begin': ('enum_name', 'attribute', 'underlying'),
+        'value': ('name', 'value', 'comma', 'comment', 'index'),
+        'end': ('enum_name',),
+    },
+}
+
+# 内置风格名称
+DEFAULT_STYLE = '标准'
+
+_OPTIONAL_RE = re.compile(r'<\?(.*?)\?>', re.DOTALL)
+_FORMAT_SPEC_RE = re.compile(r'^[\w<>=^+\- #,.%]*$')
+_formatter = string.Formatter()
+
+
+def join_lines(template):
+    """行列表形式的模板转为字符串"""
+    if isinstance(template, str):
+        return template
+    text = ''
+    for line in template:
+        if line.startswith('<?') and line.endswith('?>'):
+            text += line[:-2] + '\n?>'
+        else:
+            text += line + '\n'
+    return text
+
+
+def _escape_literal(literal):
+    """字面文本转为单引号 f-string 中的源码"""
+    source = repr(literal)
+    if source[0] == '"':
+        source = "'" + source[1:-1].replace("'", "\\'") + "'"
+    return source[1:-1].replace('{', '{{').replace('}', '}}')
+
+
+def _compile_text(text, allowed, used):
+    """把一段模板（不含可选片段）转成一个 f-string 表达式，没有内容时返回 None"""
+    pieces = []
+    try:
+        parsed = list(_formatter.parse(text))
+    except ValueError as e:
+        raise ValueError(f"模板格式错误: {e}")
+    for literal, field, spec, conversion in parsed:
+        if literal:
+            pieces.append(_escape_literal(literal))
+        if field is None:
+            continue
+        if field not in allowed:
+            raise ValueError(f"模板中的未知字段: {{{field}}}，可用字段: {', '.join(allowed)}")
+        if not _FORMAT_SPEC_RE.match(spec or ''):
+            raise ValueError(f"模板字段 {{{field}}} 的格式说明无效: {spec}")
+        if conversion and conversion not in 'rsa':
+            raise ValueError(f"模板字段 {{{field}}} 的转换无效: !{conversion}")
+        used.add(field)
+        conversion = f"!{conversion}" if conversion else ''
+        spec = f":{spec}" if spec else ''
+        pieces.append(f'{{v["{field}"]{conversion}{spec}}}')
+    return f"f'{''.join(pieces)}'" if pieces else None
+
+
+def compile_template(template, allowed):
+    """
+    把模板编译成渲染函数
+    
+    Args:
+        template: 模板字符串或行列表
+        allowed: 可以使用的字段名称
+    
+    Returns:
+        function: render(fields) -> str，fields 为 {字段名: 值}
+    
+    Raises:
+        ValueError: 模板格式错误或使用了未知字段
+    """
+    text = join_lines(template)
+    rest = _OPTIONAL_RE.sub('', text)
+    if '<?' in rest or '?>' in rest:
+        raise ValueError("模板中的可选片段 <? ?> 不完整")
+    
+    # 每段固定文本/可选片段编译成一个 f-string，渲染时只做一次拼接
+    pieces = []
+    position = 0
+    for match in _OPTIONAL_RE.finditer(text):
+        pieces.append(_compile_text(text[position:match.start()], allowed, set()))
+        used = set()
+        inner = _compile_text(match.group(1), allowed, used)
+        if used and inner:
+            condition = ' and '.join(f'v["{field}"]' for field in sorted(used))
+            inner = f"({inner} if {condition} else '')"
+        pieces.append(inner)
+        position = match.end()
+    pieces.append(_compile_text(text[position:], allowed, set()))
+    
+    expression = ' + '.join(piece for piece in pieces if piece) or "''"
+    source = f"def render(v):\n    return {expression}\n"
+    namespace = {}
+    exec(compile(source, '<code_template>', 'exec'), namespace)
+    return namespace['render']
+
+
+class CodeTemplates:
+    """代码模板管理"""
+    
+    def __init__(self):
+        """初始化代码模板"""
+        self.styles = {}      # 风格名称 -> 说明
+        self.style = DEFAULT_STYLE
+        self._compiled = {}   # 风格名称 -> {种类: {部分: 渲染函数}}
+        self._style_data = {}
+        self.load_templates()
+        config_service.subscribe('code_templates', lambda data: self.load_templates())
+        config_service.subscribe('app_settings', lambda data: self._apply_settings())
+    
+    def load_templates(self):
+        """加载模板风格并编译，编译失败的风格不可用"""
+        data = config_service.get('code_templates', {})
+        self._style_data = {DEFAULT_STYLE: {}}
+        self._style_data.update(data.get('styles', {}))
+        self.styles = {}
+        self._compiled = {}
+        for name, style in self._style_data.items():
+            try:
+                self._compiled[name] = self._compile_style(style)
+                self.styles[name] = style.get('description', '')
+            except ValueError as e:
+                print(f"编译代码模板 {name} 失败: {e}")
+        
+        self._default_style = data.get('default', DEFAULT_STYLE)
+        self._apply_settings()
+    
+    def _compile_style(self, style):
+        """编译一种风格的全部模板，缺少的部分使用内置模板"""
+        return {
+            kind: {
+                part: compile_template(style.get(kind, {}).get(part, template), TEMPLATE_FIELDS[kind][part])
+                for part, template in parts.items()
+            }
+            for kind, parts in DEFAULT_TEMPLATES.items()
+        }
+    
+    def _apply_settings(self):
+        """使用设置中选择的风格（没有时用配置文件中的默认风格）"""
+        codegen = config_service.get('app_settings', {}).get('codegen', {})
+        style = codegen.get('comment_style', self._default_style)
+        if not self.set_style(style):
+            self.set_style(DEFAULT_STYLE)
+    
+    def get_styles(self):
+        """获取所有可用的风格名称"""
+        return list(self.styles.keys())
+    
+    def set_style(self, style):
+        """
+        切换当前风格
+        
+        Returns:
+            bool: 是否切换成功
+        """
+        if style not in self._compiled:
+            return False
+        self.style = style
+        self._active = self._compiled[style]
+        return True
+    
+    def get(self, kind, part):
+        """获取当前风格中某部分的渲染函数"""
+        return self._active[kind][part]
+    
+    def signature(self):
+        """当前风格的模板内容（用于判断生成结果是否需要更新）"""
+        return {'style': self.style, 'templates': self._style_data.get(self.style, {})}
+
+
+# 全局实例
+code_templates = CodeTemplates()
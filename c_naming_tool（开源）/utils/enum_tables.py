@@ -0,0 +1,400 @@
+"""
+枚举字符串表模块
+为枚举生成 枚举值 -> 名称 的转换（连续取值用数组直接索引，稀疏取值用 switch），
+以及 名称 -> 枚举值 的查找（最小完美哈希，或按名称排序后二分查找）；
+生成前检查名称和取值。另外按取值范围计算枚举的存储类型和大小
+"""
+
+import re
+from core.type_info import type_info_manager
+from core.type_selector import type_selector
+from core.layout import layout_engine
+
+
+class EnumTableGenerator:
+    """枚举字符串表生成"""
+    
+    # C标识符
+    IDENTIFIER_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+    
+    # 标准C（C23 以前）枚举常量的取值范围（int）
+    VALUE_MIN = -2 ** 31
+    VALUE_MAX = 2 ** 31 - 1
+    
+    # 取值跨度不超过 值个数 × DENSE_RATIO 时使用数组（空位填 NULL）
+    DENSE_RATIO = 2
+    
+    # 名称 -> 枚举值的查找方式
+    LOOKUP_METHODS = ('hash', 'sorted')
+    
+    # FNV-1a 参数（生成的C代码使用相同的哈希，末尾再做一次 murmur3 混合，
+    # 否则对 2 的幂取模时低位只取决于种子的低位）
+    FNV_OFFSET = 2166136261
+    FNV_PRIME = 16777619
+    
+    # 完美哈希每个桶尝试的最大种子
+    MAX_SEED = 1000000
+    
+    # 枚举存储方式
+    STORAGE_MODES = {
+        'int': '默认（int）',
+        'c23': 'C23 固定底层类型',
+        'packed': '__attribute__((packed))',
+        'typedef': '窄类型 typedef + 静态断言',
+    }
+    
+    def resolve_values(self, values):
+        """
+        计算每个枚举常量的实际值（未指定值的按前一个值加1）并检查
+        
+        Args:
+            values: 枚举值列表 [{'name': '', 'value': None 或整数/数值文本, 'comment': ''}]
+        
+        Returns:
+            dict: {
+                'items': [(名称, 值)]（按定义顺序）,
+                'aliases': {值: [同值的名称, ...]}（多个名称取同一个值时）
+            }
+        
+        Raises:
+            ValueError: 名称不是合法标识符、重名、值无法解析或超出 int 范围
+        """
+        errors = []
+        items = []
+        seen = set()
+        current = 0
+        for value in values:
+            name = value['name']
+            if not self.IDENTIFIER_RE.match(name):
+                errors.append(f"{name}: 不是合法的C标识符")
+            elif name in seen:
+                errors.append(f"{name}: 重名")
+            seen.add(name)
+            
+            explicit = value.get('value')
+            if explicit is not None:
+                try:
+                    current = int(str(explicit).strip(), 0) if isinstance(explicit, str) else int(explicit)
+                except ValueError:
+                    errors.append(f"{name}: 无法解析的值 {explicit}（只支持整数常量）")
+            if not self.VALUE_MIN <= current <= self.VALUE_MAX:
+                errors.append(f"{name}: 值 {current} 超出 int 范围")
+            items.append((name, current))
+            current += 1
+        
+        if errors:
+            raise ValueError("枚举值检查失败:\n" + "\n".join(errors))
+        
+        by_value = {}
+        for name, number in items:
+            by_value.setdefault(number, []).append(name)
+        aliases = {number: names for number, names in by_value.items() if len(names) > 1}
+        return {'items': items, 'aliases': aliases}
+    
+    def storage_info(self, values, storage='int', profile=None):
+        """
+        计算枚举的存储类型和大小
+        
+        int 以外的存储方式按取值范围选择最窄的整型（与 GCC 紧凑枚举的选择一致）。
+        
+        Args:
+            values: 枚举值列表（同 generate_enum_code）
+            storage: 存储方式（见 STORAGE_MODES）
+            profile: ABI名称，None 时使用当前ABI
+        
+        Returns:
+            dict: {
+                'storage': 存储方式,
+                'type': 存储类型,
+                'bytes': 字节数,
+                'alignment': 对齐字节数,
+                'int_bytes': 按 int 存储时的字节数,
+                'min'/'max': 最小/最大值,
+                'min_name'/'max_name': 取最小/最大值的枚举常量
+            }
+        """
+        if storage not in self.STORAGE_MODES:
+            raise ValueError(f"未知的枚举存储方式: {storage}")
+        items = self.resolve_values(values)['items']
+        if not items:
+            raise ValueError("枚举没有值")
+        
+        min_name, low = min(items, key=lambda item: item[1])
+        max_name, high = max(items, key=lambda item: item[1])
+        storage_type = 'int' if storage == 'int' else type_selector.select(low, high)['type']
+        size, alignment = type_info_manager.get_type_layout(storage_type, profile)
+        return {
+            'storage': storage,
+            'type': storage_type,
+            'bytes': size,
+            'alignment': alignment,
+            'int_bytes': type_info_manager.get_type_size('int', profile),
+            'min': low,
+            'max': high,
+            'min_name': min_name,
+            'max_name': max_name,
+        }
+    
+    def storage_code(self, enum_name, info):
+        """
+        固定存储类型的枚举定义之后的代码：typedef 方式为窄类型 typedef 和取值范围断言，
+        其余为大小断言（编译器不支持对应写法时编译失败而不是悄悄变回 int）
+        
+        Args:
+            enum_name: 枚举名称（不含_e后缀）
+            info: storage_info() 的结果
+        """
+        type_name = f"{enum_name}_e"
+        storage_type = info['type']
+        if info['storage'] == 'typedef':
+            limits = storage_type[:-2].upper()  # uint8_t -> UINT8
+            low = "0" if storage_type.startswith('u') else f"{limits}_MIN"
+            return (f"typedef {storage_type} {type_name};\n"
+                    f"_Static_assert({info['min_name']} >= {low} && {info['max_name']} <= {limits}_MAX, "
+                    f"\"{type_name}: value out of {storage_type} range\");\n\n")
+        return (f"_Static_assert(sizeof({type_name}) == {info['bytes']}, "
+                f"\"{type_name}: expected {info['bytes']}-byte storage\");\n\n")
+    
+    def register_layout(self, enum_name, values, storage='int'):
+        """
+        按存储类型登记枚举类型，结构体中该类型的成员按实际大小布局
+        
+        Returns:
+            dict: storage_info() 的结果
+        """
+        info = self.storage_info(values, storage)
+        layout_engine.register_alias(f"{enum_name}_e", info['type'])
+        return info
+    
+    @classmethod
+    def fnv1a(cls, text, seed=0):
+        """32位 FNV-1a 哈希（初值与 seed 异或，结果经 murmur3 fmix32 混合）"""
+        h = cls.FNV_OFFSET ^ seed
+        for byte in text.encode('utf-8'):
+            h = ((h ^ byte) * cls.FNV_PRIME) & 0xFFFFFFFF
+        h ^= h >> 16
+        h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+        h ^= h >> 13
+        h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+        return h ^ (h >> 16)
+    
+    def build_perfect_hash(self, names):
+        """
+        构造最小完美哈希（hash-and-displace）
+        
+        第一级按 fnv1a(name, 0) % n 分桶；从最大的桶开始，为每个多元素桶找一个种子 d，
+        使桶内名称的 fnv1a(name, d) % n 落在互不相同的空位上；单元素桶直接放入空位，
+        种子记为 -(位置) - 1。
+        
+        Args:
+            names: 名称列表（互不相同）
+        
+        Returns:
+            tuple: (种子表, 槽位表)，槽位表[i] 为放在第 i 个位置的名称
+        """
+        size = len(names)
+        buckets = [[] for _ in range(size)]
+        for name in names:
+            buckets[self.fnv1a(name) % size].append(name)
+        
+        seeds = [0] * size
+        slots = [None] * size
+        order = sorted(range(size), key=lambda b: len(buckets[b]), reverse=True)
+        for bucket_index in order:
+            bucket = buckets[bucket_index]
+            if len(bucket) <= 1:
+                break
+            for seed in range(1, self.MAX_SEED + 1):
+                positions = [self.fnv1a(name, seed) % size for name in bucket]
+                if len(set(positions)) == len(bucket) and all(slots[p] is None for p in positions):
+                    break
+            else:
+                raise ValueError(f"无法为 {', '.join(bucket)} 构造完美哈希")
+            seeds[bucket_index] = seed
+            for name, position in zip(bucket, positions):
+                slots[position] = name
+        
+        free = [i for i, slot in enumerate(slots) if slot is None]
+        for bucket_index in order:
+            bucket = buckets[bucket_index]
+            if len(bucket) == 1:
+                position = free.pop()
+                slots[position] = bucket[0]
+                seeds[bucket_index] = -position - 1
+        return seeds, slots
+    
+    def generate_code(self, enum_name, values, lookup='hash'):
+        """
+        生成枚举字符串表和转换函数
+        
+        Args:
+            enum_name: 枚举名称（不含_e后缀，与 generate_enum_code 一致）
+            values: 枚举值列表（同 generate_enum_code）
+            lookup: 名称 -> 枚举值的查找方式（'hash'、'sorted'），None 表示不生成
+        
+        Returns:
+            dict: {
+                'code': 生成的代码,
+                'dense': 枚举值 -> 名称是否使用数组,
+                'aliases': 同值的名称（见 resolve_values）
+            }
+        """
+        if not values:
+            raise ValueError("枚举没有值")
+        if lookup is not None and lookup not in self.LOOKUP_METHODS:
+            raise ValueError(f"未知的查找方式: {lookup}")
+        
+        resolved = self.resolve_values(values)
+        items = resolved['items']
+        type_name = f"{enum_name}_e"
+        
+        code = "#include <stdbool.h>\n#include <stddef.h>\n"
+        if lookup:
+            code += "#include <stdint.h>\n#include <string.h>\n"
+        code += "\n"
+        
+        to_string, dense = self._to_string_code(enum_name, type_name, items)
+        code += to_string
+        if lookup == 'hash':
+            code += self._hash_lookup_code(enum_name, type_name, items)
+        elif lookup == 'sorted':
+            code += self._sorted_lookup_code(enum_name, type_name, items)
+        
+        return {'code': code, 'dense': dense, 'aliases': resolved['aliases']}
+    
+    def _to_string_code(self, enum_name, type_name, items):
+        """枚举值 -> 名称"""
+        first_names = {}
+        for name, number in items:
+            first_names.setdefault(number, name)
+        low = min(first_names)
+        high = max(first_names)
+        dense = high - low + 1 <= len(first_names) * self.DENSE_RATIO
+        
+        code = f"""/*******************************************************************************
+ * 函数名称: {enum_name}_to_string
+ * 功能描述: {type_name} 转换为名称字符串，未定义的值返回 NULL
+ * 实现方式: {'数组索引' if dense else 'switch'}（{len(first_names)} 个取值，{low} ~ {high}）
+ ******************************************************************************/
+"""
+        if dense:
+            code += f"static const char *const {enum_name}_names[{high - low + 1}] = {{\n"
+            for number in sorted(first_names):
+                code += f"    [{number - low}] = \"{first_names[number]}\",\n"
+            code += "};\n\n"
+            code += f"const char *{enum_name}_to_string({type_name} value)\n{{\n"
+            index = "(long long)value" if low == 0 else f"((long long)value - ({low}))"
+            code += f"    long long index = {index};\n"
+            code += f"    if (index < 0 || index >= {high - low + 1}) {{\n        return NULL;\n    }}\n"
+            code += f"    return {enum_name}_names[index];\n}}\n\n"
+        else:
+            code += f"const char *{enum_name}_to_string({type_name} value)\n{{\n"
+            code += "    switch (value) {\n"
+            for number in sorted(first_names):
+                code += f"    case {first_names[number]}: return \"{first_names[number]}\";\n"
+            code += "    default: return NULL;\n    }\n}\n\n"
+        return code, dense
+    
+    def _hash_lookup_code(self, enum_name, type_name, items):
+        """名称 -> 枚举值（最小完美哈希，一次 strcmp）"""
+        names = [name for name, _ in items]
+        numbers = dict(items)
+        seeds, slots = self.build_perfect_hash(names)
+        size = len(names)
+        seed_type = 'int16_t' if all(-32768 <= s <= 32767 for s in seeds) else 'int32_t'
+        
+        code = f"""/*******************************************************************************
+ * 函数名称: {enum_name}_from_string
+ * 功能描述: 名称字符串转换为 {type_name}，名称不存在时返回 false
+ * 实现方式: 最小完美哈希（FNV-1a，{size} 个名称），只做一次 strcmp
+ ******************************************************************************/
+static uint32_t {enum_name}_hash(const char *name, uint32_t seed)
+{{
+    uint32_t h = {self.FNV_OFFSET}u ^ seed;
+    while (*name) {{
+        h ^= (uint8_t)*name++;
+        h *= {self.FNV_PRIME}u;
+    }}
+    h ^= h >> 16;
+    h *= 0x85EBCA6Bu;
+    h ^= h >> 13;
+    h *= 0xC2B2AE35u;
+    return h ^ (h >> 16);
+}}
+
+static const {seed_type} {enum_name}_hash_seeds[{size}] = {{
+"""
+        code += self._wrap([str(seed) for seed in seeds])
+        code += "};\n\n"
+        code += f"static const struct {{\n    const char *name;\n    {type_name} value;\n}} {enum_name}_hash_table[{size}] = {{\n"
+        for name in slots:
+            code += f"    {{\"{name}\", {name}}},  /* {numbers[name]} */\n"
+        code += "};\n\n"
+        code += f"""bool {enum_name}_from_string(const char *name, {type_name} *value)
+{{
+    int32_t seed = {enum_name}_hash_seeds[{enum_name}_hash(name, 0) % {size}u];
+    uint32_t slot = (seed < 0) ? (uint32_t)(-seed - 1) : {enum_name}_hash(name, (uint32_t)seed) % {size}u;
+    if (strcmp(name, {enum_name}_hash_table[slot].name) != 0) {{
+        return false;
+    }}
+    *value = {enum_name}_hash_table[slot].value;
+    return true;
+}}
+
+"""
+        return code
+    
+    def _sorted_lookup_code(self, enum_name, type_name, items):
+        """名称 -> 枚举值（按名称排序的表，二分查找）"""
+        # strcmp 按字节比较，名称为ASCII标识符时与 Python 字符串排序一致
+        ordered = sorted(items, key=lambda item: item[0].encode('utf-8'))
+        size = len(ordered)
+        
+        code = f"""/*******************************************************************************
+ * 函数名称: {enum_name}_from_string
+ * 功能描述: 名称字符串转换为 {type_name}，名称不存在时返回 false
+ * 实现方式: 按名称排序的表二分查找（{size} 个名称）
+ ******************************************************************************/
+static const struct {{
+    const char *name;
+    {type_name} value;
+}} {enum_name}_sorted_names[{size}] = {{
+"""
+        for name, number in ordered:
+            code += f"    {{\"{name}\", {name}}},  /* {number} */\n"
+        code += "};\n\n"
+        code += f"""bool {enum_name}_from_string(const char *name, {type_name} *value)
+{{
+    size_t low = 0;
+    size_t high = {size};
+    while (low < high) {{
+        size_t mid = low + (high - low) / 2;
+        int result = strcmp(name, {enum_name}_sorted_names[mid].name);
+        if (result == 0) {{
+            *value = {enum_name}_sorted_names[mid].value;
+            return true;
+        }}
+        if (result < 0) {{
+            high = mid;
+        }} else {{
+            low = mid + 1;
+        }}
+    }}
+    return false;
+}}
+
+"""
+        return code
+    
+    @staticmethod
+    def _wrap(items, per_line=16):
+        """初始化列表分行"""
+        width = max(len(item) for item in items)
+        lines = []
+        for start in range(0, len(items), per_line):
+            lines.append("    " + ", ".join(item.rjust(width) for item in items[start:start + per_line]) + ",\n")
+        return ''.join(lines)
+
+
+# 全局实例
+enum_table_generator = EnumTableGenerator()
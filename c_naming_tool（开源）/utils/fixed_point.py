@@ -0,0 +1,212 @@
+"""
+定点数模块
+为没有FPU的目标把 float/double 变量或结构体成员换成Q格式整数，
+生成转换宏和带取值范围注释的定义
+"""
+
+import math
+from core.type_info import type_info_manager
+from utils.code_generator import code_generator
+
+
+class FixedPointAdvisor:
+    """Q格式定点数建议"""
+    
+    # 可选的存储位宽
+    STORAGE_BITS = (8, 16, 32)
+    
+    def advise(self, min_value, max_value, resolution, max_bits=32):
+        """
+        选择能满足取值范围和分辨率的最窄Q格式
+        
+        先按范围确定整数位、按分辨率确定最少小数位，选出能放下的最窄存储类型，
+        剩余的位全部给小数部分以提高精度。
+        
+        Args:
+            min_value: 最小值
+            max_value: 最大值
+            resolution: 需要的分辨率（如 0.001）
+            max_bits: 存储类型的最大位宽
+        
+        Returns:
+            dict: {
+                'format': 格式名称（Q15、Q16.16、UQ8.8 等）,
+                'type': 存储类型,
+                'bits': 位宽,
+                'int_bits': 整数位（不含符号位）,
+                'frac_bits': 小数位,
+                'signed': 是否有符号,
+                'scale': 缩放系数 2^小数位,
+                'resolution': 实际分辨率,
+                'min': 可表示的最小值,
+                'max': 可表示的最大值,
+                'error': 最大量化误差（四舍五入）
+            }
+            没有能满足要求的格式时返回 None
+        """
+        if min_value > max_value:
+            min_value, max_value = max_value, min_value
+        if not resolution or resolution <= 0:
+            return None
+        
+        signed = min_value < 0
+        sign_bits = 1 if signed else 0
+        min_frac_bits = max(0, math.ceil(-math.log2(resolution)))
+        
+        # 整数位：能容纳 [min_value, max_value] 的最少位数
+        int_bits = 0
+        while (max_value > 2 ** int_bits - 2 ** -min_frac_bits
+               or (signed and min_value < -2 ** int_bits)):
+            int_bits += 1
+        
+        for bits in self.STORAGE_BITS:
+            if bits > max_bits:
+                break
+            frac_bits = bits - sign_bits - int_bits
+            if frac_bits >= min_frac_bits:
+                return self._make_advice(bits, int_bits, frac_bits, signed)
+        return None
+    
+    def _make_advice(self, bits, int_bits, frac_bits, signed):
+        """生成建议结果"""
+        scale = 2 ** frac_bits
+        if signed:
+            name = f"Q{frac_bits}" if int_bits == 0 else f"Q{int_bits + 1}.{frac_bits}"
+        else:
+            name = f"UQ{int_bits}.{frac_bits}"
+        return {
+            'format': name,
+            'type': f"{'int' if signed else 'uint'}{bits}_t",
+            'bits': bits,
+            'int_bits': int_bits,
+            'frac_bits': frac_bits,
+            'signed': signed,
+            'scale': scale,
+            'resolution': 1 / scale,
+            'min': -(2 ** int_bits) if signed else 0,
+            'max': 2 ** int_bits - 1 / scale,
+            'error': 0.5 / scale,
+        }
+    
+    def to_fixed(self, value, advice):
+        """把实数转换为定点存储值（四舍五入并限幅）"""
+        raw = math.floor(float(value) * advice['scale'] + 0.5)
+        low = round(advice['min'] * advice['scale'])
+        high = round(advice['max'] * advice['scale'])
+        return max(low, min(high, raw))
+    
+    def generate_macros(self, prefix, advice, float_type='float'):
+        """
+        生成转换和运算宏
+        
+        Args:
+            prefix: 宏前缀（通常为变量名或 结构体_成员）
+            advice: advise() 的结果
+            float_type: 转换使用的浮点类型
+        
+        Returns:
+            str: 宏定义代码
+        """
+        prefix = prefix.upper()
+        suffix = 'f' if float_type == 'float' else ''
+        storage_type = advice['type']
+        wide_type = f"{'int' if advice['signed'] else 'uint'}{min(advice['bits'] * 2, 64)}_t"
+        scale = f"{advice['scale']}.0{suffix}"
+        half = f"0.5{suffix}"
+        rounding = f"(((x) >= 0) ? {half} : -{half})" if advice['signed'] else half
+        
+        code = f"/* {prefix}: {advice['format']} 定点数，实际值 = 存储值 / {advice['scale']} */\n"
+        code += f"#define {prefix}_Q_FRAC          ({advice['frac_bits']})\n"
+        code += f"#define {prefix}_FROM_FLOAT(x)   (({storage_type})((x) * {scale} + {rounding}))\n"
+        code += f"#define {prefix}_TO_FLOAT(q)     (({float_type})(q) / {scale})\n"
+        code += (f"#define {prefix}_MUL(a, b)       "
+                 f"(({storage_type})((({wide_type})(a) * (b)) >> {prefix}_Q_FRAC))\n")
+        code += (f"#define {prefix}_DIV(a, b)       "
+                 f"(({storage_type})((({wide_type})(a) << {prefix}_Q_FRAC) / (b)))\n\n")
+        return code
+    
+    def describe(self, advice, min_value, max_value, resolution):
+        """生成范围说明（用于注释）"""
+        return (f"{advice['format']} 定点数，需要 {min_value:g} ~ {max_value:g} (分辨率 {resolution:g})，"
+                f"可表示 {advice['min']:g} ~ {advice['max']:.10g} (分辨率 {advice['resolution']:.6g}，"
+                f"最大误差 {advice['error']:.3g})")
+    
+    def generate_variable_code(self, var_name, float_type, modifier, module, purpose,
+                               min_value, max_value, resolution, initial_value=0):
+        """
+        生成定点化的变量定义（转换宏 + 变量定义）
+        
+        Args:
+            var_name: 变量名
+            float_type: 原浮点类型（float/double）
+            modifier: 修饰类型
+            module: 功能模块
+            purpose: 使用目的
+            min_value: 最小值
+            max_value: 最大值
+            resolution: 需要的分辨率
+            initial_value: 初始值（实数）
+        
+        Returns:
+            str: 生成的代码，没有合适的Q格式时返回 None
+        """
+        advice = self.advise(min_value, max_value, resolution)
+        if advice is None:
+            return None
+        
+        code = self.generate_macros(var_name, advice, float_type)
+        comment = f"代替 {float_type}，" + self.describe(advice, min_value, max_value, resolution)
+        if initial_value:
+            comment += f"，初始值 {float(initial_value):g}"
+        code += code_generator.generate_variable_code(
+            var_name, advice['type'], modifier, module, purpose,
+            str(self.to_fixed(initial_value, advice)), comment=comment
+        )
+        return code
+    
+    def convert_members(self, members, profile=None):
+        """
+        把结构体中填写了取值范围和分辨率的浮点成员换成Q格式
+        
+        Args:
+            members: 成员列表（需要 'min'、'max'、'resolution'）
+            profile: ABI名称，只转换该ABI下没有硬件浮点支持的成员；
+                     None 时转换所有满足条件的浮点成员
+        
+        Returns:
+            dict: {
+                'members': 转换后的成员列表,
+                'advices': [(原成员, advise() 的结果)],
+                'skipped': 缺少范围/分辨率或无法表示的浮点成员名称
+            }
+        """
+        converted = []
+        advices = []
+        skipped = []
+        for member in members:
+            if not type_info_manager.is_float_type(member['type']):
+                converted.append(member)
+                continue
+            if profile and type_info_manager.has_hardware_float(member['type'], profile):
+                converted.append(member)
+                continue
+            
+            advice = None
+            if member.get('min') is not None and member.get('resolution'):
+                advice = self.advise(member['min'], member['max'], member['resolution'])
+            if advice is None:
+                skipped.append(member['name'])
+                converted.append(member)
+                continue
+            
+            comment = self.describe(advice, member['min'], member['max'], member['resolution'])
+            if member.get('comment'):
+                comment = f"{member['comment']}，{comment}"
+            converted.append(dict(member, type=advice['type'], comment=comment))
+            advices.append((member, advice))
+        
+        return {'members': converted, 'advices': advices, 'skipped': skipped}
+
+
+# 全局实例
+fixed_point_advisor = FixedPointAdvisor()
@@ -0,0 +1,259 @@
+"""
+标志位打包模块
+找出结构体中只存放 0/1 或很小取值范围的成员，生成等价的位域结构体或标志字及访问宏，
+并统计节省的内存
+"""
+
+import re
+from core.type_info import type_info_manager
+from core.layout import layout_engine
+
+
+class FlagPacker:
+    """标志位打包分析"""
+    
+    # 按名称判断为布尔标志的成员（is_ready、has_data、tx_flag、motor_en 等）
+    FLAG_NAME_RE = re.compile(
+        r'^(?:is|has|b|en|enable|flag)_|_(?:flag|en|enable|enabled|valid|ready|busy|ok)$'
+        r'|^(?:flag|enabled|valid|ready|busy)$',
+        re.IGNORECASE
+    )
+    
+    # 标志字的存储类型（按位数从小到大）
+    STORAGE_TYPES = (('uint8_t', 8), ('uint16_t', 16), ('uint32_t', 32))
+    
+    # 可打包的最大位数（超过时按原类型保留）
+    MAX_FIELD_BITS = 7
+    
+    def member_bits(self, member):
+        """
+        计算成员需要的位数
+        
+        优先使用成员上的 'min'/'max' 取值范围，其次是类型本身的范围（如 bool），
+        整型成员名称像布尔标志时按 1 位处理。
+        
+        Args:
+            member: 成员字典 {'type': '', 'name': '', 可选 'min'、'max'、'array_size'}
+        
+        Returns:
+            int: 需要的位数，不适合打包时返回 None
+        """
+        if member.get('array_size') or member.get('pinned') or member.get('resolution'):
+            return None
+        
+        type_info = type_info_manager.get_type_info(member['type'])
+        if not type_info or type_info_manager.is_float_type(member['type']):
+            return None
+        
+        min_value = member.get('min', type_info.get('min'))
+        max_value = member.get('max', type_info.get('max'))
+        if min_value is None or max_value is None or min_value < 0:
+            return None
+        
+        if max_value > 1 and self.FLAG_NAME_RE.search(member['name']) and 'min' not in member:
+            max_value = 1
+        
+        bits = max(1, int(max_value).bit_length())
+        if bits > self.MAX_FIELD_BITS or bits >= type_info.get('bytes', 0) * 8:
+            return None
+        return bits
+    
+    def analyze(self, members, profile=None, array_count=1):
+        """
+        分析结构体的标志位打包收益
+        
+        Args:
+            members: 成员列表
+            profile: ABI名称，None 时使用当前ABI
+            array_count: 结构体数组的元素个数
+        
+        Returns:
+            dict: {
+                'fields': [{'member', 'bits', 'shift', 'word'}]（可打包的成员）,
+                'words': [(存储类型, 已用位数)]（标志字）,
+                'members': 打包后的成员列表（标志字放在第一个可打包成员的位置）,
+                'profile': ABI名称,
+                'original_size': 原大小,
+                'packed_size': 打包后大小,
+                'saved': 每个结构体节省的字节数,
+                'array_count': 数组元素个数,
+                'array_saved': 整个数组节省的字节数
+            }
+        """
+        fields = []
+        for member in members:
+            bits = self.member_bits(member)
+            if bits is not None:
+                fields.append({'member': member, 'bits': bits})
+        
+        # 按顺序装入标志字，字段不跨字
+        words = []
+        max_bits = self.STORAGE_TYPES[-1][1]
+        for field in fields:
+            if not words or words[-1][1] + field['bits'] > max_bits:
+                words.append(['', 0])
+            field['word'] = len(words) - 1
+            field['shift'] = words[-1][1]
+            words[-1][1] += field['bits']
+        words = [(self._storage_type(bits), bits) for _, bits in words]
+        
+        packed_members = self._packed_members(members, fields, words)
+        
+        original = layout_engine.layout(members, profile=profile)
+        packed = layout_engine.layout(packed_members, profile=profile) if fields else original
+        if len(fields) < 2 or packed['size'] >= original['size']:
+            # 单个成员或没有收益时不建议打包
+            fields, words, packed_members, packed = [], [], list(members), original
+        
+        saved = original['size'] - packed['size']
+        return {
+            'fields': fields,
+            'words': words,
+            'members': packed_members,
+            'profile': original['profile'],
+            'original_size': original['size'],
+            'packed_size': packed['size'],
+            'saved': saved,
+            'array_count': array_count,
+            'array_saved': saved * array_count,
+        }
+    
+    def _storage_type(self, bits):
+        """能容纳指定位数的最小存储类型"""
+        for type_name, width in self.STORAGE_TYPES:
+            if bits <= width:
+                return type_name
+        return self.STORAGE_TYPES[-1][0]
+    
+    def _packed_members(self, members, fields, words):
+        """用标志字替换可打包成员"""
+        packed = {id(field['member']): field['word'] for field in fields}
+        result = []
+        placed = set()
+        for member in members:
+            word = packed.get(id(member))
+            if word is None:
+                result.append(member)
+            elif word not in placed:
+                placed.add(word)
+                result.append({
+                    'type': words[word][0],
+                    'name': self.word_name(word, len(words)),
+                    'comment': '标志位'
+                })
+        return result
+    
+    @staticmethod
+    def word_name(index, count):
+        """标志字成员名"""
+        return 'flags' if count == 1 else f'flags{index}'
+    
+    def generate_bitfield_code(self, struct_name, members, analysis, comment=""):
+        """
+        生成位域形式的结构体
+        
+        同一标志字的位域集中放在第一个标志成员的位置，按标志字的存储类型声明
+        （uint8_t 等），与标志字形式的布局一致；C标准只保证 _Bool/int/unsigned int
+        位域，嵌入式编译器普遍支持定宽类型。
+        
+        Args:
+            struct_name: 结构体名称（不含_t后缀）
+            members: 原成员列表
+            analysis: analyze() 的结果
+            comment: 结构体注释
+        
+        Returns:
+            str: 生成的代码
+        """
+        fields = {id(field['member']): field for field in analysis['fields']}
+        code = self._header(struct_name, analysis, comment, "位域")
+        code += "typedef struct {\n"
+        placed = set()
+        for member in members:
+            field = fields.get(id(member))
+            if field is None:
+                lines = [(member, f"{member['type']:<12} {member['name']}"
+                          + (f"[{member['array_size']}]" if member.get('array_size') else ''))]
+            elif field['word'] in placed:
+                continue
+            else:
+                placed.add(field['word'])
+                storage_type = analysis['words'][field['word']][0]
+                lines = [
+                    (other['member'], f"{storage_type:<12} {other['member']['name']} : {other['bits']}")
+                    for other in analysis['fields'] if other['word'] == field['word']
+                ]
+            for line_member, line in lines:
+                code += f"    {line};"
+                if line_member.get('comment'):
+                    code += f"  // {line_member['comment']}"
+                code += "\n"
+        code += f"}} {struct_name}_t;\n\n"
+        return code
+    
+    def generate_flags_code(self, struct_name, members, analysis, comment=""):
+        """
+        生成标志字形式的结构体和访问宏
+        
+        Args:
+            struct_name: 结构体名称（不含_t后缀）
+            members: 原成员列表
+            analysis: analyze() 的结果
+            comment: 结构体注释
+        
+        Returns:
+            str: 生成的代码
+        """
+        code = self._header(struct_name, analysis, comment, "标志字")
+        code += "typedef struct {\n"
+        for member in analysis['members']:
+            name = member['name']
+            if member.get('array_size'):
+                name += f"[{member['array_size']}]"
+            code += f"    {member['type']:<12} {name};"
+            if member.get('comment'):
+                code += f"  // {member['comment']}"
+            code += "\n"
+        code += f"}} {struct_name}_t;\n\n"
+        
+        # 访问宏
+        prefix = struct_name.upper()
+        word_count = len(analysis['words'])
+        for field in analysis['fields']:
+            field_name = field['member']['name'].upper()
+            word = self.word_name(field['word'], word_count)
+            storage_type = analysis['words'][field['word']][0]
+            mask = f"0x{(1 << field['bits']) - 1:X}u"
+            shift = field['shift']
+            code += f"/* {field['member']['name']}: {field['bits']} 位，位于 {word} 第 {shift} 位"
+            if field['member'].get('comment'):
+                code += f"，{field['member']['comment']}"
+            code += " */\n"
+            code += f"#define {prefix}_{field_name}_SHIFT  ({shift}u)\n"
+            code += f"#define {prefix}_{field_name}_MASK   ({mask} << {prefix}_{field_name}_SHIFT)\n"
+            code += (f"#define {prefix}_GET_{field_name}(p)     "
+                     f"(((p)->{word} >> {prefix}_{field_name}_SHIFT) & {mask})\n")
+            code += (f"#define {prefix}_SET_{field_name}(p, v)  "
+                     f"((p)->{word} = ({storage_type})(((p)->{word} & ~{prefix}_{field_name}_MASK) | "
+                     f"(((v) & {mask}) << {prefix}_{field_name}_SHIFT)))\n\n")
+        return code
+    
+    def _header(self, struct_name, analysis, comment, form):
+        """生成注释块"""
+        code = f"""/*******************************************************************************
+ * 结构体名称: {struct_name}_t
+ * 功能描述: {comment if comment else struct_name}
+ * 打包形式: {form}（{len(analysis['fields'])} 个标志成员）
+ * 总大小: {analysis['packed_size']} bytes ({analysis['profile']} 对齐)，原 {analysis['original_size']} bytes
+"""
+        if analysis['saved'] > 0:
+            code += f" * 节省内存: 每个 {analysis['saved']} bytes"
+            if analysis['array_count'] > 1:
+                code += f"，{analysis['array_count']} 个共 {analysis['array_saved']} bytes"
+            code += "\n"
+        code += " ******************************************************************************/\n"
+        return code
+
+
+# 全局实例
+flag_packer = FlagPacker()
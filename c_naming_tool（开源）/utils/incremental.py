@@ -0,0 +1,256 @@
+"""
+增量代码生成模块
+按定义内容（输入参数、用到的类型信息和生成设置）的哈希记录清单，
+只重新渲染变化的定义；内容没变（忽略生成日期行）的输出文件不重写，字节和修改时间都保持不变
+
+命令行用法:
+    python -m utils.incremental project.json -o generated/
+project.json 格式: {"files": {"signals.c": [{"kind": "variable", "var_name": ..., ...}]}}
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from core.config import config_service
+from core.layout import layout_engine
+from core.type_info import type_info_manager
+from utils.code_generator import code_generator
+from utils.code_templates import code_templates
+
+
+class IncrementalGenerator:
+    """增量代码生成"""
+    
+    # 清单文件名（放在输出目录下）
+    MANIFEST_NAME = '.codegen_manifest.json'
+    
+    # 清单格式/渲染逻辑的版本，渲染方式变化时递增使旧缓存失效
+    FORMAT_VERSION = 1
+    
+    # 比较文件内容时忽略的生成日期行（文件头中的 @date）
+    _DATE_LINE_RE = re.compile(r'^ \* @date .*$', re.MULTILINE)
+    
+    def __init__(self, output_dir):
+        """
+        初始化增量生成
+        
+        Args:
+            output_dir: 输出目录
+        """
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, self.MANIFEST_NAME)
+        self._files = {}    # 文件名 -> {'key', 'size', 'mtime_ns'}
+        self._renders = {}  # 定义哈希 -> 渲染结果
+        self._context = None
+        self.load_manifest()
+    
+    def load_manifest(self):
+        """加载清单，版本不符或损坏时视为空"""
+        self._files = {}
+        self._renders = {}
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.FORMAT_VERSION:
+                self._files = data.get('files', {})
+                self._renders = data.get('renders', {})
+        except Exception as e:
+            print(f"加载生成清单失败: {e}")
+    
+    def save_manifest(self):
+        """保存清单（原子写入）"""
+        data = {'version': self.FORMAT_VERSION, 'files': self._files, 'renders': self._renders}
+        self.write_atomic(self.manifest_path, json.dumps(data, ensure_ascii=False, indent=0))
+    
+    @staticmethod
+    def _hash(value):
+        """对JSON可序列化的值计算稳定哈希"""
+        text = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+    
+    def _settings_hash(self):
+        """影响渲染的全局设置（ABI、文件头和注释模板），每次生成只计算一次"""
+        if self._context is None:
+            self._context = self._hash({
+                'version': self.FORMAT_VERSION,
+                'abi_profile': type_info_manager.abi_profile,
+                'abi_profiles': config_service.get('abi_profiles'),
+                'file_header': code_generator.file_header_template,
+                'code_templates': code_templates.signature(),
+            })
+        return self._context
+    
+    def definition_hash(self, spec):
+        """
+        计算定义的内容哈希：定义参数 + 用到的类型的范围和布局 + 全局设置
+        
+        Args:
+            spec: 定义描述（见 CodeGenerator.render_definition）
+        
+        Returns:
+            str: 哈希值
+        """
+        types = {
+            type_name: (type_info_manager.get_type_info(type_name),
+                        layout_engine.get_type_layout(type_name))
+            for type_name in code_generator.definition_types(spec)
+        }
+        return self._hash([self._settings_hash(), spec, types])
+    
+    def render(self, spec, definition_hash=None):
+        """
+        渲染定义，内容没变时直接使用上次的结果
+        
+        Returns:
+            tuple: (代码, 是否重新渲染)
+        """
+        definition_hash = definition_hash or self.definition_hash(spec)
+        code = self._renders.get(definition_hash)
+        if code is not None:
+            return code, False
+        code = code_generator.render_definition(spec)
+        self._renders[definition_hash] = code
+        return code, True
+    
+    def is_up_to_date(self, filename, key):
+        """输出文件是否与清单记录一致（内容键相同且文件未被外部修改）"""
+        entry = self._files.get(filename)
+        if entry is None or entry.get('key') != key:
+            return False
+        try:
+            stat = os.stat(os.path.join(self.output_dir, filename))
+        except OSError:
+            return False
+        return stat.st_size == entry.get('size') and stat.st_mtime_ns == entry.get('mtime_ns')
+    
+    def record(self, filename, key):
+        """记录输出文件的内容键和当前大小/修改时间"""
+        stat = os.stat(os.path.join(self.output_dir, filename))
+        self._files[filename] = {'key': key, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    
+    def generate_file(self, filename, specs, include_header=True):
+        """
+        增量生成单个文件
+        
+        Args:
+            filename: 输出文件名（相对输出目录）
+            specs: 定义描述列表
+            include_header: 是否包含文件头
+        
+        Returns:
+            dict: {'written': 是否写入了文件, 'rendered': 重新渲染的定义数,
+                   'reused': 复用的定义数, 'hashes': 各定义的哈希}
+        """
+        hashes = [self.definition_hash(spec) for spec in specs]
+        key = self._hash([include_header, hashes])
+        result = {'written': False, 'rendered': 0, 'reused': len(specs), 'hashes': hashes}
+        if self.is_up_to_date(filename, key):
+            return result
+        
+        buffer = io.StringIO()
+        with code_generator.open_writer(buffer, os.path.basename(filename), include_header) as writer:
+            for spec, definition_hash in zip(specs, hashes):
+                code, rendered = self.render(spec, definition_hash)
+                writer.write(code)
+                result['rendered'] += rendered
+        result['reused'] = len(specs) - result['rendered']
+        
+        result['written'] = self.write_if_changed(
+            os.path.join(self.output_dir, filename), buffer.getvalue()
+        )
+        self.record(filename, key)
+        return result
+    
+    def generate(self, files):
+        """
+        增量生成多个文件，并清理清单中不再使用的缓存
+        
+        Args:
+            files: {文件名: 定义描述列表}
+        
+        Returns:
+            dict: {'written': [写入的文件], 'unchanged': [未改动的文件],
+                   'rendered': 重新渲染的定义数, 'reused': 复用的定义数}
+        """
+        self._context = None
+        # 先登记所有结构体/枚举，引用它们的定义按实际布局计算哈希，被引用的类型变化时随之重新渲染
+        code_generator.register_definition_types(
+            [spec for specs in files.values() for spec in specs]
+        )
+        stats = {'written': [], 'unchanged': [], 'rendered': 0, 'reused': 0}
+        used = set()
+        for filename, specs in files.items():
+            result = self.generate_file(filename, specs)
+            stats['written' if result['written'] else 'unchanged'].append(filename)
+            stats['rendered'] += result['rendered']
+            stats['reused'] += result['reused']
+            used.update(result['hashes'])
+        
+        self._files = {name: entry for name, entry in self._files.items() if name in files}
+        self._renders = {h: code for h, code in self._renders.items() if h in used}
+        self.save_manifest()
+        return stats
+    
+    @classmethod
+    def write_if_changed(cls, path, text):
+        """
+        与现有文件相比（忽略生成日期行）有变化时原子写入，
+        没有变化时保留原文件，修改时间不变
+        
+        Returns:
+            bool: 是否写入
+        """
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                existing = f.read()
+            if cls._DATE_LINE_RE.sub('', existing) == cls._DATE_LINE_RE.sub('', text):
+                return False
+        except (OSError, UnicodeDecodeError):
+            pass
+        cls.write_atomic(path, text)
+        return True
+    
+    @staticmethod
+    def write_atomic(path, data):
+        """先写临时文件再替换，避免留下写了一半的文件"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_file = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(data)
+            os.replace(temp_file, path)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="按定义清单增量生成C文件")
+    parser.add_argument('project', help="项目描述JSON（{\"files\": {文件名: [定义, ...]}}）")
+    parser.add_argument('-o', '--output', default='.', help="输出目录（默认当前目录）")
+    args = parser.parse_args(argv)
+    
+    try:
+        with open(args.project, 'r', encoding='utf-8') as f:
+            files = json.load(f).get('files', {})
+        stats = IncrementalGenerator(args.output).generate(files)
+    except Exception as e:
+        print(f"增量生成失败: {e}", file=sys.stderr)
+        return 1
+    
+    print(f"写入 {len(stats['written'])} 个文件，{len(stats['unchanged'])} 个未改动；"
+          f"重新渲染 {stats['rendered']} 个定义，复用 {stats['reused']} 个")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,548 @@
+"""
+查找表生成模块
+在定义域上对函数表达式（sin/cos、gamma 校正、标定点拟合等）采样，量化到指定类型，
+生成带取值范围检查的 const 数组和误差报告；也可生成 CRC 查表
+
+安装了 numpy 时表达式按数组整体计算，否则逐点用 math 计算
+
+命令行用法:
+    python -m utils.lut_generator sin --type int16_t --size 256 --name c_s16a_sin_table
+    python -m utils.lut_generator expr --expression "x ** 2.2" --type uint8_t --size 256 --name c_u8a_gamma
+    python -m utils.lut_generator crc --width 16 --poly 0x1021 --name c_u16a_crc16_table
+"""
+
+import argparse
+import ast
+import math
+import struct
+import sys
+from bisect import bisect_right
+from core.type_info import type_info_manager
+from utils.code_templates import code_templates
+from utils.blob_converter import blob_converter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class LutGenerator:
+    """查找表生成"""
+    
+    # 表达式可以使用的函数：名称 -> (math 实现, numpy 函数名)
+    FUNCTIONS = {
+        'sin': (math.sin, 'sin'), 'cos': (math.cos, 'cos'), 'tan': (math.tan, 'tan'),
+        'asin': (math.asin, 'arcsin'), 'acos': (math.acos, 'arccos'), 'atan': (math.atan, 'arctan'),
+        'atan2': (math.atan2, 'arctan2'), 'sinh': (math.sinh, 'sinh'), 'cosh': (math.cosh, 'cosh'),
+        'tanh': (math.tanh, 'tanh'), 'exp': (math.exp, 'exp'), 'log': (math.log, 'log'),
+        'log2': (math.log2, 'log2'), 'log10': (math.log10, 'log10'), 'sqrt': (math.sqrt, 'sqrt'),
+        'abs': (abs, 'abs'), 'floor': (math.floor, 'floor'), 'ceil': (math.ceil, 'ceil'),
+        'pow': (math.pow, 'power'), 'hypot': (math.hypot, 'hypot'),
+    }
+    
+    # 表达式可以使用的常量
+    CONSTANTS = {'pi': math.pi, 'e': math.e}
+    
+    # 表达式允许的语法
+    _ALLOWED_NODES = (
+        ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Constant, ast.Load,
+        ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.FloorDiv, ast.USub, ast.UAdd,
+    )
+    
+    # 预置函数：名称 -> 表达式、定义域、说明
+    PRESETS = {
+        'sin': {'expression': 'sin(2 * pi * x)', 'start': 0.0, 'stop': 1.0, 'endpoint': False,
+                'description': '正弦表（一个周期）'},
+        'cos': {'expression': 'cos(2 * pi * x)', 'start': 0.0, 'stop': 1.0, 'endpoint': False,
+                'description': '余弦表（一个周期）'},
+        'gamma': {'expression': 'x ** gamma', 'start': 0.0, 'stop': 1.0, 'endpoint': True,
+                  'params': {'gamma': 2.2}, 'description': 'gamma 校正表'},
+    }
+    
+    # 常用CRC参数：名称 -> (位宽, 多项式, 是否反射)
+    CRC_PRESETS = {
+        'CRC-8': (8, 0x07, False),
+        'CRC-8/MAXIM': (8, 0x31, True),
+        'CRC-16/CCITT': (16, 0x1021, False),
+        'CRC-16/MODBUS': (16, 0x8005, True),
+        'CRC-32': (32, 0x04C11DB7, True),
+    }
+    
+    def compile_expression(self, expression, params=None):
+        """
+        检查并编译表达式（只允许四则运算、乘方、FUNCTIONS 中的函数、x 和参数名）
+        
+        Args:
+            expression: 以 x 为自变量的表达式，如 'sin(2 * pi * x)'
+            params: 表达式中用到的参数 {名称: 数值}
+        
+        Returns:
+            code: 编译后的表达式
+        
+        Raises:
+            ValueError: 表达式语法错误或使用了不允许的名称
+        """
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"表达式语法错误: {e.msg}")
+        
+        names = {'x'} | set(self.CONSTANTS) | set(params or {})
+        for node in ast.walk(tree):
+            if not isinstance(node, self._ALLOWED_NODES):
+                raise ValueError(f"表达式中不允许使用: {type(node).__name__}")
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in self.FUNCTIONS:
+                    raise ValueError(f"表达式中不支持的函数: {ast.unparse(node.func)}")
+                if node.keywords:
+                    raise ValueError("表达式中的函数不支持关键字参数")
+            elif isinstance(node, ast.Name) and node.id not in names and node.id not in self.FUNCTIONS:
+                raise ValueError(f"表达式中的未知名称: {node.id}")
+        return compile(tree, '<lut_expression>', 'eval')
+    
+    def domain(self, start, stop, count, endpoint=True):
+        """
+        定义域上的等间距采样点
+        
+        Returns:
+            tuple: (采样点列表, 步长)
+        """
+        if count < 1:
+            raise ValueError("查找表至少需要1个元素")
+        divisions = (count - 1 if endpoint else count) or 1
+        step = (stop - start) / divisions
+        return [start + i * step for i in range(count)], step
+    
+    def evaluate(self, expression, xs, params=None):
+        """
+        在采样点上计算表达式
+        
+        Args:
+            expression: 表达式（见 compile_expression）
+            xs: 采样点列表
+            params: 参数 {名称: 数值}
+        
+        Returns:
+            list: 函数值
+        """
+        code = self.compile_expression(expression, params)
+        params = dict(params or {})
+        if numpy is not None:
+            namespace = {name: getattr(numpy, func) for name, (_, func) in self.FUNCTIONS.items()}
+            namespace.update(self.CONSTANTS, **params)
+            namespace['x'] = numpy.asarray(xs, dtype=float)
+            with numpy.errstate(all='ignore'):
+                values = eval(code, {'__builtins__': {}}, namespace)
+            values = numpy.broadcast_to(numpy.asarray(values, dtype=float), (len(xs),))
+            values = values.tolist()
+        else:
+            namespace = {name: impl for name, (impl, _) in self.FUNCTIONS.items()}
+            namespace.update(self.CONSTANTS, **params)
+            values = []
+            for x in xs:
+                namespace['x'] = x
+                try:
+                    values.append(float(eval(code, {'__builtins__': {}}, namespace)))
+                except (ValueError, TypeError, ZeroDivisionError, OverflowError):
+                    values.append(math.nan)
+        
+        bad = next((i for i, value in enumerate(values) if not math.isfinite(value)), None)
+        if bad is not None:
+            raise ValueError(f"表达式在 x = {xs[bad]:g} 处没有有限值")
+        return values
+    
+    def interpolate(self, points, xs):
+        """
+        按标定点分段线性插值（定义域外取端点值）
+        
+        Args:
+            points: 标定点 [(x, y)]
+            xs: 采样点列表
+        
+        Returns:
+            list: 插值结果
+        """
+        points = sorted((float(x), float(y)) for x, y in points)
+        if not points:
+            raise ValueError("至少需要1个标定点")
+        px = [x for x, _ in points]
+        py = [y for _, y in points]
+        if numpy is not None:
+            return numpy.interp(xs, px, py).tolist()
+        
+        values = []
+        for x in xs:
+            index = bisect_right(px, x)
+            if index == 0:
+                values.append(py[0])
+            elif index == len(px):
+                values.append(py[-1])
+            else:
+                x0, x1 = px[index - 1], px[index]
+                y0, y1 = py[index - 1], py[index]
+                values.append(y0 + (y1 - y0) * (x - x0) / (x1 - x0))
+        return values
+    
+    def fit_polynomial(self, points, degree):
+        """
+        最小二乘多项式拟合
+        
+        Args:
+            points: 标定点 [(x, y)]
+            degree: 多项式次数
+        
+        Returns:
+            str: 拟合结果的表达式（可传给 evaluate）
+        """
+        if len(points) <= degree:
+            raise ValueError(f"{degree} 次拟合至少需要 {degree + 1} 个标定点")
+        if numpy is not None:
+            coefficients = numpy.polyfit([p[0] for p in points], [p[1] for p in points], degree)
+            coefficients = coefficients.tolist()[::-1]
+        else:
+            # 正规方程 (AᵀA)c = Aᵀy，高斯消元求解
+            size = degree + 1
+            matrix = [[sum(x ** (i + j) for x, _ in points) for j in range(size)]
+                      + [sum(y * x ** i for x, y in points)] for i in range(size)]
+            for col in range(size):
+                pivot = max(range(col, size), key=lambda r: abs(matrix[r][col]))
+                if abs(matrix[pivot][col]) < 1e-12:
+                    raise ValueError("标定点的 x 值不足以确定拟合多项式")
+                matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+                for row in range(size):
+                    if row != col:
+                        factor = matrix[row][col] / matrix[col][col]
+                        matrix[row] = [a - factor * b for a, b in zip(matrix[row], matrix[col])]
+            coefficients = [matrix[i][size] / matrix[i][i] for i in range(size)]
+        return ' + '.join(f"({c!r}) * x ** {i}" for i, c in enumerate(coefficients))
+    
+    def quantize(self, values, type_name, scale=None, offset=None, clip=False):
+        """
+        把实数量化为类型的存储值: 存储值 = round(值 × scale + offset)
+        
+        Args:
+            values: 实数列表
+            type_name: 目标类型（整型或 float/double）
+            scale: 缩放系数，None 时自动选择能容纳全部值的最大系数（整型）
+            offset: 偏移，None 时见 default_offset()
+            clip: 超出类型范围时限幅（否则报错）
+        
+        Returns:
+            dict: {
+                'stored': 存储值列表,
+                'scale': 缩放系数,
+                'offset': 偏移,
+                'clipped': 被限幅的元素个数,
+                'max_error': 最大绝对误差（实际值单位）,
+                'max_error_index': 最大误差所在下标,
+                'rms_error': 均方根误差
+            }
+        
+        Raises:
+            ValueError: 类型未知、scale 为 0，或有值超出类型范围且未开启限幅
+        """
+        info = type_info_manager.get_type_info(type_name)
+        if not info:
+            raise ValueError(f"未知类型: {type_name}")
+        if scale == 0:
+            raise ValueError("scale 不能为 0")
+        if offset is None:
+            offset = self.default_offset(values, type_name)
+        
+        if type_info_manager.is_float_type(type_name):
+            scale = 1.0 if scale is None else scale
+            pack = 'f' if info.get('bytes') == 4 else 'd'
+            try:
+                stored = [struct.unpack(pack, struct.pack(pack, v * scale + offset))[0] for v in values]
+            except OverflowError:
+                raise ValueError(f"有值超出 {type_name} 的范围")
+            clipped = 0
+        else:
+            low, high = info['min'], info['max']
+            if scale is None:
+                scale = self.auto_scale(values, low, high, offset)
+            stored = []
+            clipped = 0
+            for index, value in enumerate(values):
+                raw = math.floor(value * scale + offset + 0.5)
+                if raw < low or raw > high:
+                    if not clip:
+                        raise ValueError(
+                            f"第 {index} 个值 {value:g} 量化后为 {raw}，超出 {type_name} 的范围 "
+                            f"{low} ~ {high}（调整 scale/offset 或开启限幅）"
+                        )
+                    raw = max(low, min(high, raw))
+                    clipped += 1
+                stored.append(raw)
+        
+        errors = [abs((s - offset) / scale - v) for s, v in zip(stored, values)]
+        max_index = max(range(len(errors)), key=errors.__getitem__) if errors else 0
+        return {
+            'stored': stored,
+            'scale': scale,
+            'offset': offset,
+            'clipped': clipped,
+            'max_error': errors[max_index] if errors else 0.0,
+            'max_error_index': max_index,
+            'rms_error': math.sqrt(sum(e * e for e in errors) / len(errors)) if errors else 0.0,
+        }
+    
+    @staticmethod
+    def default_offset(values, type_name):
+        """默认偏移: 值域含负数且类型为无符号整型时取类型范围的中点，否则为 0"""
+        if (values and min(values) < 0 and not type_info_manager.is_float_type(type_name)
+                and not type_info_manager.is_signed_type(type_name)):
+            info = type_info_manager.get_type_info(type_name)
+            return (info['min'] + info['max'] + 1) // 2
+        return 0
+    
+    @staticmethod
+    def auto_scale(values, low, high, offset=0.0):
+        """
+        能让全部值量化后落在 [low, high] 内的最大缩放系数
+        
+        Raises:
+            ValueError: 偏移后没有正的缩放系数能容纳全部值
+        """
+        limits = []
+        top = max(values)
+        bottom = min(values)
+        if top > 0:
+            limits.append((high - offset) / top)
+        if bottom < 0:
+            limits.append((low - offset) / bottom)
+        if not limits:
+            return 1.0
+        scale = min(limits)
+        if scale <= 0:
+            if bottom < 0 and low - offset >= 0:
+                raise ValueError(f"值域含负数（最小 {bottom:g}），无符号类型需要 offset")
+            raise ValueError(f"偏移 {offset:g} 超出类型范围 {low} ~ {high}")
+        # 系数为整数时取整，避免四舍五入后超出范围
+        return math.floor(scale) if scale >= 1 else scale
+    
+    def generate_lut(self, var_name, type_name, expression=None, start=0.0, stop=1.0, count=256,
+                     endpoint=True, params=None, points=None, scale=None, offset=None, clip=False,
+                     modifier='常量', module='', purpose='', description=''):
+        """
+        生成函数查找表
+        
+        Args:
+            var_name: 数组名
+            type_name: 元素类型
+            expression: 以 x 为自变量的表达式；为 None 时按 points 插值
+            start: 定义域起点
+            stop: 定义域终点
+            count: 元素个数
+            endpoint: 是否包含终点（周期函数通常不包含）
+            params: 表达式参数 {名称: 数值}
+            points: 标定点 [(x, y)]，分段线性插值
+            scale: 缩放系数（见 quantize）
+            offset: 偏移（见 quantize）
+            clip: 超出范围时限幅
+            modifier: 修饰类型
+            module: 功能模块
+            purpose: 使用目的
+            description: 说明（写入注释）
+        
+        Returns:
+            dict: {'code': 生成的代码, 'report': quantize() 的结果（不含 'stored'）,
+                   'step': 采样步长}
+        """
+        xs, step = self.domain(start, stop, count, endpoint)
+        if expression is not None:
+            values = self.evaluate(expression, xs, params)
+            source = f"f(x) = {expression}"
+            if params:
+                source += "，" + "，".join(f"{name} = {value:g}" for name, value in params.items())
+        elif points:
+            values = self.interpolate(points, xs)
+            source = f"{len(points)} 个标定点线性插值"
+        else:
+            raise ValueError("需要表达式或标定点")
+        
+        result = self.quantize(values, type_name, scale, offset, clip)
+        stored = result.pop('stored')
+        is_float = type_info_manager.is_float_type(type_name)
+        
+        notes = [description or source]
+        if description:
+            notes.append(source)
+        notes.append(f"x = {start:g} ~ {stop:g}{'' if endpoint else '（不含终点）'}，步长 {step:.6g}")
+        if not is_float or result['scale'] != 1 or result['offset']:
+            notes.append(f"实际值 = (存储值 - {result['offset']:g}) / {result['scale']:.10g}")
+        notes.append(f"最大误差 {result['max_error']:.3g}（下标 {result['max_error_index']}），"
+                     f"均方根误差 {result['rms_error']:.3g}")
+        if result['clipped']:
+            notes.append(f"{result['clipped']} 个值被限幅")
+        
+        prefix = var_name.upper()
+        macros = f"#define {prefix}_SIZE     ({count}u)\n"
+        macros += f"#define {prefix}_X_START  ({self._float_literal(start)})\n"
+        macros += f"#define {prefix}_X_STEP   ({self._float_literal(step)})\n"
+        if not is_float:
+            macros += f"#define {prefix}_SCALE    ({self._float_literal(result['scale'])})\n"
+            if result['offset']:
+                macros += f"#define {prefix}_OFFSET   ({result['offset']:g})\n"
+        macros += "\n"
+        
+        if is_float:
+            suffix = 'f' if type_info_manager.get_type_info(type_name).get('bytes') == 4 else ''
+            items = [self._float_literal(value, suffix) for value in stored]
+        else:
+            items = [str(value) for value in stored]
+        code = macros + self._array_code(var_name, type_name, items, modifier, module, purpose, notes)
+        return {'code': code, 'report': result, 'step': step}
+    
+    def crc_table(self, width, polynomial, reflected=False):
+        """
+        计算按字节查表的CRC表（256项）
+        
+        Args:
+            width: CRC位宽（8/16/32）
+            polynomial: 生成多项式（不含最高位，如 0x1021）
+            reflected: 是否按反射（LSB先行）方式计算
+        
+        Returns:
+            list: 256 个表项
+        """
+        if width not in (8, 16, 32):
+            raise ValueError(f"不支持的CRC位宽: {width}")
+        mask = (1 << width) - 1
+        polynomial &= mask
+        table = []
+        if reflected:
+            reversed_poly = int(f"{polynomial:0{width}b}"[::-1], 2)
+            for byte in range(256):
+                crc = byte
+                for _ in range(8):
+                    crc = (crc >> 1) ^ reversed_poly if crc & 1 else crc >> 1
+                table.append(crc)
+        else:
+            top = 1 << (width - 1)
+            for byte in range(256):
+                crc = byte << (width - 8)
+                for _ in range(8):
+                    crc = ((crc << 1) ^ polynomial) & mask if crc & top else (crc << 1) & mask
+                table.append(crc)
+        return table
+    
+    def generate_crc_table(self, var_name, width, polynomial, reflected=False,
+                           modifier='常量', module='', purpose='', description=''):
+        """
+        生成CRC查表
+        
+        Returns:
+            dict: {'code': 生成的代码, 'table': 表项列表}
+        """
+        table = self.crc_table(width, polynomial, reflected)
+        type_name = f"uint{width}_t"
+        digits = width // 4
+        notes = [description or f"CRC-{width} 查找表",
+                 f"多项式 0x{polynomial:0{digits}X}，{'反射（LSB先行）' if reflected else '非反射（MSB先行）'}"]
+        items = [f"0x{value:0{digits}X}" for value in table]
+        code = self._array_code(var_name, type_name, items, modifier, module, purpose, notes)
+        return {'code': code, 'table': table}
+    
+    @staticmethod
+    def _float_literal(value, suffix='f'):
+        """浮点字面量（保证带小数点）"""
+        text = repr(float(value))
+        if 'e' not in text and '.' not in text and 'n' not in text:
+            text += '.0'
+        return text + suffix
+    
+    def _array_code(self, var_name, type_name, items, modifier, module, purpose, notes, per_line=8):
+        """生成带注释块的数组定义"""
+        count = len(items)
+        total_bytes, memory_str = type_info_manager.get_memory_size(type_name, count)
+        code = code_templates.get('array', 'comment')({
+            'var_name': var_name,
+            'element_type': type_name,
+            'array_size': count,
+            'range': type_info_manager.get_range_str(type_name),
+            'memory': memory_str,
+            'element_bytes': type_info_manager.get_type_size(type_name),
+            'total_bytes': total_bytes,
+            'module': module,
+            'purpose': purpose,
+            'modifier': modifier,
+            'comment': '，'.join(notes),
+        })
+        code += blob_converter.declaration(var_name, type_name, count, modifier) + " = {\n"
+        width = max(len(item) for item in items)
+        for start in range(0, count, per_line):
+            line = ', '.join(item.rjust(width) for item in items[start:start + per_line])
+            code += f"    {line},\n"
+        code += "};\n\n"
+        return code
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="生成查找表")
+    parser.add_argument('kind', choices=tuple(LutGenerator.PRESETS) + ('expr', 'crc'),
+                        help="预置函数、自定义表达式（expr）或CRC表（crc）")
+    parser.add_argument('--name', required=True, help="数组名")
+    parser.add_argument('--type', default='int16_t', help="元素类型（crc 时按位宽决定）")
+    parser.add_argument('--size', type=int, default=256, help="元素个数")
+    parser.add_argument('--expression', help="以 x 为自变量的表达式（expr）")
+    parser.add_argument('--start', type=float, help="定义域起点")
+    parser.add_argument('--stop', type=float, help="定义域终点")
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help="表达式参数（可重复，如 gamma=2.4）")
+    parser.add_argument('--scale', type=float, help="缩放系数（默认自动）")
+    parser.add_argument('--offset', type=float,
+                        help="偏移（默认 0，值域含负数的无符号类型取类型中点）")
+    parser.add_argument('--clip', action='store_true', help="超出类型范围时限幅")
+    parser.add_argument('--width', type=int, default=16, choices=(8, 16, 32), help="CRC位宽")
+    parser.add_argument('--poly', default='0x1021', help="CRC多项式")
+    parser.add_argument('--reflected', action='store_true', help="反射CRC（LSB先行）")
+    parser.add_argument('-o', '--output', help="输出文件（默认输出到标准输出）")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.kind == 'crc':
+            code = lut_generator.generate_crc_table(
+                args.name, args.width, int(args.poly, 0), args.reflected
+            )['code']
+        else:
+            preset = LutGenerator.PRESETS.get(args.kind, {})
+            params = dict(preset.get('params', {}))
+            for item in args.param:
+                name, _, value = item.partition('=')
+                params[name.strip()] = float(value)
+            expression = args.expression or preset.get('expression')
+            if not expression:
+                raise ValueError("expr 需要 --expression")
+            result = lut_generator.generate_lut(
+                args.name, args.type, expression,
+                start=preset.get('start', 0.0) if args.start is None else args.start,
+                stop=preset.get('stop', 1.0) if args.stop is None else args.stop,
+                count=args.size, endpoint=preset.get('endpoint', True), params=params,
+                scale=args.scale, offset=args.offset, clip=args.clip,
+                description=preset.get('description', '')
+            )
+            code = result['code']
+            report = result['report']
+            print(f"最大误差 {report['max_error']:.3g}，均方根误差 {report['rms_error']:.3g}，"
+                  f"限幅 {report['clipped']} 个", file=sys.stderr)
+    except Exception as e:
+        print(f"生成查找表失败: {e}", file=sys.stderr)
+        return 1
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(code)
+    else:
+        sys.stdout.write(code)
+    return 0
+
+
+# 全局实例
+lut_generator = LutGenerator()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
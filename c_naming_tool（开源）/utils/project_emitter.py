@@ -0,0 +1,211 @@
+"""
+多文件工程生成模块
+按模块把定义分到 .h/.c 文件对：类型定义和 extern 声明放头文件（带 include guard），
+变量定义放源文件；各模块在进程池中并行渲染，文件原子写入
+
+命令行用法:
+    python -m utils.project_emitter project.json -o generated/ -j 4
+project.json 格式:
+    {"modules": {"motor": [定义, ...],
+                 "sensor": {"includes": ["motor.h"], "brief": "传感器", "definitions": [定义, ...]}}}
+定义格式同增量生成（见 CodeGenerator.render_definition）
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from utils.code_generator import code_generator, CodeGenerator, FILE_FOOTER
+from utils.incremental import IncrementalGenerator
+
+
+class ProjectEmitter:
+    """多文件工程生成"""
+    
+    # 所有头文件都包含的标准头文件
+    STANDARD_INCLUDES = ('<stdint.h>', '<stdbool.h>')
+    
+    def __init__(self):
+        """初始化工程生成"""
+        self.file_comment_template = """/*******************************************************************************
+ * @file    {filename}
+ * @brief   {brief}
+ * @date    {date}
+ * @version 1.0.0
+ ******************************************************************************/
+
+"""
+    
+    @staticmethod
+    def normalize_modules(modules):
+        """
+        统一模块描述格式
+        
+        Args:
+            modules: {模块名: 定义列表 或 {'includes', 'brief', 'definitions'}}
+        
+        Returns:
+            dict: {模块名: {'includes': [...], 'brief': '', 'definitions': [...]}}
+        """
+        normalized = {}
+        for name, module in modules.items():
+            if isinstance(module, list):
+                module = {'definitions': module}
+            normalized[name] = {
+                'includes': list(module.get('includes', [])),
+                'brief': module.get('brief', ''),
+                'definitions': list(module.get('definitions', [])),
+            }
+        return normalized
+    
+    @staticmethod
+    def type_definitions(modules):
+        """
+        收集所有模块中的结构体/枚举定义，供各工作进程登记嵌套类型的布局和枚举大小
+        
+        Returns:
+            list: 定义描述列表
+        """
+        return [
+            spec
+            for module in modules.values()
+            for spec in module['definitions']
+            if spec.get('kind') in CodeGenerator.HEADER_KINDS
+        ]
+    
+    @staticmethod
+    def guard_name(filename):
+        """头文件的 include guard 宏名"""
+        return re.sub(r'\W', '_', filename).upper()
+    
+    def render_module(self, name, module, date=None):
+        """
+        渲染单个模块的头文件和源文件
+        
+        Args:
+            name: 模块名（文件名不含扩展名）
+            module: 模块描述（见 normalize_modules）
+            date: 文件头中的日期，None 时为当天
+        
+        Returns:
+            dict: {'模块名.h': 头文件内容, '模块名.c': 源文件内容}
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        header_name = f"{name}.h"
+        source_name = f"{name}.c"
+        brief = module['brief'] or name
+        guard = self.guard_name(header_name)
+        
+        types = []
+        declarations = []
+        definitions = []
+        for spec in module['definitions']:
+            code = code_generator.render_definition(spec)
+            if spec.get('kind') in CodeGenerator.HEADER_KINDS:
+                types.append(code)
+            else:
+                definitions.append(code)
+                declaration = code_generator.generate_extern_declaration(spec)
+                if declaration:
+                    declarations.append(declaration)
+        
+        header = [self.file_comment_template.format(filename=header_name, brief=brief, date=date)]
+        header.append(f"#ifndef {guard}\n#define {guard}\n\n")
+        header.extend(f"#include {include}\n" for include in self.STANDARD_INCLUDES)
+        header.extend(f'#include "{include}"\n' for include in module['includes'])
+        header.append("\n")
+        header.extend(types)
+        if declarations:
+            header.append("/* 全局变量声明 */\n")
+            header.extend(declarations)
+            header.append("\n")
+        header.append(f"#endif /* {guard} */\n")
+        
+        source = [self.file_comment_template.format(filename=source_name, brief=brief, date=date)]
+        source.append(f'#include "{header_name}"\n\n')
+        source.extend(definitions)
+        source.append(FILE_FOOTER)
+        
+        return {header_name: ''.join(header), source_name: ''.join(source)}
+    
+    def emit(self, modules, output_dir, workers=1):
+        """
+        生成整个工程
+        
+        Args:
+            modules: 模块描述（见 normalize_modules）
+            output_dir: 输出目录
+            workers: 渲染使用的进程数，1 表示在当前进程中渲染
+        
+        Returns:
+            dict: {'written': [写入的文件], 'unchanged': [内容未变的文件]}
+        """
+        modules = self.normalize_modules(modules)
+        type_specs = self.type_definitions(modules)
+        date = datetime.now().strftime("%Y-%m-%d")
+        tasks = [(name, module, date) for name, module in modules.items()]
+        
+        if workers <= 1 or len(tasks) <= 1:
+            code_generator.register_definition_types(type_specs)
+            rendered = (self.render_module(*task) for task in tasks)
+            return self._write_all(rendered, output_dir)
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_register_types,
+                                 initargs=(type_specs,)) as executor:
+            rendered = executor.map(_render_module_task, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+            return self._write_all(rendered, output_dir)
+    
+    def _write_all(self, rendered, output_dir):
+        """按渲染完成的顺序写出文件"""
+        stats = {'written': [], 'unchanged': []}
+        for files in rendered:
+            for filename, text in files.items():
+                path = os.path.join(output_dir, filename)
+                if IncrementalGenerator.write_if_changed(path, text):
+                    stats['written'].append(filename)
+                else:
+                    stats['unchanged'].append(filename)
+        return stats
+
+
+def _register_types(type_specs):
+    """在渲染进程中登记结构体类型（嵌套成员按其布局计算）和枚举类型（按存储类型计算大小）"""
+    code_generator.register_definition_types(type_specs)
+
+
+def _render_module_task(args):
+    """进程池任务：渲染单个模块"""
+    return project_emitter.render_module(*args)
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="按模块生成 .h/.c 文件对")
+    parser.add_argument('project', help="项目描述JSON（{\"modules\": {模块名: [定义, ...]}}）")
+    parser.add_argument('-o', '--output', default='.', help="输出目录（默认当前目录）")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help="并行渲染的进程数（默认CPU核数）")
+    args = parser.parse_args(argv)
+    
+    try:
+        with open(args.project, 'r', encoding='utf-8') as f:
+            modules = json.load(f).get('modules', {})
+        stats = project_emitter.emit(modules, args.output, args.jobs)
+    except Exception as e:
+        print(f"工程生成失败: {e}", file=sys.stderr)
+        return 1
+    
+    print(f"共 {len(modules)} 个模块，写入 {len(stats['written'])} 个文件，"
+          f"{len(stats['unchanged'])} 个内容未变")
+    return 0
+
+
+# 全局实例
+project_emitter = ProjectEmitter()
+
+
+if __name__ == '__main__':
+    sys.exit(main())